@@ -0,0 +1,64 @@
+"""
+运维管理路由：运行指标、连接池状态等
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict, Optional
+from config import settings
+from metrics import collect, render_prometheus
+from models import User, UserRole
+from pool_metrics import pool_snapshot
+from security import get_current_user
+import secrets
+
+router = APIRouter(prefix="/admin", tags=["Administration"])
+
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    """要求当前用户为管理员"""
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="只有管理员可以访问"
+        )
+    return current_user
+
+
+@router.get("/metrics")
+async def get_metrics(current_user: User = Depends(require_admin)) -> Dict[str, Any]:
+    """
+    获取进程内运行指标
+
+    包括认证主体缓存、列表总数缓存、连接池等的统计
+    """
+    return collect()
+
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics(authorization: Optional[str] = Header(None)) -> str:
+    """
+    以 Prometheus 文本格式输出运行指标
+
+    使用 METRICS_SCRAPE_TOKEN 作为 Bearer 令牌鉴权，未配置令牌时接口不可用
+    """
+    token = settings.METRICS_SCRAPE_TOKEN
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="指标抓取未启用")
+    if not authorization or not secrets.compare_digest(authorization, f"Bearer {token}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无效的抓取令牌",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return render_prometheus()
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats(current_user: User = Depends(require_admin)) -> Dict[str, Any]:
+    """
+    获取数据库连接池状态
+
+    包括池大小、当前占用与溢出连接数、获取连接耗时分布、超时、新建连接耗时与失效次数
+    """
+    return pool_snapshot()
@@ -5,54 +5,78 @@
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from conditional import is_not_modified, make_etag, not_modified_response, set_validators
 from database import get_db
 from models import User
 from schemas import RegisterRequest, LoginRequest, TokenResponse, MeResponse
-from security import hash_password, verify_password, create_access_token, get_current_user
+from password_hashing import hash_password, verify_password
+from principal_cache import invalidate_principal
+from security import create_access_token, get_current_user
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=MeResponse)
-async def register(payload: RegisterRequest, db: Session = Depends(get_db)):
-    exists = db.query(User).filter((User.username == payload.username) | (User.email == payload.email)).first()
+async def register(payload: RegisterRequest, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(User).where((User.username == payload.username) | (User.email == payload.email))
+    )
+    exists = result.scalars().first()
     if exists:
         raise HTTPException(status_code=400, detail="用户名或邮箱已存在")
 
+    password_hash = await hash_password(payload.password)
     try:
         user = User(
             username=payload.username,
             email=payload.email,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
     except Exception as e:
         # 处理唯一约束等数据库错误
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="注册失败：用户名或邮箱已存在或数据无效")
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user: Optional[User] = db.query(User).filter(
-        (User.username == payload.username) | (User.email == payload.username)
-    ).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(User).where((User.username == payload.username) | (User.email == payload.username))
+    )
+    user: Optional[User] = result.scalars().first()
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
 
+    valid, new_hash = await verify_password(payload.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
+
+    # bcrypt 成本因子调整后，借助本次登录的明文密码升级旧哈希
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+        await invalidate_principal(user.id)
+
     token = create_access_token(subject=str(user.id))
     return TokenResponse(access_token=token)
 
 
 @router.get("/me", response_model=MeResponse)
-async def me(current_user: User = Depends(get_current_user)):
+async def me(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    # 当前用户通常来自认证缓存，条件请求无需额外查询
+    etag = make_etag(current_user.id, current_user.updated_at)
+    if is_not_modified(request, etag, current_user.updated_at):
+        return not_modified_response(etag, current_user.updated_at)
+    set_validators(response, etag, current_user.updated_at)
     return current_user
 
 
@@ -0,0 +1,97 @@
+"""
+HTTP 条件请求工具：基于 updated_at 生成 ETag / Last-Modified，处理 304 与 412
+
+ETag 由资源ID与 updated_at（微秒精度）派生，资源每次写入都会刷新 updated_at。
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import HTTPException, Request, Response, status
+from typing import Optional
+import hashlib
+
+
+def make_etag(resource_id, updated_at: Optional[datetime]) -> Optional[str]:
+    """生成强ETag，updated_at 为空时返回None"""
+    if updated_at is None:
+        return None
+    digest = hashlib.sha1(f"{resource_id}:{updated_at.isoformat()}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """判断 If-None-Match / If-Match 头是否包含指定ETag"""
+    candidates = [item.strip() for item in header.split(",")]
+    if "*" in candidates:
+        return True
+    if weak:
+        # If-None-Match 使用弱比较：忽略 W/ 前缀
+        candidates = [item[2:] if item.startswith("W/") else item for item in candidates]
+    return etag in candidates
+
+
+def has_conditional_headers(request: Request) -> bool:
+    """请求是否携带条件GET头（决定是否走轻量查询路径）"""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: Optional[str], updated_at: Optional[datetime]) -> bool:
+    """
+    判断条件GET是否可以返回304
+
+    If-None-Match 优先；未提供时比较 If-Modified-Since（秒级精度）
+    """
+    if etag is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag, weak=True)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and updated_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = updated_at if updated_at.tzinfo else updated_at.replace(tzinfo=timezone.utc)
+        return modified.replace(microsecond=0) <= since
+    return False
+
+
+def set_validators(response: Response, etag: Optional[str], updated_at: Optional[datetime]) -> None:
+    """在响应上设置 ETag 与 Last-Modified"""
+    if etag:
+        response.headers["ETag"] = etag
+    if updated_at is not None:
+        response.headers["Last-Modified"] = _http_date(updated_at)
+
+
+def not_modified_response(etag: Optional[str], updated_at: Optional[datetime]) -> Response:
+    """构造304响应（不含响应体）"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, updated_at)
+    return response
+
+
+def check_if_match(request: Request, etag: Optional[str]) -> None:
+    """
+    校验 If-Match 前置条件
+
+    Raises:
+        HTTPException: 资源已被他人修改时返回412
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    if etag is None or not _etag_matches(if_match, etag, weak=False):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="资源已被修改，请重新获取后再提交"
+        )
@@ -3,7 +3,7 @@
 """
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -22,11 +22,85 @@ class Settings(BaseSettings):
     DB_USER: str = "pm_user"
     DB_PASSWORD: str = "pm_password"
     
+    # 连接池配置（主库与每个只读副本各自一个连接池）
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # 获取连接的最长等待时间（秒），超时抛出异常
+    DB_POOL_TIMEOUT: float = 30.0
+    # 连接最长复用时间（秒），-1 表示不回收
+    DB_POOL_RECYCLE: int = -1
+    # 取出连接前先探测可用性
+    DB_POOL_PRE_PING: bool = False
+    
+    # 只读副本配置：逗号分隔的副本URL，为空时所有请求使用主库
+    DATABASE_REPLICA_URLS: str = ""
+    # 副本复制延迟超过该阈值（秒）时，读请求回退到主库
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5.0
+    # 用户写操作后的读己之写窗口（秒），窗口内该用户的读请求走主库
+    READ_YOUR_WRITES_WINDOW_SECONDS: float = 5.0
+    
+    # 列表总数缓存配置
+    COUNT_CACHE_TTL_SECONDS: float = 10.0
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+    
+    # 任务列表响应缓存配置（任务写入时按数据版本失效）
+    TASK_LIST_CACHE_TTL_SECONDS: float = 30.0
+    TASK_LIST_CACHE_MAX_ENTRIES: int = 512
+    
+    # 批量创建任务的单次上限
+    TASK_BULK_MAX_ITEMS: int = 10000
+    # 批量状态变更等批量操作的单次上限
+    TASK_BATCH_MAX_ITEMS: int = 1000
+    # 导出时服务端游标每批读取的行数
+    TASK_EXPORT_BATCH_SIZE: int = 1000
+    # Parquet 导出的行组大小（行数），决定导出时缓冲的最大行数
+    EXPORT_PARQUET_ROW_GROUP_ROWS: int = 65536
+    # 增量导出水位相对当前时间的回退（秒），覆盖提交较晚的长事务与副本延迟
+    EXPORT_WATERMARK_LAG_SECONDS: float = 60.0
+    
+    # 任务统计计数按源表校准的间隔（秒）
+    TASK_STATS_RECONCILE_INTERVAL_SECONDS: int = 900
+    
+    # 逾期扫描：间隔（秒）与每批标记的任务数
+    OVERDUE_SWEEP_INTERVAL_SECONDS: int = 300
+    OVERDUE_SWEEP_BATCH_SIZE: int = 500
+    # 系统自动变更（如逾期标记）在历史记录中记为该用户的操作，启动时不存在则创建（停用状态，不能登录）
+    SYSTEM_ACTOR_USERNAME: str = "system"
+    
+    # 截止提醒：提前天数与内存定时队列预加载的时间窗口（小时）
+    REMINDER_LEAD_DAYS: float = 3.0
+    REMINDER_WINDOW_HOURS: float = 6.0
+    
+    # 认证主体缓存配置
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # 跨进程缓存失效频道（PostgreSQL LISTEN/NOTIFY），为空时仅在本进程内失效
+    CACHE_INVALIDATION_CHANNEL: Optional[str] = None
+    
     # 认证配置
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # 密码哈希配置：bcrypt 成本因子变化后，旧哈希会在用户登录时自动重算
+    BCRYPT_ROUNDS: int = 12
+    # 哈希进程池大小，为空时取CPU核数
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    # 允许同时排队/执行的哈希任务数，超出时返回503
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    
+    # 健康检查配置：后台探测间隔、单次探测超时、快照过期时间
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_STALE_AFTER_SECONDS: float = 30.0
+    # 连接池占用率达到该比例时就绪探针返回503
+    READINESS_MAX_POOL_SATURATION: float = 0.9
+    
+    # Prometheus 指标抓取令牌（为空时不开放 /admin/metrics/prometheus）
+    METRICS_SCRAPE_TOKEN: Optional[str] = None
+    
     # 服务器配置
     HOST: str = "0.0.0.0"
     PORT: int = 8000
@@ -47,6 +121,11 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/pm_agent.log"
     
+    @property
+    def replica_urls(self) -> List[str]:
+        """解析只读副本URL列表"""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -2,26 +2,102 @@
 项目管理 Agent 数据库模块
 """
 
-from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy import MetaData, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+from cache import TTLCache
 from config import settings
+from metrics import register_collector
+from pool_metrics import InstrumentedAsyncQueuePool, instrument_engine, pool_snapshot
+import asyncio
+import itertools
 import logging
+import time
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.DEBUG
+
+def to_async_url(url: str) -> str:
+    """将同步数据库URL转换为asyncpg驱动URL"""
+    if url.startswith("postgresql+asyncpg://"):
+        return url
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+def create_instrumented_engine(url: str, name: str):
+    """按配置创建带连接池指标的异步引擎"""
+    created = create_async_engine(
+        to_async_url(url),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        echo=settings.DEBUG
+    )
+    instrument_engine(created, name)
+    return created
+
+
+# 创建异步数据库引擎
+engine = create_instrumented_engine(settings.DATABASE_URL, "primary")
+
+class PrimarySession(Session):
+    """主库会话：记录当前用户的写操作，用于读己之写的路由"""
+
+
+# 创建异步会话工厂（提交后不过期，避免在序列化响应时触发隐式IO）
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    autoflush=False,
+    expire_on_commit=False
 )
 
-# 创建会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 只读副本引擎与会话工厂（未配置副本时为空）
+replica_engines = [
+    create_instrumented_engine(url, f"replica-{index}")
+    for index, url in enumerate(settings.replica_urls)
+]
+ReplicaSessionLocals = [
+    async_sessionmaker(bind=replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    for replica in replica_engines
+]
+
+# 各副本最近一次测得的复制延迟（秒），None 表示未知或不可用
+_replica_lag: List[Optional[float]] = [None] * len(replica_engines)
+_replica_cycle = itertools.count()
+_replica_monitor_task: Optional[asyncio.Task] = None
+
+# 最近有写操作的用户，窗口期内的读请求走主库（其他进程的写入经失效广播同步，见 db_routing）
+_recent_writers = TTLCache(maxsize=100000, ttl=settings.READ_YOUR_WRITES_WINDOW_SECONDS)
+# 广播可能丢失时（监听连接重建），在该时刻（monotonic）之前所有读请求走主库
+_primary_pinned_until = 0.0
+
+# 读请求路由目标；只读会话的 info["read_target"] 记录本次请求的目标
+READ_PRIMARY = "primary"
+READ_PRIMARY_STICKY = "primary_sticky"
+READ_PRIMARY_LAG = "primary_lag"
+READ_REPLICA = "replica"
+
+# 读请求路由统计
+_read_routing = {READ_REPLICA: 0, READ_PRIMARY_STICKY: 0, READ_PRIMARY_LAG: 0}
+
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
 
 # 创建基础模型类
 Base = declarative_base()
@@ -34,8 +110,8 @@ async def init_db():
     """初始化数据库连接"""
     try:
         # 测试数据库连接
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT 1"))
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
             logger.info("数据库连接成功")
         return True
     except Exception as e:
@@ -43,21 +119,150 @@ async def init_db():
         return False
 
 
-def get_db():
+async def close_db():
+    """释放数据库连接池"""
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
+
+async def get_db():
     """获取数据库会话"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    """记录通过 execute 执行的批量写语句"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _track_flush_writes(session, flush_context):
+    """记录ORM单元提交产生的写操作"""
+    session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _remember_writer(session):
+    """提交写操作后，在窗口期内将该用户的读请求固定到主库"""
+    if session.info.pop("has_writes", False) and session.info.get("user_id"):
+        mark_recent_write(session.info["user_id"])
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("has_writes", None)
+
+
+def mark_recent_write(user_id: str) -> None:
+    """标记用户刚刚发生写操作"""
+    _recent_writers.set(user_id, True)
+
+
+def pin_reads_to_primary() -> None:
+    """无法确定哪些用户刚写入过数据时，在一个读己之写窗口内将所有读请求路由到主库"""
+    global _primary_pinned_until
+    _primary_pinned_until = time.monotonic() + settings.READ_YOUR_WRITES_WINDOW_SECONDS
+
+
+def route_read(user_id: Optional[str] = None) -> Tuple[str, async_sessionmaker]:
+    """
+    为只读请求选择会话工厂
+    
+    - 未配置副本：主库（READ_PRIMARY）
+    - 用户在读己之写窗口内：主库（READ_PRIMARY_STICKY）
+    - 没有延迟低于阈值的副本：主库（READ_PRIMARY_LAG）
+    - 否则在健康副本间轮询（READ_REPLICA）
+    
+    Returns:
+        (路由目标, 会话工厂)
+    """
+    if not ReplicaSessionLocals:
+        return READ_PRIMARY, AsyncSessionLocal
+    if (user_id and _recent_writers.get(user_id)) or time.monotonic() < _primary_pinned_until:
+        _read_routing[READ_PRIMARY_STICKY] += 1
+        return READ_PRIMARY_STICKY, AsyncSessionLocal
+    healthy = [
+        index for index, lag in enumerate(_replica_lag)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+    ]
+    if not healthy:
+        _read_routing[READ_PRIMARY_LAG] += 1
+        return READ_PRIMARY_LAG, AsyncSessionLocal
+    _read_routing[READ_REPLICA] += 1
+    return READ_REPLICA, ReplicaSessionLocals[healthy[next(_replica_cycle) % len(healthy)]]
+
+
+def read_session_factory(user_id: Optional[str] = None) -> async_sessionmaker:
+    """为只读请求选择会话工厂（见 route_read）"""
+    return route_read(user_id)[1]
+
+
+async def check_replica_lag() -> None:
+    """测量所有副本的复制延迟"""
+    for index, replica in enumerate(replica_engines):
+        try:
+            async with replica.connect() as conn:
+                lag = await conn.scalar(_REPLICA_LAG_SQL)
+            _replica_lag[index] = float(lag) if lag is not None else None
+        except Exception as e:
+            logger.warning(f"副本 {index} 延迟检测失败: {e}")
+            _replica_lag[index] = None
+
+
+async def _monitor_replicas() -> None:
+    """周期性检测副本延迟"""
+    while True:
+        await asyncio.sleep(settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS)
+        await check_replica_lag()
+
+
+async def start_replica_monitor() -> None:
+    """启动副本延迟监控（未配置副本时不启动）"""
+    global _replica_monitor_task
+    if not replica_engines or _replica_monitor_task is not None:
+        return
+    await check_replica_lag()
+    _replica_monitor_task = asyncio.create_task(_monitor_replicas())
+
+
+async def stop_replica_monitor() -> None:
+    """停止副本延迟监控"""
+    global _replica_monitor_task
+    if _replica_monitor_task is None:
+        return
+    _replica_monitor_task.cancel()
+    try:
+        await _replica_monitor_task
+    except asyncio.CancelledError:
+        pass
+    _replica_monitor_task = None
+
+
+def replica_stats() -> Dict[str, Any]:
+    """副本状态与读请求路由统计"""
+    return {
+        "replicas": len(replica_engines),
+        "lag_seconds": list(_replica_lag),
+        "max_lag_seconds": settings.REPLICA_MAX_LAG_SECONDS,
+        "routing": dict(_read_routing),
+        "sticky_users": len(_recent_writers),
+    }
+
+
+register_collector("read_replicas", replica_stats)
+register_collector("db_pool", pool_snapshot)
 
 
 # 数据库健康检查
 async def check_db_health():
     """检查数据库健康状态"""
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT 1"))
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
             return {"status": "healthy", "message": "数据库连接正常"}
     except Exception as e:
         return {"status": "unhealthy", "message": f"数据库连接异常: {e}"}
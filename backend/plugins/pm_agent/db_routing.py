@@ -0,0 +1,44 @@
+"""
+只读请求的数据库会话路由
+
+列表与报表类接口使用 get_read_db 代替 get_db：在配置了只读副本时，
+读请求被分发到延迟正常的副本；当前用户刚写入过数据时仍走主库，保证读己之写。
+多进程部署时写入用户经失效广播同步到所有进程，写入后的读请求落到任一进程都走主库。
+"""
+
+from fastapi import Depends
+from sqlalchemy import event
+from database import PrimarySession, mark_recent_write, pin_reads_to_primary, route_read
+from invalidation import RESET_ALL, notify_in_transaction, subscribe
+from models import User
+from security import get_current_user
+
+
+TOPIC = "recent_writers"
+
+
+@event.listens_for(PrimarySession, "before_commit")
+def _broadcast_writer(session):
+    """写事务提交前在同一事务中广播写入用户，其他进程与提交同时得知，早于响应返回客户端"""
+    user_id = session.info.get("user_id")
+    if user_id and (session.info.get("has_writes") or session.new or session.dirty or session.deleted):
+        notify_in_transaction(session, TOPIC, user_id)
+
+
+def _on_writer_message(payload: str) -> None:
+    if not payload or payload == RESET_ALL:
+        # 监听重连期间的写入消息可能丢失
+        pin_reads_to_primary()
+    else:
+        mark_recent_write(payload)
+
+
+subscribe(TOPIC, _on_writer_message)
+
+
+async def get_read_db(current_user: User = Depends(get_current_user)):
+    """获取只读数据库会话（info["read_target"] 为本次请求的路由目标，供缓存判断数据来源）"""
+    read_target, session_factory = route_read(str(current_user.id))
+    async with session_factory() as db:
+        db.info["read_target"] = read_target
+        yield db
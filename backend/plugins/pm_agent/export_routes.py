@@ -0,0 +1,81 @@
+"""
+数据导出路由：面向数据团队的列式（Parquet / Arrow IPC）批量导出
+"""
+
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from config import settings
+from database import read_session_factory
+from export_service import ARROW_DATASETS, ARROW_FORMATS, arrow_available, export_query, stream_arrow
+from models import User
+from permissions import is_manager_or_admin
+from security import get_current_user
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/exports", tags=["Data Export"])
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("parquet", description="输出格式: parquet / arrow（Arrow IPC 流）"),
+    since: Optional[datetime] = Query(None, description="增量导出水位：只导出水位列晚于该时间的行，取上次响应头 X-Export-Watermark 的值"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    导出数据集（tasks / task_history / task_deletion_logs）
+
+    结果通过服务端游标分批读取，逐批写入 Parquet 行组或 Arrow 记录批次并流式输出。
+    水位列分别为任务的 updated_at（包含已删除任务）、历史的 changed_at 与删除日志的 deleted_at；
+    响应头 X-Export-Watermark 给出本次导出的水位上限，作为下次增量导出的 since。
+    只有管理员和项目经理可以导出。
+    """
+    if not is_manager_or_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="只有管理员和项目经理可以导出数据"
+        )
+    if dataset not in ARROW_DATASETS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"未知的数据集: {dataset}. 有效选项: {list(ARROW_DATASETS)}"
+        )
+    if format not in ARROW_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无效的导出格式: {format}. 有效选项: {list(ARROW_FORMATS)}"
+        )
+    if not arrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="服务端未安装 pyarrow，无法导出 Parquet / Arrow"
+        )
+
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # 水位上限回退一段时间：提交较晚的事务与副本延迟中的行留给下次导出
+    until = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_WATERMARK_LAG_SECONDS)
+    if since is not None and since >= until:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since 必须早于当前可导出的水位上限"
+        )
+
+    media_type, extension = ARROW_FORMATS[format]
+    headers = {
+        "Content-Disposition": f'attachment; filename="{dataset}.{extension}"',
+        "X-Export-Watermark": until.isoformat(),
+    }
+    if since is not None:
+        headers["X-Export-Since"] = since.isoformat()
+
+    logger.info(f"用户 {current_user.username} 导出 {dataset}（{format}，since={since}）")
+    return StreamingResponse(
+        stream_arrow(read_session_factory(str(current_user.id)), dataset, export_query(dataset, since, until), format),
+        media_type=media_type,
+        headers=headers
+    )
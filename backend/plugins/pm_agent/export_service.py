@@ -0,0 +1,326 @@
+"""
+数据导出服务
+
+通过服务端游标分批读取查询结果并流式生成CSV或 Parquet / Arrow IPC，
+内存占用只与批大小有关，与导出行数无关。Parquet / Arrow 导出依赖可选的 pyarrow。
+"""
+
+from datetime import datetime
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from config import settings
+from models import Task, TaskDeletionLog, TaskHistory
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+import csv
+import io
+import logging
+import time
+import zlib
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 可选依赖
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+
+# Excel 依赖 BOM 识别 UTF-8 编码
+UTF8_BOM = "\ufeff"
+
+# 以这些字符开头的单元格会被电子表格当作公式执行
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def accepts_gzip(request: Request) -> bool:
+    """客户端是否接受 gzip 内容编码（忽略 q=0 的声明）"""
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def _csv_value(value: Any) -> Any:
+    """转换单元格的值：时间使用ISO格式，文本防止公式注入"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def stream_csv(
+    session_factory: async_sessionmaker,
+    query,
+    header: Sequence[str],
+    gzip: bool = False,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    流式导出查询结果为CSV
+
+    Args:
+        session_factory: 会话工厂（生成器在响应发送期间独立持有会话）
+        query: 查询，选取的列与 header 一一对应
+        header: 表头
+        gzip: 是否以 gzip 压缩输出
+        batch_size: 服务端游标每批读取的行数，默认取配置
+
+    Yields:
+        bytes: UTF-8（带BOM）编码的CSV数据块，每批行一个数据块
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    buffer.write(UTF8_BOM)
+    writer.writerow(header)
+    yield flush()
+
+    started = time.perf_counter()
+    exported = 0
+    try:
+        async with session_factory() as db:
+            result = await db.stream(
+                query.execution_options(yield_per=batch_size or settings.TASK_EXPORT_BATCH_SIZE)
+            )
+            async for rows in result.partitions():
+                writer.writerows([_csv_value(value) for value in row] for row in rows)
+                exported += len(rows)
+                chunk = flush()
+                if chunk:
+                    yield chunk
+    except Exception as e:
+        # 响应头已发送，只能中断传输
+        logger.error(f"导出CSV时发生错误（已导出 {exported} 行）: {e}")
+        raise
+
+    if compressor:
+        yield compressor.flush()
+    logger.info(f"导出CSV完成: {exported} 行，耗时 {time.perf_counter() - started:.2f}s")
+
+
+# 列式导出的数据集：水位列（增量导出依据）与导出列及其类型
+# 类型: uuid / timestamp（UTC）/ dictionary（低基数字符串，字典编码）/ string
+ARROW_DATASETS: Dict[str, Dict[str, Any]] = {
+    "tasks": {
+        "watermark": Task.updated_at,
+        "columns": [
+            (Task.id, "uuid"),
+            (Task.title, "string"),
+            (Task.description, "string"),
+            (Task.assignee_id, "uuid"),
+            (Task.due_date, "timestamp"),
+            (Task.priority, "dictionary"),
+            (Task.status, "dictionary"),
+            (Task.created_by, "uuid"),
+            (Task.created_at, "timestamp"),
+            (Task.updated_at, "timestamp"),
+            (Task.deleted_at, "timestamp"),
+        ],
+    },
+    "task_history": {
+        "watermark": TaskHistory.changed_at,
+        "columns": [
+            (TaskHistory.id, "uuid"),
+            (TaskHistory.task_id, "uuid"),
+            (TaskHistory.field_name, "dictionary"),
+            (TaskHistory.old_value, "string"),
+            (TaskHistory.new_value, "string"),
+            (TaskHistory.changed_by, "uuid"),
+            (TaskHistory.changed_at, "timestamp"),
+        ],
+    },
+    "task_deletion_logs": {
+        "watermark": TaskDeletionLog.deleted_at,
+        "columns": [
+            (TaskDeletionLog.id, "uuid"),
+            (TaskDeletionLog.task_id, "uuid"),
+            (TaskDeletionLog.deleted_by, "uuid"),
+            (TaskDeletionLog.deletion_reason, "string"),
+            (TaskDeletionLog.deleted_at, "timestamp"),
+        ],
+    },
+}
+
+# 输出格式 -> (媒体类型, 文件扩展名)
+ARROW_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+def arrow_available() -> bool:
+    """是否安装了 pyarrow"""
+    return pa is not None
+
+
+def _arrow_type(kind: str):
+    if kind == "uuid":
+        # pyarrow 18 起提供 UUID 扩展类型（Parquet 中写为 UUID 逻辑类型）
+        return pa.uuid() if hasattr(pa, "uuid") else pa.binary(16)
+    if kind == "timestamp":
+        return pa.timestamp("us", tz="UTC")
+    if kind == "dictionary":
+        return pa.dictionary(pa.int16(), pa.string())
+    return pa.string()
+
+
+def arrow_schema(dataset: str):
+    """数据集的 Arrow 模式"""
+    return pa.schema([
+        pa.field(column.key, _arrow_type(kind), nullable=column.nullable)
+        for column, kind in ARROW_DATASETS[dataset]["columns"]
+    ])
+
+
+def export_query(dataset: str, since: Optional[datetime], until: datetime):
+    """
+    构造数据集的导出查询
+
+    Args:
+        dataset: 数据集名称
+        since: 水位下限（不含），为空时全量导出
+        until: 水位上限（含），作为下次增量导出的 since
+
+    Returns:
+        按水位列与主键排序的查询
+    """
+    spec = ARROW_DATASETS[dataset]
+    watermark = spec["watermark"]
+    columns = [column for column, _ in spec["columns"]]
+    query = select(*columns).where(watermark <= until)
+    if since is not None:
+        query = query.where(watermark > since)
+    return query.order_by(watermark, columns[0])
+
+
+def _record_batch(rows: Sequence[Sequence[Any]], schema, kinds: List[str]):
+    """将一批行转换为 RecordBatch"""
+    arrays = []
+    for index, (field, kind) in enumerate(zip(schema, kinds)):
+        values = [row[index] for row in rows]
+        if kind == "uuid":
+            storage = pa.array([value.bytes if value is not None else None for value in values], type=pa.binary(16))
+            arrays.append(pa.ExtensionArray.from_storage(field.type, storage) if hasattr(pa, "uuid") else storage)
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """供 pyarrow 写入的类文件对象，写入的数据暂存后按块取出"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def stream_arrow(
+    session_factory: async_sessionmaker,
+    dataset: str,
+    query,
+    fmt: str = "parquet",
+    batch_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    流式导出数据集为 Parquet 或 Arrow IPC 流
+
+    Args:
+        session_factory: 会话工厂（生成器在响应发送期间独立持有会话）
+        dataset: 数据集名称
+        query: export_query 构造的查询
+        fmt: parquet / arrow
+        batch_size: 服务端游标每批读取的行数，默认取配置
+
+    Yields:
+        bytes: 文件数据块。Parquet 按行组输出（行组大小见 EXPORT_PARQUET_ROW_GROUP_ROWS），
+        Arrow IPC 每批行输出一个记录批次
+    """
+    schema = arrow_schema(dataset)
+    kinds = [kind for _, kind in ARROW_DATASETS[dataset]["columns"]]
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    pending: List[Any] = []
+    pending_rows = 0
+
+    def write_row_group() -> None:
+        nonlocal pending_rows
+        writer.write_table(pa.Table.from_batches(pending, schema=schema))
+        pending.clear()
+        pending_rows = 0
+
+    started = time.perf_counter()
+    exported = 0
+    try:
+        async with session_factory() as db:
+            result = await db.stream(
+                query.execution_options(yield_per=batch_size or settings.TASK_EXPORT_BATCH_SIZE)
+            )
+            async for rows in result.partitions():
+                batch = _record_batch(rows, schema, kinds)
+                exported += len(rows)
+                if fmt == "parquet":
+                    # 累积到行组大小再写入，避免产生大量小行组
+                    pending.append(batch)
+                    pending_rows += len(rows)
+                    if pending_rows >= settings.EXPORT_PARQUET_ROW_GROUP_ROWS:
+                        write_row_group()
+                else:
+                    writer.write_batch(batch)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        if pending:
+            write_row_group()
+        writer.close()
+    except Exception as e:
+        # 响应头已发送，只能中断传输
+        logger.error(f"导出 {dataset}（{fmt}）时发生错误（已导出 {exported} 行）: {e}")
+        raise
+
+    yield sink.drain()
+    logger.info(f"导出 {dataset}（{fmt}）完成: {exported} 行，耗时 {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,116 @@
+"""
+健康检查快照
+
+后台任务定期探测数据库并缓存结果，探针接口只读取缓存与连接池的内存状态，
+不为每次探测占用连接。
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from config import settings
+from database import check_db_health
+from pool_metrics import pool_snapshot
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+_snapshot: Optional[Dict[str, Any]] = None
+_snapshot_monotonic = 0.0
+_monitor_task: Optional[asyncio.Task] = None
+
+
+async def probe_database() -> Dict[str, Any]:
+    """执行一次数据库探测并更新缓存快照"""
+    global _snapshot, _snapshot_monotonic
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(check_db_health(), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        result = {"status": "unhealthy", "message": "数据库探测超时"}
+    latency_ms = (time.perf_counter() - started) * 1000
+    _snapshot = {
+        **result,
+        "latency_ms": round(latency_ms, 2),
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+    _snapshot_monotonic = time.monotonic()
+    return _snapshot
+
+
+async def get_database_health() -> Dict[str, Any]:
+    """获取缓存的数据库健康状态（尚无快照时立即探测一次）"""
+    if _snapshot is None:
+        return await probe_database()
+    return {**_snapshot, "age_seconds": round(time.monotonic() - _snapshot_monotonic, 2)}
+
+
+def pool_saturation() -> Dict[str, Any]:
+    """主库连接池占用率（已借出连接数 / 池容量上限）"""
+    primary = pool_snapshot().get("primary", {})
+    capacity = primary.get("size", 0) + max(primary.get("max_overflow", 0), 0)
+    checked_out = primary.get("checked_out", 0)
+    return {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+        "checkout_timeouts": primary.get("checkout_timeouts", 0),
+    }
+
+
+async def readiness() -> Dict[str, Any]:
+    """
+    就绪状态
+
+    数据库探测失败、快照过期或连接池占用率超过阈值时视为未就绪，
+    负载均衡据此摘除饱和实例
+    """
+    database = await get_database_health()
+    pool = pool_saturation()
+    reasons = []
+    if database.get("status") != "healthy":
+        reasons.append("database_unhealthy")
+    if database.get("age_seconds", 0) > settings.HEALTH_STALE_AFTER_SECONDS:
+        reasons.append("health_snapshot_stale")
+    if pool["saturation"] >= settings.READINESS_MAX_POOL_SATURATION:
+        reasons.append("pool_saturated")
+    return {
+        "status": "ready" if not reasons else "not_ready",
+        "reasons": reasons,
+        "database": database,
+        "pool": pool,
+    }
+
+
+async def _monitor() -> None:
+    """周期性刷新健康快照"""
+    while True:
+        await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+        try:
+            await probe_database()
+        except Exception as e:
+            logger.error(f"健康检查探测失败: {e}")
+
+
+async def start_health_monitor() -> None:
+    """启动后台健康探测"""
+    global _monitor_task
+    if _monitor_task is not None:
+        return
+    await probe_database()
+    _monitor_task = asyncio.create_task(_monitor())
+
+
+async def stop_health_monitor() -> None:
+    """停止后台健康探测"""
+    global _monitor_task
+    if _monitor_task is None:
+        return
+    _monitor_task.cancel()
+    try:
+        await _monitor_task
+    except asyncio.CancelledError:
+        pass
+    _monitor_task = None
@@ -0,0 +1,141 @@
+"""
+缓存失效广播
+
+进程内缓存通过主题订阅失效消息。配置 CACHE_INVALIDATION_CHANNEL 后，
+失效消息还会经由 PostgreSQL LISTEN/NOTIFY 广播给其他工作进程。
+"""
+
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from config import settings
+from database import engine
+import asyncio
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# 表示“全部失效”的载荷（监听连接重建期间可能丢失消息）
+RESET_ALL = "*"
+
+# 当前进程标识，用于忽略自己发出的广播
+_origin = uuid.uuid4().hex
+
+_handlers: Dict[str, List[Callable[[str], None]]] = {}
+_listener_task: Optional[asyncio.Task] = None
+
+
+def subscribe(topic: str, handler: Callable[[str], None]) -> None:
+    """订阅主题的失效消息"""
+    _handlers.setdefault(topic, []).append(handler)
+
+
+def _dispatch(topic: str, payload: str) -> None:
+    """在本进程内分发失效消息"""
+    for handler in _handlers.get(topic, []):
+        try:
+            handler(payload)
+        except Exception as e:
+            logger.error(f"处理失效消息失败 topic={topic}: {e}")
+
+
+def _dispatch_reset() -> None:
+    """通知所有订阅者整体失效"""
+    for topic in list(_handlers):
+        _dispatch(topic, RESET_ALL)
+
+
+def _message(topic: str, payload: str) -> str:
+    return json.dumps({"origin": _origin, "topic": topic, "payload": payload})
+
+
+async def publish(topic: str, payload: str) -> None:
+    """
+    发布失效消息
+
+    本进程立即生效；启用广播时再通过 pg_notify 通知其他进程。应在数据提交之后调用。
+    """
+    _dispatch(topic, payload)
+    channel = settings.CACHE_INVALIDATION_CHANNEL
+    if not channel:
+        return
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(select(func.pg_notify(channel, _message(topic, payload))))
+            await conn.commit()
+    except Exception as e:
+        logger.error(f"广播失效消息失败: {e}")
+
+
+def notify_in_transaction(session: Session, topic: str, payload: str) -> None:
+    """
+    在会话当前事务中广播消息（不分发到本进程）
+
+    NOTIFY 随事务提交送达其他进程、回滚则不发送，消息不会早于或晚于数据可见；
+    用于同步的会话事件，本进程的处理由调用方自行完成。
+    """
+    channel = settings.CACHE_INVALIDATION_CHANNEL
+    if channel:
+        session.execute(select(func.pg_notify(channel, _message(topic, payload))))
+
+
+def _on_notification(connection, pid, channel, message) -> None:
+    """处理来自其他进程的失效消息"""
+    try:
+        data = json.loads(message)
+    except ValueError:
+        logger.warning(f"忽略无法解析的失效消息: {message}")
+        return
+    if data.get("origin") == _origin:
+        return
+    _dispatch(data.get("topic", ""), data.get("payload", RESET_ALL))
+
+
+async def _listen_forever(channel: str) -> None:
+    """保持监听连接，断开后自动重连"""
+    import asyncpg
+
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(dsn)
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: lost.set())
+            await conn.add_listener(channel, _on_notification)
+            # 建立监听之前的消息可能已丢失，保守地清空本地缓存
+            _dispatch_reset()
+            logger.info(f"已订阅缓存失效频道: {channel}")
+            await lost.wait()
+            logger.warning("缓存失效监听连接已断开，准备重连")
+        except asyncio.CancelledError:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+            raise
+        except Exception as e:
+            logger.error(f"缓存失效监听失败: {e}")
+        await asyncio.sleep(5)
+
+
+async def start_listener() -> None:
+    """启动跨进程失效监听（未配置频道时不启动）"""
+    global _listener_task
+    channel = settings.CACHE_INVALIDATION_CHANNEL
+    if not channel or _listener_task is not None:
+        return
+    _listener_task = asyncio.create_task(_listen_forever(channel))
+
+
+async def stop_listener() -> None:
+    """停止跨进程失效监听"""
+    global _listener_task
+    if _listener_task is None:
+        return
+    _listener_task.cancel()
+    try:
+        await _listener_task
+    except asyncio.CancelledError:
+        pass
+    _listener_task = None
@@ -0,0 +1,74 @@
+"""
+运行指标登记
+
+各模块以采集函数的形式登记自身的指标（如缓存命中率），
+由管理接口统一读取输出（JSON 或 Prometheus 文本格式）。
+"""
+
+from typing import Any, Callable, Dict, List
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_collector(name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+    """登记指标采集函数，同名登记会覆盖之前的函数"""
+    _collectors[name] = collector
+
+
+def collect() -> Dict[str, Dict[str, Any]]:
+    """采集全部已登记的指标"""
+    snapshot: Dict[str, Dict[str, Any]] = {}
+    for name, collector in _collectors.items():
+        try:
+            snapshot[name] = collector()
+        except Exception as e:
+            logger.warning(f"采集指标 {name} 失败: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _metric_name(*parts: str) -> str:
+    return _NAME_RE.sub("_", "_".join(part for part in parts if part))
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _render(prefix: str, value: Any, lines: List[str]) -> None:
+    """将嵌套字典展开为 Prometheus 文本格式的样本"""
+    if isinstance(value, dict):
+        if prefix.endswith("_buckets"):
+            name = prefix[:-len("_buckets")] + "_bucket"
+            for bound, count in value.items():
+                lines.append(f'{name}{{le="{bound}"}} {count}')
+            return
+        for key, item in value.items():
+            _render(_metric_name(prefix, str(key)), item, lines)
+    elif isinstance(value, (list, tuple)):
+        for index, item in enumerate(value):
+            if _is_number(item):
+                lines.append(f'{prefix}{{index="{index}"}} {float(item)}')
+    elif _is_number(value):
+        lines.append(f"{prefix} {float(value)}")
+
+
+def render_prometheus(namespace: str = "pm_agent") -> str:
+    """
+    以 Prometheus 文本格式输出全部指标
+
+    嵌套字段以下划线拼接为指标名，以 _buckets 结尾的字典输出为直方图桶，
+    非数值字段（如 None、字符串）被忽略
+    """
+    lines: List[str] = []
+    for name, data in collect().items():
+        _render(_metric_name(namespace, name), data, lines)
+    return "\n".join(lines) + "\n"
@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import settings
 from models import Base
+from search import tokenize_document
 import logging
 
 # 配置日志
@@ -28,6 +29,85 @@ def create_tables():
         return False
 
 
+# 已存在数据库的结构升级语句（需保持幂等）
+SCHEMA_UPGRADES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector",
+]
+
+
+def apply_schema_upgrades():
+    """对已存在的表执行结构升级"""
+    try:
+        engine = create_engine(settings.DATABASE_URL)
+        with engine.begin() as conn:
+            for statement in SCHEMA_UPGRADES:
+                conn.execute(text(statement))
+        logger.info("数据库结构升级完成")
+        return True
+    except Exception as e:
+        logger.error(f"数据库结构升级失败: {e}")
+        return False
+
+
+def backfill_search_vectors(batch_size: int = 1000):
+    """
+    分批回填任务的全文检索向量
+
+    按主键顺序每次处理 batch_size 行并单独提交，避免长事务与大量锁
+    """
+    try:
+        engine = create_engine(settings.DATABASE_URL)
+        update_sql = text("""
+            UPDATE tasks
+            SET search_vector = setweight(array_to_tsvector(CAST(:title_tokens AS text[])), 'A')
+                || setweight(array_to_tsvector(CAST(:description_tokens AS text[])), 'B')
+            WHERE id = :id
+        """)
+        last_id = "00000000-0000-0000-0000-000000000000"
+        total = 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(text("""
+                    SELECT id, title, description FROM tasks
+                    WHERE search_vector IS NULL AND id > CAST(:last_id AS uuid)
+                    ORDER BY id
+                    LIMIT :batch_size
+                """), {"last_id": last_id, "batch_size": batch_size}).fetchall()
+                if not rows:
+                    break
+                conn.execute(update_sql, [
+                    {
+                        "id": row.id,
+                        "title_tokens": tokenize_document(row.title),
+                        "description_tokens": tokenize_document(row.description),
+                    }
+                    for row in rows
+                ])
+            last_id = str(rows[-1].id)
+            total += len(rows)
+            logger.info(f"已回填 {total} 条任务的检索向量")
+        logger.info(f"检索向量回填完成，共 {total} 条")
+        return True
+    except Exception as e:
+        logger.error(f"检索向量回填失败: {e}")
+        return False
+
+
+def create_indexes():
+    """为已存在的表补建模型中声明的索引（已存在的索引会被跳过）"""
+    try:
+        engine = create_engine(settings.DATABASE_URL)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        logger.info("数据库索引检查完成")
+        return True
+    except Exception as e:
+        logger.error(f"数据库索引创建失败: {e}")
+        return False
+
+
 def drop_tables():
     """删除所有表"""
     try:
@@ -94,8 +174,8 @@ if __name__ == "__main__":
     if tables:
         print(f"现有表状态: {tables}")
     
-    # 创建表
-    if create_tables():
+    # 创建表、升级结构、补建索引并回填数据
+    if create_tables() and apply_schema_upgrades() and create_indexes() and backfill_search_vectors():
         print("数据库迁移完成")
     else:
         print("数据库迁移失败")
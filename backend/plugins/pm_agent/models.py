@@ -2,9 +2,9 @@
 项目管理 Agent 数据模型
 """
 
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, Index, DDL, event, text, BigInteger, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from database import Base
 import uuid
@@ -42,6 +42,10 @@ class TaskStatus(str, enum.Enum):
     OVERDUE = "overdue"
 
 
+# 未完成且尚未标记逾期的状态（逾期扫描的对象，与 idx_tasks_open_due_date 的条件一致）
+OPEN_TASK_STATUSES = (TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value, TaskStatus.BLOCKED.value)
+
+
 class User(Base):
     """用户模型"""
     __tablename__ = "users"
@@ -58,6 +62,15 @@ class User(Base):
     # 关系
     created_tasks = relationship("Task", foreign_keys="Task.created_by", back_populates="creator")
     assigned_tasks = relationship("Task", foreign_keys="Task.assignee_id", back_populates="assignee")
+    
+    __table_args__ = (
+        # 用户检索的三元组索引（支持 ILIKE '%q%' 与相似度匹配）
+        Index("idx_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+        Index("idx_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        # 短输入的前缀匹配索引
+        Index("idx_users_username_lower_prefix", text("lower(username) text_pattern_ops")),
+        Index("idx_users_email_lower_prefix", text("lower(email) text_pattern_ops")),
+    )
 
 
 class Task(Base):
@@ -75,11 +88,30 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # 全文检索向量（由 search.search_vector_expr 维护，默认不加载）
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     
     # 关系
     assignee = relationship("User", foreign_keys=[assignee_id], back_populates="assigned_tasks")
     creator = relationship("User", foreign_keys=[created_by], back_populates="created_tasks")
     history = relationship("TaskHistory", back_populates="task")
+    
+    __table_args__ = (
+        # 任务列表键集分页索引（仅覆盖未删除任务）
+        Index("idx_tasks_created_at_id", "created_at", "id", postgresql_where=deleted_at.is_(None)),
+        Index("idx_tasks_due_date_id", "due_date", "id", postgresql_where=deleted_at.is_(None)),
+        # 逾期扫描索引（仅覆盖未删除、未完成且未逾期的任务）
+        Index(
+            "idx_tasks_open_due_date", "due_date",
+            postgresql_where=deleted_at.is_(None) & status.in_(OPEN_TASK_STATUSES)
+        ),
+        # 回收站列表键集分页索引（仅覆盖已删除任务）
+        Index("idx_tasks_deleted_at_id", "deleted_at", "id", postgresql_where=deleted_at.isnot(None)),
+        # 增量导出按更新时间扫描（包含已删除任务）
+        Index("idx_tasks_updated_at_id", "updated_at", "id"),
+        # 全文检索索引
+        Index("idx_tasks_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
 
 class TaskHistory(Base):
@@ -97,6 +129,11 @@ class TaskHistory(Base):
     # 关系
     task = relationship("Task", back_populates="history")
     changer = relationship("User", foreign_keys=[changed_by])
+    
+    __table_args__ = (
+        # 增量导出按变更时间扫描
+        Index("idx_task_history_changed_at_id", "changed_at", "id"),
+    )
 
 
 class TaskDeletionLog(Base):
@@ -112,3 +149,43 @@ class TaskDeletionLog(Base):
     # 关系
     task = relationship("Task")
     deleter = relationship("User", foreign_keys=[deleted_by])
+    
+    __table_args__ = (
+        # 按任务查找最新删除日志
+        Index("idx_task_deletion_logs_task_deleted_at", "task_id", "deleted_at"),
+        # 增量导出按删除时间扫描
+        Index("idx_task_deletion_logs_deleted_at_id", "deleted_at", "id"),
+    )
+
+
+class TaskStatCounter(Base):
+    """任务统计计数模型：按负责人、优先级、状态汇总的未删除任务数"""
+    __tablename__ = "task_stat_counters"
+    
+    # 主键列不能为空，未分配负责人的任务记在全零UUID下
+    assignee_id = Column(UUID(as_uuid=True), primary_key=True)
+    priority = Column(String(10), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    task_count = Column(BigInteger, nullable=False, server_default=text("0"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TaskReminder(Base):
+    """任务提醒台账：记录已发送的提醒，保证同一截止时间的同类提醒只发送一次"""
+    __tablename__ = "task_reminders"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
+    reminder_type = Column(String(20), nullable=False)
+    # 发送提醒时任务的截止时间，截止时间变更后会重新提醒
+    due_date = Column(DateTime(timezone=True), nullable=False)
+    assignee_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    sent_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("task_id", "reminder_type", "due_date", name="uq_task_reminders_task_type_due"),
+    )
+
+
+# 建表前启用三元组扩展（用户检索索引依赖 gin_trgm_ops）
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
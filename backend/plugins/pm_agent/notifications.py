@@ -0,0 +1,74 @@
+"""
+消息通知
+
+- 邮件：SMTP_HOST 等配置
+- 飞书：FEISHU_BOT_TOKEN 为群自定义机器人 Webhook 地址中的令牌
+未配置的渠道不启用。
+"""
+
+from email.message import EmailMessage
+from config import settings
+import asyncio
+import httpx
+import logging
+import smtplib
+
+logger = logging.getLogger(__name__)
+
+
+FEISHU_WEBHOOK_URL = "https://open.feishu.cn/open-apis/bot/v2/hook/{token}"
+
+# 外部服务请求超时（秒）
+_TIMEOUT_SECONDS = 10.0
+
+
+def email_enabled() -> bool:
+    """是否配置了邮件发送"""
+    return bool(settings.SMTP_HOST)
+
+
+def feishu_enabled() -> bool:
+    """是否配置了飞书机器人"""
+    return bool(settings.FEISHU_BOT_TOKEN)
+
+
+def _send_email_sync(to: str, subject: str, body: str) -> None:
+    message = EmailMessage()
+    message["From"] = settings.SMTP_USERNAME or f"pm-agent@{settings.SMTP_HOST}"
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=_TIMEOUT_SECONDS) as smtp:
+        if settings.SMTP_TLS:
+            smtp.starttls()
+        if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+            smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        smtp.send_message(message)
+
+
+async def send_email(to: str, subject: str, body: str) -> None:
+    """
+    发送纯文本邮件（在线程中执行阻塞的SMTP会话）
+
+    Raises:
+        Exception: 连接、认证或发送失败
+    """
+    await asyncio.to_thread(_send_email_sync, to, subject, body)
+
+
+async def send_feishu_text(text: str) -> None:
+    """
+    通过飞书群机器人发送文本消息
+
+    Raises:
+        httpx.HTTPError: 请求失败
+        RuntimeError: 飞书返回错误码
+    """
+    url = FEISHU_WEBHOOK_URL.format(token=settings.FEISHU_BOT_TOKEN)
+    async with httpx.AsyncClient(timeout=_TIMEOUT_SECONDS) as client:
+        response = await client.post(url, json={"msg_type": "text", "content": {"text": text}})
+    response.raise_for_status()
+    data = response.json()
+    code = data.get("code", data.get("StatusCode", 0))
+    if code != 0:
+        raise RuntimeError(f"飞书机器人返回错误 {code}: {data.get('msg') or data.get('StatusMessage')}")
@@ -0,0 +1,156 @@
+"""
+逾期任务扫描服务
+
+按批将已过截止时间且未完成的任务标记为逾期：每批一条 UPDATE ... RETURNING，
+历史记录与统计计数在同一事务中批量写入。扫描走 idx_tasks_open_due_date 部分索引，
+已完成或已逾期的任务不在索引中，每次运行的开销只与新逾期的任务数有关。
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from metrics import register_collector
+from models import OPEN_TASK_STATUSES, Task, TaskStatus, User, UserRole, UserStatus
+from password_hashing import hash_password
+from task_history_service import insert_history_rows
+from task_list_cache import tasks_changed
+from task_stats_service import apply_stat_changes, stat_key, task_stat_key
+from typing import Any, Dict, Optional
+import logging
+import secrets
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+# 系统操作用户ID（启动时解析，之后用户改名不影响）
+_system_actor_id: Optional[uuid.UUID] = None
+
+_sweep_stats: Dict[str, Any] = {
+    "runs": 0,
+    "marked_overdue": 0,
+    "last_marked": 0,
+    "last_run_at": None,
+}
+
+
+async def ensure_system_actor(db: AsyncSession) -> uuid.UUID:
+    """
+    取得系统操作用户ID，不存在时创建
+
+    系统用户为停用状态，密码为随机值，不能登录；多进程同时启动时由唯一约束保证只创建一个。
+    取得后缓存在进程内；数据库不可用等错误直接抛出，由逾期扫描任务记录并在下个周期重试。
+
+    Args:
+        db: 数据库会话（主库）
+
+    Returns:
+        uuid.UUID: 系统操作用户ID
+    """
+    global _system_actor_id
+    username = settings.SYSTEM_ACTOR_USERNAME
+    actor_id = await db.scalar(select(User.id).where(User.username == username))
+    if actor_id is None:
+        await db.execute(
+            pg_insert(User)
+            .values(
+                id=uuid.uuid4(),
+                username=username,
+                email=f"{username}@system.invalid",
+                password_hash=await hash_password(secrets.token_urlsafe(32)),
+                role=UserRole.MEMBER.value,
+                status=UserStatus.INACTIVE.value
+            )
+            .on_conflict_do_nothing()
+        )
+        await db.commit()
+        actor_id = await db.scalar(select(User.id).where(User.username == username))
+        if actor_id is None:
+            raise RuntimeError(f"无法创建系统操作用户 {username}（邮箱 {username}@system.invalid 可能已被占用）")
+        logger.info(f"已创建系统操作用户 {username}")
+    _system_actor_id = actor_id
+    return actor_id
+
+
+def overdue_sweep_statement(batch_size: int):
+    """
+    构造单批逾期标记语句
+
+    CTE 按截止时间取出并锁定一批到期任务（SKIP LOCKED：跳过正被其他事务修改的任务，
+    多进程同时扫描时互不等待），UPDATE 返回任务更新前的状态用于写历史与统计。
+    状态条件以常量写入SQL，保证规划器可以匹配部分索引。
+    """
+    due = (
+        select(Task.id, Task.status, Task.assignee_id, Task.priority)
+        .where(
+            Task.deleted_at.is_(None),
+            Task.status.in_([literal(value, literal_execute=True) for value in OPEN_TASK_STATUSES]),
+            Task.due_date < func.now()
+        )
+        .order_by(Task.due_date)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("due")
+    )
+    return (
+        update(Task)
+        .where(Task.id == due.c.id)
+        .values(status=TaskStatus.OVERDUE.value)
+        .returning(due.c.id, due.c.status, due.c.assignee_id, due.c.priority)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def sweep_overdue_tasks(db: AsyncSession, batch_size: Optional[int] = None) -> int:
+    """
+    将到期未完成的任务标记为逾期（每批单独提交）
+
+    Args:
+        db: 数据库会话（主库）
+        batch_size: 每批标记的任务数，默认取配置
+
+    Returns:
+        int: 本次标记的任务数
+    """
+    actor_id = _system_actor_id or await ensure_system_actor(db)
+    batch_size = batch_size or settings.OVERDUE_SWEEP_BATCH_SIZE
+    statement = overdue_sweep_statement(batch_size)
+    marked = 0
+    while True:
+        rows = (await db.execute(statement)).all()
+        if not rows:
+            await db.rollback()
+            break
+        await insert_history_rows(db, [
+            {
+                "task_id": row.id,
+                "field_name": "status",
+                "old_value": row.status,
+                "new_value": TaskStatus.OVERDUE.value,
+                "changed_by": actor_id,
+            }
+            for row in rows
+        ])
+        await apply_stat_changes(
+            db,
+            added=[stat_key(row.assignee_id, row.priority, TaskStatus.OVERDUE.value) for row in rows],
+            removed=[task_stat_key(row) for row in rows]
+        )
+        await db.commit()
+        await tasks_changed(*{row.assignee_id for row in rows})
+        marked += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    _sweep_stats["runs"] += 1
+    _sweep_stats["marked_overdue"] += marked
+    _sweep_stats["last_marked"] = marked
+    _sweep_stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+    if marked:
+        logger.info(f"逾期扫描将 {marked} 个任务标记为逾期")
+    return marked
+
+
+register_collector("overdue_sweeper", lambda: dict(_sweep_stats))
@@ -0,0 +1,204 @@
+"""
+分页工具：基于游标的键集分页（keyset pagination）与总数统计
+"""
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from datetime import datetime
+from cache import TTLCache
+from config import settings
+from database import READ_PRIMARY_STICKY
+from metrics import register_collector
+import base64
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+SORT_ORDERS = ("asc", "desc")
+
+# 总数统计模式：精确计数 / 查询规划器估算 / 不统计
+COUNT_MODES = ("exact", "estimated", "none")
+
+# 精确计数缓存（按规范化的过滤条件缓存，短TTL）
+count_cache = TTLCache(
+    maxsize=settings.COUNT_CACHE_MAX_ENTRIES,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+register_collector("count_cache", count_cache.stats)
+
+
+def _encode_value(value: Any) -> Any:
+    """将排序键值转换为可JSON序列化的形式"""
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"t": "uuid", "v": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """还原排序键值"""
+    if isinstance(value, dict):
+        if value.get("t") == "dt":
+            return datetime.fromisoformat(value["v"])
+        if value.get("t") == "uuid":
+            return uuid.UUID(value["v"])
+        raise ValueError("无法识别的游标值")
+    return value
+
+
+def encode_cursor(sort_by: str, sort_order: str, values: List[Any]) -> str:
+    """
+    生成不透明游标
+
+    Args:
+        sort_by: 排序字段名
+        sort_order: 排序方向（asc/desc）
+        values: 最后一行的排序键值（排序字段值，主键）
+
+    Returns:
+        str: URL安全的base64游标
+    """
+    payload = {"s": sort_by, "o": sort_order, "k": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    解析游标
+
+    Returns:
+        dict: 包含 sort_by、sort_order、values 的字典
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_by = payload["s"]
+        sort_order = payload["o"]
+        values = [_decode_value(v) for v in payload["k"]]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"无效的游标: {e}") from e
+    if sort_order not in SORT_ORDERS or not isinstance(sort_by, str):
+        raise ValueError("无效的游标: 排序参数错误")
+    return {"sort_by": sort_by, "sort_order": sort_order, "values": values}
+
+
+def apply_keyset(query, sort_column, id_column, sort_order: str, after: Optional[List[Any]] = None):
+    """
+    为查询附加稳定排序与键集条件
+
+    Args:
+        query: select 语句
+        sort_column: 排序列（非空列）
+        id_column: 主键列，作为排序的决胜键
+        sort_order: 排序方向
+        after: 上一页最后一行的 (排序值, 主键)，为空时返回第一页
+
+    Returns:
+        附加了 WHERE/ORDER BY 的 select 语句
+    """
+    descending = sort_order == "desc"
+    if after is not None:
+        row_key = tuple_(sort_column, id_column)
+        boundary = tuple(after)
+        query = query.where(row_key < boundary if descending else row_key > boundary)
+    if descending:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
+
+
+def count_cache_key(scope: str, **filters: Any) -> Hashable:
+    """
+    生成计数缓存键
+
+    忽略值为空的过滤条件，并按名称排序，保证相同的过滤组合得到相同的键
+    """
+    normalized = tuple(sorted((name, str(value)) for name, value in filters.items() if value not in (None, "")))
+    return (scope, normalized)
+
+
+async def estimate_count(db: AsyncSession, query) -> Optional[int]:
+    """
+    使用查询规划器的行数估算作为总数
+
+    Returns:
+        Optional[int]: 估算行数，无法估算时返回None
+    """
+    try:
+        sql = str(query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}))
+        conn = await db.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"估算总数失败: {e}")
+        return None
+
+
+async def fetch_page(
+    db: AsyncSession,
+    filtered_query,
+    page_query,
+    count_mode: str = "exact",
+    cache_key: Optional[Hashable] = None,
+    use_window: bool = True,
+    as_rows: bool = False,
+    cache_fill: bool = True
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    执行分页查询并按计数模式获取总数
+
+    Args:
+        db: 数据库会话
+        filtered_query: 仅包含过滤条件的查询（用于计数）
+        page_query: 附加了排序与分页的查询
+        count_mode: exact / estimated / none
+        cache_key: 精确计数的缓存键，为空时不缓存；读己之写窗口内的会话（固定到主库）不读取也不写入缓存
+        use_window: 精确计数未命中缓存时，是否通过窗口函数与分页查询合并为一次往返
+            （键集分页会过滤掉前面的行，此时必须为False）
+        as_rows: 分页查询选取多列时为True，返回完整的行而不是第一列
+        cache_fill: 为False时只读取不写入计数缓存（如副本可能尚未包含最近的写入）
+
+    Returns:
+        (当前页对象或行列表, 总数)
+    """
+    total: Optional[int] = None
+    if db.info.get("read_target") == READ_PRIMARY_STICKY:
+        cache_key = None
+    if count_mode == "exact" and cache_key is not None:
+        total = count_cache.get(cache_key)
+
+    window = count_mode == "exact" and total is None and use_window
+    if window:
+        page_query = page_query.add_columns(func.count().over().label("total_count"))
+
+    result = await db.execute(page_query)
+    if window:
+        rows = result.all()
+        items = [row[:-1] if as_rows else row[0] for row in rows]
+        if rows:
+            total = rows[0].total_count
+    elif as_rows:
+        items = list(result.all())
+    else:
+        items = list(result.scalars().all())
+
+    if count_mode == "exact":
+        if total is None:
+            total = await db.scalar(select(func.count()).select_from(filtered_query.subquery()))
+        if cache_key is not None and cache_fill:
+            count_cache.set(cache_key, total)
+    elif count_mode == "estimated":
+        total = await estimate_count(db, filtered_query)
+
+    return items, total
@@ -0,0 +1,126 @@
+"""
+密码哈希工作池
+
+bcrypt 单次计算耗时约 100-300ms，直接在异步处理函数中调用会阻塞事件循环。
+此模块将哈希与校验提交到独立的进程池执行，并限制排队数量：
+超过上限时立即返回 503 并附带 Retry-After，避免请求无限堆积。
+
+本模块不依赖数据库相关模块，以便进程池的子进程可以快速导入。
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from config import settings
+from metrics import register_collector
+import asyncio
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger(__name__)
+
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+# 已提交但尚未完成的任务数（仅在事件循环线程中读写）
+_pending = 0
+_rejected = 0
+
+
+def hash_password_sync(plain_password: str) -> str:
+    """在当前线程中计算密码哈希"""
+    return pwd_context.hash(plain_password)
+
+
+def verify_password_sync(plain_password: str, password_hash: str) -> bool:
+    """在当前线程中校验密码"""
+    return pwd_context.verify(plain_password, password_hash)
+
+
+def _verify_and_update(plain_password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """校验密码，若哈希参数已过时则同时返回新哈希"""
+    return pwd_context.verify_and_update(plain_password, password_hash)
+
+
+def _worker_count() -> int:
+    """进程池大小，未配置时取CPU核数"""
+    return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """按需创建进程池（使用 spawn，避免在运行中的事件循环里 fork）"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=_worker_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def _submit(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    提交任务到进程池
+
+    Raises:
+        HTTPException: 排队任务已满时返回503
+    """
+    global _pending, _rejected
+    if _pending >= settings.PASSWORD_HASH_QUEUE_SIZE:
+        _rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)}
+        )
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(plain_password: str) -> str:
+    """在进程池中计算密码哈希"""
+    return await _submit(hash_password_sync, plain_password)
+
+
+async def verify_password(plain_password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    在进程池中校验密码
+
+    Returns:
+        (是否匹配, 新哈希)：当 BCRYPT_ROUNDS 变化导致原哈希过时时返回新哈希，否则为None
+    """
+    return await _submit(_verify_and_update, plain_password, password_hash)
+
+
+def stats() -> Dict[str, Any]:
+    """工作池统计"""
+    return {
+        "workers": _worker_count(),
+        "started": _executor is not None,
+        "pending": _pending,
+        "queue_size": settings.PASSWORD_HASH_QUEUE_SIZE,
+        "rejected": _rejected,
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+    }
+
+
+register_collector("password_hashing", stats)
+
+
+def shutdown_pool() -> None:
+    """关闭进程池"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
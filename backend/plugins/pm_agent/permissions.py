@@ -3,7 +3,7 @@
 """
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import User, Task, UserRole
 from typing import Optional
 import logging
@@ -11,10 +11,33 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def can_edit_task(current_user: User, task: Task) -> bool:
+    """
+    判断用户是否可以编辑任务（不抛出异常，适用于批量操作）
+    
+    Args:
+        current_user: 当前用户
+        task: 任务对象或包含 assignee_id、created_by 的行
+        
+    Returns:
+        bool: 是否有权限编辑
+    """
+    # 管理员和项目经理可以编辑所有任务
+    if current_user.role in (UserRole.ADMIN.value, UserRole.MANAGER.value):
+        return True
+    
+    # 任务负责人可以编辑自己负责的任务
+    if task.assignee_id and current_user.id == task.assignee_id:
+        return True
+    
+    # 任务创建者可以编辑自己创建的任务
+    return current_user.id == task.created_by
+
+
 def check_task_edit_permission(
     current_user: User, 
     task: Task, 
-    db: Session
+    db: AsyncSession
 ) -> bool:
     """
     检查用户是否有权限编辑任务
@@ -30,23 +53,9 @@ def check_task_edit_permission(
     Raises:
         HTTPException: 权限不足时抛出异常
     """
-    # 管理员可以编辑所有任务
-    if current_user.role == UserRole.ADMIN.value:
+    if can_edit_task(current_user, task):
         return True
     
-    # 项目经理可以编辑所有任务
-    if current_user.role == UserRole.MANAGER.value:
-        return True
-    
-    # 任务负责人可以编辑自己负责的任务
-    if task.assignee_id and current_user.id == task.assignee_id:
-        return True
-    
-    # 任务创建者可以编辑自己创建的任务
-    if current_user.id == task.created_by:
-        return True
-    
-    # 其他情况无权限
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="您没有权限编辑此任务"
@@ -56,7 +65,7 @@ def check_task_edit_permission(
 def check_task_view_permission(
     current_user: User, 
     task: Task, 
-    db: Session
+    db: AsyncSession
 ) -> bool:
     """
     检查用户是否有权限查看任务
@@ -77,10 +86,45 @@ def check_task_view_permission(
     return True
 
 
+def task_visibility_scope(current_user: User) -> str:
+    """
+    用户可见的任务范围，用作列表缓存键的一部分
+    
+    可见范围相同的用户对同一查询得到相同结果，可共享缓存
+    
+    Args:
+        current_user: 当前用户
+        
+    Returns:
+        str: 可见范围标识
+    """
+    # 与 check_task_view_permission 保持一致：所有用户都可以查看全部任务
+    return "all"
+
+
+def can_delete_task(current_user: User, task: Task) -> bool:
+    """
+    判断用户是否可以删除任务（不抛出异常，适用于批量操作）
+    
+    Args:
+        current_user: 当前用户
+        task: 任务对象或包含 created_by 的行
+        
+    Returns:
+        bool: 是否有权限删除
+    """
+    # 管理员和项目经理可以删除所有任务
+    if current_user.role in (UserRole.ADMIN.value, UserRole.MANAGER.value):
+        return True
+    
+    # 任务创建者可以删除自己创建的任务
+    return current_user.id == task.created_by
+
+
 def check_task_delete_permission(
     current_user: User, 
     task: Task, 
-    db: Session
+    db: AsyncSession
 ) -> bool:
     """
     检查用户是否有权限删除任务
@@ -96,19 +140,9 @@ def check_task_delete_permission(
     Raises:
         HTTPException: 权限不足时抛出异常
     """
-    # 管理员可以删除所有任务
-    if current_user.role == UserRole.ADMIN.value:
-        return True
-    
-    # 项目经理可以删除所有任务
-    if current_user.role == UserRole.MANAGER.value:
-        return True
-    
-    # 任务创建者可以删除自己创建的任务
-    if current_user.id == task.created_by:
+    if can_delete_task(current_user, task):
         return True
     
-    # 其他情况无权限
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="您没有权限删除此任务"
@@ -0,0 +1,148 @@
+"""
+数据库连接池指标
+
+InstrumentedAsyncQueuePool 在获取连接时计时（包含排队等待、pre-ping 与新建连接），
+并记录新建连接耗时；连接失效通过池事件统计。
+"""
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Any, Dict, List, Optional
+import time
+
+
+# 获取连接耗时直方图的桶上限（秒）
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    """单个连接池的累计指标"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.checkout_buckets: List[int] = [0] * len(CHECKOUT_BUCKETS)
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+        self.connect_errors = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.pool: Optional["InstrumentedAsyncQueuePool"] = None
+
+    def observe_checkout(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.checkout_seconds_total += seconds
+        self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+        for index, bound in enumerate(CHECKOUT_BUCKETS):
+            if seconds <= bound:
+                self.checkout_buckets[index] += 1
+                break
+
+    def observe_connect(self, seconds: float) -> None:
+        self.connects += 1
+        self.connect_seconds_total += seconds
+        self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前指标快照（含连接池实时占用）"""
+        pool = self.pool
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(CHECKOUT_BUCKETS, self.checkout_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.checkouts
+        return {
+            "size": pool.size() if pool else 0,
+            "max_overflow": pool._max_overflow if pool else 0,
+            "timeout": pool.timeout() if pool else 0,
+            "checked_out": pool.checkedout() if pool else 0,
+            "checked_in": pool.checkedin() if pool else 0,
+            "overflow": max(pool.overflow(), 0) if pool else 0,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_seconds_avg": round(self.checkout_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            "checkout_seconds_max": round(self.checkout_seconds_max, 6),
+            "checkout_seconds_buckets": buckets,
+            "connects": self.connects,
+            "connect_errors": self.connect_errors,
+            "connect_seconds_avg": round(self.connect_seconds_total / self.connects, 6) if self.connects else 0.0,
+            "connect_seconds_max": round(self.connect_seconds_max, 6),
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """记录获取连接与新建连接耗时的异步队列连接池"""
+
+    stats: Optional[PoolStats] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            if self.stats:
+                self.stats.checkout_timeouts += 1
+            raise
+        finally:
+            if self.stats:
+                self.stats.observe_checkout(time.perf_counter() - started)
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            return super()._create_connection()
+        except Exception:
+            if self.stats:
+                self.stats.connect_errors += 1
+            raise
+        finally:
+            if self.stats:
+                self.stats.observe_connect(time.perf_counter() - started)
+
+    def recreate(self):
+        # dispose() 会重建连接池，需要保留统计对象
+        pool = super().recreate()
+        pool.stats = self.stats
+        if self.stats:
+            self.stats.pool = pool
+        return pool
+
+
+_pool_stats: Dict[str, PoolStats] = {}
+
+
+def instrument_engine(engine, name: str) -> PoolStats:
+    """
+    为使用 InstrumentedAsyncQueuePool 的引擎挂载统计
+
+    Args:
+        engine: 异步引擎
+        name: 连接池名称（如 primary、replica-0）
+    """
+    stats = PoolStats(name)
+    pool = engine.sync_engine.pool
+    pool.stats = stats
+    stats.pool = pool
+
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        stats.soft_invalidations += 1
+
+    event.listen(engine.sync_engine, "invalidate", on_invalidate)
+    event.listen(engine.sync_engine, "soft_invalidate", on_soft_invalidate)
+    _pool_stats[name] = stats
+    return stats
+
+
+def pool_snapshot() -> Dict[str, Dict[str, Any]]:
+    """所有连接池的指标快照"""
+    return {name: stats.snapshot() for name, stats in _pool_stats.items()}
@@ -0,0 +1,73 @@
+"""
+认证主体缓存
+
+缓存 JWT subject 对应的用户列值快照，使大部分已认证请求无需查询 users 表。
+用户被修改后通过 invalidate_principal 失效（可跨进程广播）。
+"""
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from typing import Any, Dict, Optional
+from cache import TTLCache
+from config import settings
+from invalidation import RESET_ALL, publish, subscribe
+from metrics import register_collector
+from models import User
+import uuid
+
+TOPIC = "principal"
+
+
+class PrincipalCache:
+    """按 subject 缓存用户快照的 TTL+LRU 缓存"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._columns = [attr.key for attr in sa_inspect(User).column_attrs]
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[Dict[str, Any]]:
+        """读取用户快照"""
+        return self._cache.get(subject)
+
+    def put(self, subject: str, user: User) -> None:
+        """缓存用户快照（仅保存列值，不保存ORM实例）"""
+        self._cache.set(subject, {key: getattr(user, key) for key in self._columns})
+
+    def attach(self, db: AsyncSession, snapshot: Dict[str, Any]) -> User:
+        """
+        将快照还原为绑定到当前会话的用户实例
+
+        实例被视为已持久化的干净对象，后续修改会正常生成UPDATE，且不会触发查询
+        """
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.sync_session.merge(user, load=False)
+
+    def invalidate_user(self, user_id: str) -> int:
+        """失效某个用户的所有缓存条目"""
+        self.invalidations += 1
+        if user_id == RESET_ALL:
+            size = len(self._cache)
+            self._cache.clear()
+            return size
+        return self._cache.discard_where(lambda _subject, snapshot: str(snapshot["id"]) == user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+subscribe(TOPIC, principal_cache.invalidate_user)
+register_collector("principal_cache", principal_cache.stats)
+
+
+async def invalidate_principal(user_id: uuid.UUID) -> None:
+    """用户信息变更后失效其认证缓存（需在提交之后调用）"""
+    await publish(TOPIC, str(user_id))
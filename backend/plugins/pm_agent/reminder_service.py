@@ -0,0 +1,374 @@
+"""
+任务截止提醒
+
+在截止时间前 REMINDER_LEAD_DAYS 天提醒负责人。每个进程维护一个按提醒时间排序的内存小顶堆：
+- 只从 idx_tasks_open_due_date 索引按截止时间窗口增量加载即将需要提醒的任务，不做全表扫描
+- 创建、更新任务（截止时间或状态变化）后通过失效广播更新各进程的堆
+- 到点后先写入提醒台账（唯一约束去重）再发送，重启或多进程同时触发都不会重复提醒
+- 通过已配置的渠道（飞书机器人、邮件）发送；所有渠道都失败时撤回台账稍后重试，
+  未配置任何渠道时不启动
+"""
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import AsyncSessionLocal
+from invalidation import RESET_ALL, publish, subscribe
+from metrics import register_collector
+from models import OPEN_TASK_STATUSES, Task, TaskReminder, User
+from notifications import email_enabled, feishu_enabled, send_email, send_feishu_text
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+TOPIC = "task_reminders"
+REMINDER_DUE_SOON = "due_soon"
+
+# 加载或发送失败后的重试间隔（秒）
+_RETRY_SECONDS = 30.0
+
+# 堆元素: (提醒时间, 任务ID, 截止时间)；任务的截止时间变化后旧元素按 _scheduled 判定为过期并丢弃
+_heap: List[Tuple[datetime, uuid.UUID, datetime]] = []
+_scheduled: Dict[uuid.UUID, datetime] = {}
+# 已加载到堆中的截止时间上限，为空表示需要重新加载
+_loaded_until: Optional[datetime] = None
+_wakeup: Optional[asyncio.Event] = None
+_engine_task: Optional[asyncio.Task] = None
+# 发送回调返回是否已发送（渠道不适用时返回False），发送失败时抛出异常
+ReminderHandler = Callable[[Dict[str, Any]], Awaitable[bool]]
+_handlers: List[ReminderHandler] = []
+# 启动时确定的发送回调：已配置的内置渠道与注册的回调
+_senders: List[ReminderHandler] = []
+
+_stats: Dict[str, Any] = {
+    "window_loads": 0,
+    "loaded_tasks": 0,
+    "sent": 0,
+    "failed": 0,
+    "discarded": 0,
+}
+
+
+def _lead() -> timedelta:
+    return timedelta(days=settings.REMINDER_LEAD_DAYS)
+
+
+def _window() -> timedelta:
+    return timedelta(hours=settings.REMINDER_WINDOW_HOURS)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def register_reminder_handler(handler: ReminderHandler) -> None:
+    """
+    注册提醒发送回调（需在启动提醒之前注册）
+
+    参数包含 task_id、title、assignee_id、assignee_username、assignee_email、due_date、reminder_type
+    """
+    _handlers.append(handler)
+
+
+def reminder_text(reminder: Dict[str, Any]) -> str:
+    """提醒消息正文"""
+    assignee = reminder.get("assignee_username") or "未分配"
+    due = _as_utc(reminder["due_date"]).strftime("%Y-%m-%d %H:%M UTC")
+    return f"任务「{reminder.get('title') or reminder['task_id']}」将于 {due} 截止，负责人：{assignee}"
+
+
+async def _feishu_reminder(reminder: Dict[str, Any]) -> bool:
+    await send_feishu_text(reminder_text(reminder))
+    return True
+
+
+async def _email_reminder(reminder: Dict[str, Any]) -> bool:
+    if not reminder.get("assignee_email"):
+        return False
+    await send_email(reminder["assignee_email"], f"任务即将截止：{reminder.get('title')}", reminder_text(reminder))
+    return True
+
+
+def _configured_senders() -> List[ReminderHandler]:
+    senders: List[ReminderHandler] = []
+    if feishu_enabled():
+        senders.append(_feishu_reminder)
+    if email_enabled():
+        senders.append(_email_reminder)
+    return senders + _handlers
+
+
+def task_reminder_entry(task: Any) -> Tuple[uuid.UUID, Optional[datetime]]:
+    """任务的提醒条目：已删除或不再处于未完成状态的任务不需要提醒"""
+    if task.deleted_at is not None or task.status not in OPEN_TASK_STATUSES:
+        return (task.id, None)
+    return (task.id, task.due_date)
+
+
+def _wake() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def _schedule(task_id: uuid.UUID, due_date: Optional[datetime]) -> None:
+    """更新任务在堆中的提醒（只接收已加载窗口内的截止时间，窗口外的由后续加载取得）"""
+    _scheduled.pop(task_id, None)
+    if due_date is None or _loaded_until is None:
+        return
+    due_date = _as_utc(due_date)
+    if due_date <= datetime.now(timezone.utc) or due_date > _loaded_until:
+        return
+    _scheduled[task_id] = due_date
+    heapq.heappush(_heap, (due_date - _lead(), task_id, due_date))
+    _wake()
+
+
+def _reset(wake: bool = True) -> None:
+    """清空堆，下次循环时重新加载窗口"""
+    global _loaded_until
+    _heap.clear()
+    _scheduled.clear()
+    _loaded_until = None
+    if wake:
+        _wake()
+
+
+def _on_message(payload: str) -> None:
+    # 空消息为批量变更；RESET_ALL 为监听连接重建后的全量失效，期间可能错过了变更
+    if not payload or payload == RESET_ALL:
+        _reset()
+        return
+    for item in payload.split(";"):
+        task_id, _, due = item.partition("=")
+        _schedule(uuid.UUID(task_id), datetime.fromisoformat(due) if due else None)
+
+
+async def reminders_changed(*entries: Tuple[uuid.UUID, Optional[datetime]]) -> None:
+    """
+    任务截止时间或状态变化后更新提醒（需在提交之后调用）
+
+    Args:
+        entries: task_reminder_entry 返回的 (任务ID, 截止时间) 条目，截止时间为空表示取消提醒；
+            不传时各进程重新加载提醒窗口（用于批量变更）
+    """
+    payload = ";".join(f"{task_id}={due.isoformat() if due else ''}" for task_id, due in entries)
+    await publish(TOPIC, payload)
+
+
+async def _load_window(db: AsyncSession, start: Optional[datetime], until: datetime) -> None:
+    """
+    加载截止时间在 (start, until] 内、尚未提醒的未完成任务
+
+    状态条件以常量写入SQL，保证规划器使用 idx_tasks_open_due_date 部分索引
+    """
+    already_sent = (
+        select(TaskReminder.id)
+        .where(
+            TaskReminder.task_id == Task.id,
+            TaskReminder.reminder_type == REMINDER_DUE_SOON,
+            TaskReminder.due_date == Task.due_date
+        )
+        .exists()
+    )
+    query = select(Task.id, Task.due_date).where(
+        Task.deleted_at.is_(None),
+        Task.status.in_([literal(value, literal_execute=True) for value in OPEN_TASK_STATUSES]),
+        Task.due_date > start,
+        Task.due_date <= until,
+        ~already_sent
+    )
+    loaded = 0
+    for row in await db.execute(query):
+        due_date = _as_utc(row.due_date)
+        if _scheduled.get(row.id) != due_date:
+            _scheduled[row.id] = due_date
+            heapq.heappush(_heap, (due_date - _lead(), row.id, due_date))
+            loaded += 1
+    _stats["window_loads"] += 1
+    _stats["loaded_tasks"] += loaded
+
+
+def _pop_due(now: datetime) -> Dict[uuid.UUID, datetime]:
+    """取出提醒时间已到的任务，丢弃截止时间已变化的过期元素"""
+    due: Dict[uuid.UUID, datetime] = {}
+    while _heap and _heap[0][0] <= now:
+        _, task_id, due_date = heapq.heappop(_heap)
+        if _scheduled.get(task_id) != due_date:
+            _stats["discarded"] += 1
+            continue
+        del _scheduled[task_id]
+        due[task_id] = due_date
+    return due
+
+
+async def _send_reminders(db: AsyncSession, due: Dict[uuid.UUID, datetime]) -> List[Dict[str, Any]]:
+    """
+    写入提醒台账并返回需要发送的提醒（附带任务标题与负责人信息）
+
+    只为截止时间未变、仍未完成且未删除的任务写入台账；唯一约束冲突（已由本进程重启前
+    或其他进程发送）的任务不返回。先提交台账再发送，多进程同时触发时只有一个进程发送。
+    """
+    # INSERT ... SELECT 中客户端生成的主键默认值只会求值一次，由数据库逐行生成
+    statement = pg_insert(TaskReminder).from_select(
+        ["id", "task_id", "reminder_type", "due_date", "assignee_id"],
+        select(func.gen_random_uuid(), Task.id, literal(REMINDER_DUE_SOON), Task.due_date, Task.assignee_id).where(
+            tuple_(Task.id, Task.due_date).in_(list(due.items())),
+            Task.deleted_at.is_(None),
+            Task.status.in_(OPEN_TASK_STATUSES)
+        )
+    ).on_conflict_do_nothing(
+        index_elements=[TaskReminder.task_id, TaskReminder.reminder_type, TaskReminder.due_date]
+    ).returning(TaskReminder.task_id, TaskReminder.assignee_id, TaskReminder.due_date, TaskReminder.reminder_type)
+    reminders = [dict(row._mapping) for row in await db.execute(statement)]
+    if reminders:
+        details = {
+            row.id: row
+            for row in await db.execute(
+                select(Task.id, Task.title, User.username, User.email)
+                .outerjoin(User, User.id == Task.assignee_id)
+                .where(Task.id.in_([reminder["task_id"] for reminder in reminders]))
+            )
+        }
+        for reminder in reminders:
+            row = details[reminder["task_id"]]
+            reminder.update(title=row.title, assignee_username=row.username, assignee_email=row.email)
+    await db.commit()
+    _stats["discarded"] += len(due) - len(reminders)
+    return reminders
+
+
+async def _deliver(reminder: Dict[str, Any]) -> bool:
+    """
+    通过各渠道发送提醒
+
+    Returns:
+        bool: 是否需要保留台账；没有任何渠道发送成功且至少一个渠道失败时返回False，
+        所有渠道都不适用（如未分配负责人且只配置了邮件）时不再重试
+    """
+    delivered = failed = False
+    for handler in _senders:
+        try:
+            delivered = await handler(reminder) or delivered
+        except Exception as e:
+            failed = True
+            logger.error(f"发送任务 {reminder['task_id']} 的提醒失败: {e}")
+    if delivered:
+        logger.info(f"已发送任务 {reminder['task_id']} 的截止提醒")
+    elif not failed:
+        logger.info(f"任务 {reminder['task_id']} 没有适用的提醒渠道，跳过")
+    return delivered or not failed
+
+
+async def _retry_later(db: AsyncSession, failed: List[Dict[str, Any]], now: datetime) -> None:
+    """撤回发送失败的提醒台账，并在重试间隔后再次发送"""
+    await db.execute(
+        delete(TaskReminder).where(
+            TaskReminder.reminder_type == REMINDER_DUE_SOON,
+            tuple_(TaskReminder.task_id, TaskReminder.due_date).in_(
+                [(reminder["task_id"], reminder["due_date"]) for reminder in failed]
+            )
+        )
+    )
+    await db.commit()
+    retry_at = now + timedelta(seconds=_RETRY_SECONDS)
+    for reminder in failed:
+        # 发送期间已收到新的截止时间时以新的为准
+        if reminder["task_id"] in _scheduled:
+            continue
+        due_date = _as_utc(reminder["due_date"])
+        _scheduled[reminder["task_id"]] = due_date
+        heapq.heappush(_heap, (retry_at, reminder["task_id"], due_date))
+
+
+async def _tick() -> float:
+    """
+    按需扩展加载窗口并发送到点的提醒
+
+    Returns:
+        float: 距离下次需要处理的秒数
+    """
+    global _loaded_until
+    now = datetime.now(timezone.utc)
+    # 窗口剩余不足一半时向后扩展，保证提醒时间到达前任务已在堆中
+    if _loaded_until is None or _loaded_until - _lead() - _window() / 2 <= now:
+        until = now + _lead() + _window()
+        async with AsyncSessionLocal() as db:
+            await _load_window(db, _loaded_until or now, until)
+        _loaded_until = until
+
+    due = _pop_due(now)
+    if due:
+        async with AsyncSessionLocal() as db:
+            reminders = await _send_reminders(db, due)
+            failed = [reminder for reminder in reminders if not await _deliver(reminder)]
+            if failed:
+                await _retry_later(db, failed, now)
+        _stats["sent"] += len(reminders) - len(failed)
+        _stats["failed"] += len(failed)
+
+    next_at = _loaded_until - _lead() - _window() / 2
+    if _heap:
+        next_at = min(next_at, _heap[0][0])
+    return max((next_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+async def _run() -> None:
+    """提醒主循环：睡眠到下一个提醒时间，或被新的提醒唤醒"""
+    while True:
+        _wakeup.clear()
+        try:
+            timeout = await _tick()
+        except Exception as e:
+            # 已取出但未写入台账的提醒不会丢失：重试时重新加载窗口，台账中没有的任务会再次入堆
+            logger.error(f"处理任务提醒失败: {e}")
+            _reset(wake=False)
+            timeout = _RETRY_SECONDS
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def start_reminder_engine() -> None:
+    """启动截止提醒（未配置任何提醒渠道时不启动，避免写入台账却没有实际发送）"""
+    global _engine_task, _wakeup
+    if _engine_task is not None:
+        return
+    _senders[:] = _configured_senders()
+    if not _senders:
+        logger.warning("未配置提醒渠道（FEISHU_BOT_TOKEN、SMTP_HOST），不启动任务截止提醒")
+        return
+    _wakeup = asyncio.Event()
+    _reset()
+    _engine_task = asyncio.create_task(_run())
+
+
+async def stop_reminder_engine() -> None:
+    """停止截止提醒"""
+    global _engine_task, _wakeup
+    if _engine_task is None:
+        return
+    _engine_task.cancel()
+    try:
+        await _engine_task
+    except asyncio.CancelledError:
+        pass
+    _engine_task = None
+    _wakeup = None
+    _reset()
+
+
+subscribe(TOPIC, _on_message)
+register_collector("task_reminders", lambda: {
+    **_stats,
+    "scheduled": len(_scheduled),
+    "heap_size": len(_heap),
+    "loaded_until": _loaded_until.isoformat() if _loaded_until else None,
+})
@@ -2,16 +2,32 @@
 项目管理 Agent 路由模块
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from database import get_db, check_db_health
+from config import settings
+from database import READ_PRIMARY, get_db, read_session_factory
+from health import get_database_health, readiness
+from conditional import has_conditional_headers, is_not_modified, make_etag, not_modified_response, set_validators, check_if_match
 from models import User, Task, TaskPriority, TaskStatus, TaskHistory, TaskDeletionLog
-from schemas import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, TaskHistoryResponse, TaskStatusUpdate, TaskDeletionRequest, TaskDeletionLogResponse, DeletedTaskResponse
+from schemas import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, TaskBulkCreateRequest, TaskBulkCreateResponse, TaskBulkRowError, TaskStatusBatchUpdate, TaskBatchResult, TaskBatchResponse, TaskBatchDeleteRequest, TaskBatchRestoreRequest, TaskHistoryResponse, TaskStatusUpdate, TaskDeletionRequest, TaskDeletionLogResponse, DeletedTaskResponse
 from security import get_current_user
-from permissions import check_task_edit_permission, check_task_view_permission, check_task_delete_permission, is_manager_or_admin
+from db_routing import get_read_db
+from permissions import check_task_edit_permission, check_task_view_permission, check_task_delete_permission, is_manager_or_admin, task_visibility_scope
 from task_history_service import record_task_update, get_task_history
-from task_deletion_service import soft_delete_task, restore_task, get_deleted_tasks, get_deletion_logs
+from task_bulk_service import BULK_MODES, validate_bulk_items, check_assignees, insert_tasks
+from task_status_service import is_transition_allowed, batch_update_status
+from task_deletion_service import soft_delete_task, restore_task, batch_soft_delete_tasks, batch_restore_tasks, get_deleted_tasks, get_deletion_logs
+from serialization import schema_columns, parse_fields, with_columns, rows_to_dicts, dumps, json_response
+from search import fulltext_rank, search_vector_expr
+from task_filters import resolve_search, apply_task_filters
+from export_service import accepts_gzip, stream_csv
+from task_list_cache import cacheable, get_or_load, tasks_changed
+from task_stats_service import apply_stat_changes, task_stat_key
+from reminder_service import reminders_changed, task_reminder_entry
+from pagination import SORT_ORDERS, COUNT_MODES, encode_cursor, decode_cursor, apply_keyset, count_cache_key, fetch_page
 from typing import List, Optional
 import uuid
 import logging
@@ -22,11 +38,23 @@ logger = logging.getLogger(__name__)
 # 创建路由器
 router = APIRouter()
 
+# 任务列表允许的排序字段（均为非空列，配合主键构成稳定的键集排序）
+TASK_SORT_COLUMNS = {
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "due_date": Task.due_date,
+    "title": Task.title,
+}
+
+# 列表接口按响应模型字段直接查询的列
+TASK_HISTORY_COLUMNS = schema_columns(TaskHistory, TaskHistoryResponse)
+TASK_DELETION_LOG_COLUMNS = schema_columns(TaskDeletionLog, TaskDeletionLogResponse)
+
 
 @router.get("/health")
 async def health_check():
-    """健康检查端点"""
-    db_health = await check_db_health()
+    """健康检查端点（数据库状态取自后台探测的缓存快照）"""
+    db_health = await get_database_health()
     return {
         "status": "ok",
         "service": "项目管理Agent",
@@ -34,46 +62,138 @@ async def health_check():
     }
 
 
+@router.get("/livez")
+async def liveness_check():
+    """存活探针：仅表示进程与事件循环可响应，不做任何IO"""
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readiness_check(response: Response):
+    """就绪探针：数据库不可用、健康快照过期或连接池饱和时返回503"""
+    result = await readiness()
+    if result["status"] != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
+
+
 @router.get("/tasks", response_model=TaskListResponse)
 async def get_tasks(
     status: Optional[str] = None,
     assignee_id: Optional[uuid.UUID] = None,
     priority: Optional[str] = None,
     search: Optional[str] = None,
+    search_mode: str = Query("fulltext", description="检索模式: fulltext（全文索引，按相关度排序）/ like（子串匹配）"),
     limit: int = 20,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor；提供时忽略 offset，排序以游标为准"),
+    sort_by: Optional[str] = Query(None, description=f"排序字段: {', '.join(TASK_SORT_COLUMNS)}, relevance；默认全文检索时按相关度，否则按创建时间"),
+    sort_order: str = Query("desc", description="排序方向: asc/desc"),
+    count: str = Query("exact", description="总数统计模式: exact（精确，短时缓存）/ estimated（规划器估算）/ none（不统计）"),
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段（如 id,title,status,due_date,assignee_id），id 总是返回；默认返回全部字段"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取任务列表"""
+    """
+    获取任务列表
+    
+    按响应字段查询列元组并直接编码为JSON（缓存的是编码后的响应体）；
+    指定 fields 时只查询和返回这些列
+    """
+    # 注意：查询参数 status 遮蔽了 fastapi.status，此处直接使用状态码数值
     try:
-        query = db.query(Task).filter(Task.deleted_at.is_(None))
-        
-        # 过滤条件
-        if status:
-            query = query.filter(Task.status == status)
-        if assignee_id:
-            query = query.filter(Task.assignee_id == assignee_id)
-        if priority:
-            query = query.filter(Task.priority == priority)
-        if search:
-            query = query.filter(
-                (Task.title.ilike(f"%{search}%")) |
-                (Task.description.ilike(f"%{search}%"))
+        after = None
+        if cursor:
+            try:
+                decoded = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            sort_by, sort_order, after = decoded["sort_by"], decoded["sort_order"], decoded["values"]
+            offset = 0
+        
+        # 全文检索：无法切分出有效词素时退回子串匹配
+        tsquery, search_mode = resolve_search(search, search_mode)
+        
+        if sort_by is None:
+            sort_by = "relevance" if tsquery else "created_at"
+        if sort_by == "relevance":
+            if tsquery is None:
+                raise HTTPException(status_code=400, detail="按相关度排序需要提供全文检索关键词")
+            if after is not None:
+                raise HTTPException(status_code=400, detail="按相关度排序不支持游标分页，请使用 offset")
+        elif sort_by not in TASK_SORT_COLUMNS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"无效的排序字段: {sort_by}. 有效选项: {list(TASK_SORT_COLUMNS) + ['relevance']}"
+            )
+        if sort_order not in SORT_ORDERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"无效的排序方向: {sort_order}. 有效选项: {list(SORT_ORDERS)}"
+            )
+        if count not in COUNT_MODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"无效的计数模式: {count}. 有效选项: {list(COUNT_MODES)}"
             )
         
-        # 获取总数
-        total = query.count()
-        
-        # 分页
-        tasks = query.offset(offset).limit(limit).all()
+        names = parse_fields(fields, TaskResponse)
+        read_target = db.info.get("read_target", READ_PRIMARY)
+        # 键集分页需要排序列生成游标，未请求时额外查询但不输出
+        selected = with_columns(names, [sort_by] if sort_by != "relevance" else [])
         
-        return TaskListResponse(
-            tasks=tasks,
-            total=total,
-            skip=offset,
-            limit=limit
+        async def load_page() -> bytes:
+            query = select(*schema_columns(Task, TaskResponse, selected)).where(Task.deleted_at.is_(None))
+            
+            # 过滤条件
+            query = apply_task_filters(
+                query, status=status, assignee_id=assignee_id, priority=priority, search=search, tsquery=tsquery
+            )
+            
+            # 稳定排序 + 分页（多取一行用于判断是否存在下一页）
+            if sort_by == "relevance":
+                page_query = query.order_by(fulltext_rank(Task.search_vector, tsquery).desc(), Task.id.desc())
+            else:
+                page_query = apply_keyset(query, TASK_SORT_COLUMNS[sort_by], Task.id, sort_order, after)
+            if after is None:
+                page_query = page_query.offset(offset)
+            
+            # 查询当前页并按计数模式获取总数
+            cache_key = count_cache_key(
+                "tasks", status=status, assignee_id=assignee_id, priority=priority,
+                search=search, search_mode=search_mode
+            )
+            rows, total = await fetch_page(
+                db, query, page_query.limit(limit + 1),
+                count_mode=count, cache_key=cache_key, use_window=after is None, as_rows=True,
+                cache_fill=cacheable(read_target)
+            )
+            tasks = rows_to_dicts(rows[:limit], names)
+            
+            next_cursor = None
+            if len(rows) > limit and sort_by != "relevance":
+                last = rows[limit - 1]
+                next_cursor = encode_cursor(
+                    sort_by, sort_order, [last[selected.index(sort_by)], last[selected.index("id")]]
+                )
+            
+            return dumps({
+                "tasks": tasks,
+                "total": total,
+                "skip": offset,
+                "limit": limit,
+                "next_cursor": next_cursor
+            })
+        
+        # 相同可见范围与规范化参数的请求共享缓存，任务写入后按数据版本失效；
+        # 读己之写窗口内的请求绕过缓存，副本的读取结果只在其已包含当前版本的写入时缓存
+        list_key = (
+            task_visibility_scope(current_user), status, assignee_id, priority, search, search_mode,
+            limit, offset, tuple(after) if after is not None else None, sort_by, sort_order, count, names
         )
+        return json_response(await get_or_load(list_key, assignee_id, load_page, read_target))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"获取任务列表时发生错误: {e}")
         return TaskListResponse(tasks=[], total=0, skip=offset, limit=limit)
@@ -81,12 +201,21 @@ async def get_tasks(
 
 @router.get("/tasks/deleted", response_model=List[DeletedTaskResponse])
 async def get_deleted_tasks_endpoint(
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值；提供时忽略 offset"),
+    deleted_by: Optional[uuid.UUID] = Query(None, description="按删除人过滤"),
+    deleted_from: Optional[datetime] = Query(None, description="删除时间下限（含）"),
+    deleted_to: Optional[datetime] = Query(None, description="删除时间上限（不含）"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取已删除的任务列表"""
+    """
+    获取已删除的任务列表
+    
+    按删除时间倒序，附带最近一次删除的原因与删除人；还有下一页时通过响应头 X-Next-Cursor 返回游标
+    """
     try:
         # 只有管理员和项目经理可以查看已删除的任务
         if not is_manager_or_admin(current_user):
@@ -95,34 +224,33 @@ async def get_deleted_tasks_endpoint(
                 detail="只有管理员和项目经理可以查看已删除的任务"
             )
         
-        # 获取已删除的任务
-        deleted_tasks = get_deleted_tasks(db, limit, offset)
+        after = None
+        if cursor:
+            try:
+                decoded = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            if decoded["sort_by"] != "deleted_at":
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="游标与已删除任务列表不匹配")
+            after = decoded["values"]
+        
+        # 单次查询获取已删除任务及其最新删除日志（多取一行判断是否有下一页）
+        deleted_tasks = await get_deleted_tasks(
+            db,
+            limit=limit + 1,
+            offset=offset,
+            after=after,
+            deleted_by=deleted_by,
+            deleted_from=deleted_from,
+            deleted_to=deleted_to
+        )
         
-        # 获取删除日志信息
-        result = []
-        for task in deleted_tasks:
-            deletion_log = db.query(TaskDeletionLog).filter(
-                TaskDeletionLog.task_id == task.id
-            ).order_by(TaskDeletionLog.deleted_at.desc()).first()
-            
-            task_dict = {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "assignee_id": task.assignee_id,
-                "due_date": task.due_date,
-                "priority": task.priority,
-                "status": task.status,
-                "created_by": task.created_by,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-                "deleted_at": task.deleted_at,
-                "deletion_reason": deletion_log.deletion_reason if deletion_log else None,
-                "deleted_by": deletion_log.deleted_by if deletion_log else None
-            }
-            result.append(task_dict)
-        
-        return result
+        if len(deleted_tasks) > limit:
+            deleted_tasks = deleted_tasks[:limit]
+            last = deleted_tasks[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor("deleted_at", "desc", [last["deleted_at"], last["id"]])
+        
+        return deleted_tasks
         
     except HTTPException:
         raise
@@ -134,22 +262,111 @@ async def get_deleted_tasks_endpoint(
         )
 
 
+@router.get("/tasks/export.csv")
+async def export_tasks_csv(
+    request: Request,
+    status: Optional[str] = None,
+    assignee_id: Optional[uuid.UUID] = None,
+    priority: Optional[str] = None,
+    search: Optional[str] = None,
+    search_mode: str = Query("fulltext", description="检索模式: fulltext / like"),
+    due_from: Optional[datetime] = Query(None, description="截止日期下限（含）"),
+    due_to: Optional[datetime] = Query(None, description="截止日期上限（不含）"),
+    created_from: Optional[datetime] = Query(None, description="创建时间下限（含）"),
+    created_to: Optional[datetime] = Query(None, description="创建时间上限（不含）"),
+    fields: Optional[str] = Query(None, description="逗号分隔的导出列，id 总是导出；默认导出全部字段"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    导出任务为CSV
+    
+    过滤条件与任务列表一致，另支持截止日期与创建时间范围。
+    结果通过服务端游标分批读取并流式输出（UTF-8 带BOM，可直接用 Excel 打开），
+    按创建时间倒序；客户端声明 Accept-Encoding: gzip 时压缩传输。
+    """
+    # 注意：查询参数 status 遮蔽了 fastapi.status，此处直接使用状态码数值
+    tsquery, search_mode = resolve_search(search, search_mode)
+    names = parse_fields(fields, TaskResponse)
+    query = apply_task_filters(
+        select(*schema_columns(Task, TaskResponse, names)).where(Task.deleted_at.is_(None)),
+        status=status, assignee_id=assignee_id, priority=priority, search=search, tsquery=tsquery,
+        due_from=due_from, due_to=due_to, created_from=created_from, created_to=created_to
+    ).order_by(Task.created_at.desc(), Task.id.desc())
+    
+    gzip = accepts_gzip(request)
+    headers = {
+        "Content-Disposition": 'attachment; filename="tasks.csv"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    logger.info(f"用户 {current_user.username} 导出任务CSV")
+    return StreamingResponse(
+        stream_csv(read_session_factory(str(current_user.id)), query, names, gzip=gzip),
+        media_type="text/csv",
+        headers=headers
+    )
+
+
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段，id 总是返回；默认返回全部字段"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取特定任务详情"""
+    """
+    获取特定任务详情
+    
+    支持 If-None-Match / If-Modified-Since 条件请求：携带条件头时先只查询 updated_at，
+    未变化则直接返回304，不加载和序列化整行。
+    指定 fields 时只查询和返回这些列，ETag 随字段集合变化
+    """
     try:
-        db_task = db.query(Task).filter(Task.id == task_id, Task.deleted_at.is_(None)).first()
-        if not db_task:
+        names = parse_fields(fields, TaskResponse)
+        # 稀疏响应与完整响应是不同的表示，ETag 需要区分
+        etag_key = task_id if fields is None else f"{task_id}:{','.join(names)}"
+        
+        if has_conditional_headers(request):
+            row = (await db.execute(
+                select(Task.id, Task.updated_at, Task.assignee_id, Task.created_by)
+                .where(Task.id == task_id, Task.deleted_at.is_(None))
+            )).first()
+            if not row:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
+            check_task_view_permission(current_user, row, db)
+            etag = make_etag(etag_key, row.updated_at)
+            if is_not_modified(request, etag, row.updated_at):
+                return not_modified_response(etag, row.updated_at)
+        
+        if fields is None:
+            db_task = await db.scalar(select(Task).where(Task.id == task_id, Task.deleted_at.is_(None)))
+            if not db_task:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
+            
+            # 检查查看权限
+            check_task_view_permission(current_user, db_task, db)
+            
+            set_validators(response, make_etag(etag_key, db_task.updated_at), db_task.updated_at)
+            return db_task
+        
+        # 权限校验与缓存校验器所需的列额外查询，但不输出
+        selected = with_columns(names, ["updated_at", "assignee_id", "created_by"])
+        row = (await db.execute(
+            select(*schema_columns(Task, TaskResponse, selected))
+            .where(Task.id == task_id, Task.deleted_at.is_(None))
+        )).first()
+        if not row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
         
         # 检查查看权限
-        check_task_view_permission(current_user, db_task, db)
+        check_task_view_permission(current_user, row, db)
         
-        return db_task
+        sparse = json_response(dumps(rows_to_dicts([row], names)[0]))
+        set_validators(sparse, make_etag(etag_key, row.updated_at), row.updated_at)
+        return sparse
     except HTTPException:
         raise
     except Exception as e:
@@ -163,14 +380,14 @@ async def get_task(
 @router.post("/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task: TaskCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """创建新任务"""
     try:
         # 验证负责人是否存在
         if task.assignee_id:
-            assignee = db.query(User).filter(User.id == task.assignee_id).first()
+            assignee = await db.get(User, task.assignee_id)
             if not assignee:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -192,12 +409,16 @@ async def create_task(
             due_date=task.due_date,
             priority=task.priority,
             status=TaskStatus.PENDING.value,
-            created_by=current_user.id
+            created_by=current_user.id,
+            search_vector=search_vector_expr(task.title, task.description)
         )
         
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        await apply_stat_changes(db, added=[task_stat_key(db_task)])
+        await db.commit()
+        await db.refresh(db_task)
+        await tasks_changed(db_task.assignee_id)
+        await reminders_changed(task_reminder_entry(db_task))
         
         logger.info(f"用户 {current_user.username} 创建了任务: {db_task.title}")
         return db_task
@@ -205,14 +426,14 @@ async def create_task(
     except HTTPException:
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"数据库完整性错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="任务创建失败，数据冲突"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"创建任务时发生错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -220,25 +441,225 @@ async def create_task(
         )
 
 
+@router.post("/tasks/bulk", response_model=TaskBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_tasks(
+    payload: TaskBulkCreateRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量创建任务
+    
+    逐行校验并一次性解析所有负责人，有效行在同一事务中批量写入。
+    all_or_nothing 模式下任一行失败则不写入任何任务并返回400；
+    best_effort 模式写入所有有效行，并返回失败行的错误，所有行都失败时返回422。
+    """
+    if payload.mode not in BULK_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无效的批量模式: {payload.mode}. 有效选项: {list(BULK_MODES)}"
+        )
+    if len(payload.tasks) > settings.TASK_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多创建 {settings.TASK_BULK_MAX_ITEMS} 个任务"
+        )
+    
+    try:
+        tasks, errors = validate_bulk_items(payload.tasks)
+        await check_assignees(db, tasks, errors)
+        
+        ids = {}
+        if not (errors and payload.mode == "all_or_nothing"):
+            ids = await insert_tasks(db, tasks, current_user)
+            await db.commit()
+            if ids:
+                await tasks_changed()
+                await reminders_changed()
+            else:
+                # 没有写入任何任务，不能以201表示成功
+                response.status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+        else:
+            response.status_code = status.HTTP_400_BAD_REQUEST
+        
+        return TaskBulkCreateResponse(
+            mode=payload.mode,
+            created=len(ids),
+            failed=len(errors),
+            ids=[ids.get(index) for index in range(len(payload.tasks))],
+            errors=[TaskBulkRowError(index=index, errors=messages) for index, messages in sorted(errors.items())]
+        )
+        
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        logger.error(f"数据库完整性错误: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="批量创建失败，数据冲突"
+        )
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"批量创建任务时发生错误: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="批量创建任务失败"
+        )
+
+
+def _batch_task_ids(task_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+    """去重并校验批量操作的任务数量"""
+    unique_ids = list(dict.fromkeys(task_ids))
+    if len(unique_ids) > settings.TASK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多处理 {settings.TASK_BATCH_MAX_ITEMS} 个任务"
+        )
+    return unique_ids
+
+
+def _batch_response(results: List[dict]) -> TaskBatchResponse:
+    """汇总批量操作结果"""
+    succeeded = sum(1 for item in results if item["success"])
+    return TaskBatchResponse(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=[TaskBatchResult(**item) for item in results]
+    )
+
+
+@router.put("/tasks/status:batch", response_model=TaskBatchResponse)
+async def batch_update_task_status(
+    payload: TaskStatusBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量更新任务状态
+    
+    对整批任务统一校验权限与状态转换，通过校验的任务以一条UPDATE更新，
+    历史记录批量写入，结果逐任务返回（部分失败不影响其他任务）。
+    """
+    if payload.status not in [s.value for s in TaskStatus]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无效的状态: {payload.status}. 有效选项: {[s.value for s in TaskStatus]}"
+        )
+    task_ids = _batch_task_ids(payload.task_ids)
+    try:
+        results = await batch_update_status(db, task_ids, payload.status, current_user)
+        await db.commit()
+        if any(item["success"] for item in results):
+            await tasks_changed()
+            # 批量变更后各进程重新加载提醒窗口
+            await reminders_changed()
+        return _batch_response(results)
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"批量更新任务状态时发生错误: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="批量更新任务状态失败"
+        )
+
+
+@router.post("/tasks/delete:batch", response_model=TaskBatchResponse)
+async def batch_delete_tasks(
+    payload: TaskBatchDeleteRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量删除任务（软删除）
+    
+    按与单个删除相同的规则逐任务校验权限，通过校验的任务在同一事务中
+    设置删除时间并写入删除日志，结果逐任务返回。
+    """
+    task_ids = _batch_task_ids(payload.task_ids)
+    try:
+        results = await batch_soft_delete_tasks(db, task_ids, current_user, payload.reason)
+        await db.commit()
+        if any(item["success"] for item in results):
+            await tasks_changed()
+        return _batch_response(results)
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"批量删除任务时发生错误: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="批量删除任务失败"
+        )
+
+
+@router.post("/tasks/restore:batch", response_model=TaskBatchResponse)
+async def batch_restore_tasks_endpoint(
+    payload: TaskBatchRestoreRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量恢复已删除的任务
+    
+    只有管理员和项目经理可以恢复任务，结果逐任务返回。
+    """
+    if not is_manager_or_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="只有管理员和项目经理可以恢复任务"
+        )
+    task_ids = _batch_task_ids(payload.task_ids)
+    try:
+        results = await batch_restore_tasks(db, task_ids, current_user)
+        await db.commit()
+        if any(item["success"] for item in results):
+            await tasks_changed()
+            await reminders_changed()
+        return _batch_response(results)
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"批量恢复任务时发生错误: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="批量恢复任务失败"
+        )
+
+
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: uuid.UUID,
     task_update: TaskUpdate,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """更新任务信息"""
+    """
+    更新任务信息
+    
+    携带 If-Match 时，任务在此期间被修改则返回412（乐观并发控制）
+    """
     try:
-        db_task = db.query(Task).filter(Task.id == task_id, Task.deleted_at.is_(None)).first()
+        query = select(Task).where(Task.id == task_id, Task.deleted_at.is_(None))
+        if "if-match" in request.headers:
+            # 锁定任务，保证校验与更新之间不被其他请求修改
+            query = query.with_for_update()
+        db_task = await db.scalar(query)
         if not db_task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
         
-        # 检查编辑权限
+        # 先检查编辑权限，再校验前置条件：无权编辑的调用者不能通过412与403的差异探测任务版本
         check_task_edit_permission(current_user, db_task, db)
         
+        check_if_match(request, make_etag(db_task.id, db_task.updated_at))
+        
         # 验证负责人是否存在
         if task_update.assignee_id:
-            assignee = db.query(User).filter(User.id == task_update.assignee_id).first()
+            assignee = await db.get(User, task_update.assignee_id)
             if not assignee:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -259,34 +680,44 @@ async def update_task(
                 detail=f"无效的状态: {task_update.status}. 有效选项: {[s.value for s in TaskStatus]}"
             )
         
-        # 记录更新前的数据
         update_data = task_update.model_dump(exclude_unset=True)
+        old_assignee_id = db_task.assignee_id
+        
+        # 基于更新前的状态记录历史，与任务更新在同一事务中提交
+        await record_task_update(db, db_task, update_data, current_user)
         
         # 更新字段
+        old_stat_key = task_stat_key(db_task)
         for field, value in update_data.items():
             setattr(db_task, field, value)
+        if task_stat_key(db_task) != old_stat_key:
+            await apply_stat_changes(db, added=[task_stat_key(db_task)], removed=[old_stat_key])
         
-        db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        # 标题或描述变化时同步维护检索向量
+        if "title" in update_data or "description" in update_data:
+            db_task.search_vector = search_vector_expr(db_task.title, db_task.description)
         
-        # 记录历史变更
-        record_task_update(db, db_task, update_data, current_user)
+        await db.commit()
+        await db.refresh(db_task)
+        await tasks_changed(old_assignee_id, db_task.assignee_id)
+        if "due_date" in update_data or "status" in update_data:
+            await reminders_changed(task_reminder_entry(db_task))
         
+        set_validators(response, make_etag(db_task.id, db_task.updated_at), db_task.updated_at)
         logger.info(f"用户 {current_user.username} 更新了任务: {db_task.title}")
         return db_task
         
     except HTTPException:
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"数据库完整性错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="任务更新失败，数据冲突"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"更新任务时发生错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -298,12 +729,12 @@ async def update_task(
 async def delete_task(
     task_id: uuid.UUID,
     reason: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """删除任务（软删除）"""
     try:
-        db_task = db.query(Task).filter(Task.id == task_id, Task.deleted_at.is_(None)).first()
+        db_task = await db.scalar(select(Task).where(Task.id == task_id, Task.deleted_at.is_(None)))
         if not db_task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
         
@@ -311,19 +742,21 @@ async def delete_task(
         check_task_delete_permission(current_user, db_task, db)
         
         # 软删除任务
-        deletion_log = soft_delete_task(
+        deletion_log = await soft_delete_task(
             db=db,
             task=db_task,
             deleted_by=current_user,
             deletion_reason=reason
         )
+        await tasks_changed(db_task.assignee_id)
+        await reminders_changed(task_reminder_entry(db_task))
         
         return deletion_log
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"删除任务时发生错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -335,12 +768,12 @@ async def delete_task(
 async def update_task_status(
     task_id: uuid.UUID,
     status_update: TaskStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """更新任务状态"""
     try:
-        db_task = db.query(Task).filter(Task.id == task_id, Task.deleted_at.is_(None)).first()
+        db_task = await db.scalar(select(Task).where(Task.id == task_id, Task.deleted_at.is_(None)))
         if not db_task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
         
@@ -358,29 +791,21 @@ async def update_task_status(
         old_status = db_task.status
         new_status = status_update.status
         
-        # 定义允许的状态转换
-        allowed_transitions = {
-            TaskStatus.PENDING.value: [TaskStatus.IN_PROGRESS.value, TaskStatus.BLOCKED.value, TaskStatus.OVERDUE.value],
-            TaskStatus.IN_PROGRESS.value: [TaskStatus.COMPLETED.value, TaskStatus.BLOCKED.value, TaskStatus.OVERDUE.value],
-            TaskStatus.BLOCKED.value: [TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value, TaskStatus.OVERDUE.value],
-            TaskStatus.OVERDUE.value: [TaskStatus.IN_PROGRESS.value, TaskStatus.COMPLETED.value, TaskStatus.BLOCKED.value],
-            TaskStatus.COMPLETED.value: [TaskStatus.IN_PROGRESS.value, TaskStatus.BLOCKED.value]  # 已完成的任务可以重新开始
-        }
-        
-        if new_status not in allowed_transitions.get(old_status, []):
+        if not is_transition_allowed(old_status, new_status):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"不允许从状态 '{old_status}' 转换到 '{new_status}'"
             )
         
-        # 更新状态
+        # 记录状态变更历史并更新状态（同一事务）
+        await record_task_update(db, db_task, {"status": new_status}, current_user)
+        old_stat_key = task_stat_key(db_task)
         db_task.status = new_status
-        db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
-        
-        # 记录状态变更历史
-        record_task_update(db, db_task, {"status": new_status}, current_user)
+        await apply_stat_changes(db, added=[task_stat_key(db_task)], removed=[old_stat_key])
+        await db.commit()
+        await db.refresh(db_task)
+        await tasks_changed(db_task.assignee_id)
+        await reminders_changed(task_reminder_entry(db_task))
         
         logger.info(f"用户 {current_user.username} 将任务 {db_task.title} 状态从 {old_status} 更新为 {new_status}")
         return db_task
@@ -388,7 +813,7 @@ async def update_task_status(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"更新任务状态时发生错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -401,13 +826,13 @@ async def get_task_history_endpoint(
     task_id: uuid.UUID,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取任务历史记录"""
     try:
         # 检查任务是否存在
-        db_task = db.query(Task).filter(Task.id == task_id, Task.deleted_at.is_(None)).first()
+        db_task = await db.scalar(select(Task).where(Task.id == task_id, Task.deleted_at.is_(None)))
         if not db_task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
         
@@ -415,9 +840,9 @@ async def get_task_history_endpoint(
         check_task_view_permission(current_user, db_task, db)
         
         # 获取历史记录
-        history_records = get_task_history(db, str(task_id), limit, offset)
+        rows = await get_task_history(db, str(task_id), limit, offset, columns=TASK_HISTORY_COLUMNS)
         
-        return history_records
+        return json_response(dumps(rows_to_dicts(rows, TaskHistoryResponse.model_fields)))
         
     except HTTPException:
         raise
@@ -432,13 +857,13 @@ async def get_task_history_endpoint(
 @router.post("/tasks/{task_id}/restore", response_model=TaskResponse)
 async def restore_task_endpoint(
     task_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """恢复已删除的任务"""
     try:
         # 查找已删除的任务
-        db_task = db.query(Task).filter(Task.id == task_id, Task.deleted_at.isnot(None)).first()
+        db_task = await db.scalar(select(Task).where(Task.id == task_id, Task.deleted_at.isnot(None)))
         if not db_task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="已删除的任务不存在")
         
@@ -450,7 +875,9 @@ async def restore_task_endpoint(
             )
         
         # 恢复任务
-        restored_task = restore_task(db, db_task, current_user)
+        restored_task = await restore_task(db, db_task, current_user)
+        await tasks_changed(restored_task.assignee_id)
+        await reminders_changed(task_reminder_entry(restored_task))
         
         logger.info(f"用户 {current_user.username} 恢复了任务: {restored_task.title}")
         return restored_task
@@ -458,7 +885,7 @@ async def restore_task_endpoint(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"恢复任务时发生错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -471,13 +898,13 @@ async def get_task_deletion_logs(
     task_id: uuid.UUID,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取任务的删除日志"""
     try:
         # 检查任务是否存在
-        db_task = db.query(Task).filter(Task.id == task_id).first()
+        db_task = await db.get(Task, task_id)
         if not db_task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
         
@@ -489,9 +916,9 @@ async def get_task_deletion_logs(
             )
         
         # 获取删除日志
-        deletion_logs = get_deletion_logs(db, str(task_id), limit, offset)
+        rows = await get_deletion_logs(db, str(task_id), limit, offset, columns=TASK_DELETION_LOG_COLUMNS)
         
-        return deletion_logs
+        return json_response(dumps(rows_to_dicts(rows, TaskDeletionLogResponse.model_fields)))
         
     except HTTPException:
         raise
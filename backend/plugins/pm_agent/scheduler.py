@@ -0,0 +1,78 @@
+"""
+定时任务调度
+
+基于 APScheduler 的进程内调度器。多进程部署时每个进程都会调度，
+任务自身负责避免重复执行（如使用咨询锁）。
+"""
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime, timezone
+from typing import Optional
+from config import settings
+from database import AsyncSessionLocal
+from overdue_service import sweep_overdue_tasks
+from task_stats_service import reconcile_task_stats
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+_scheduler: Optional[AsyncIOScheduler] = None
+
+
+async def reconcile_task_stats_job() -> None:
+    """按源表校准任务统计计数"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await reconcile_task_stats(db)
+    except Exception as e:
+        logger.error(f"任务统计校准失败: {e}")
+
+
+async def sweep_overdue_tasks_job() -> None:
+    """
+    将到期未完成的任务标记为逾期
+
+    系统操作用户在首次扫描时取得并缓存；数据库暂不可用等失败记录日志，下个周期重试
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await sweep_overdue_tasks(db)
+    except Exception as e:
+        logger.error(f"逾期扫描失败: {e}")
+
+
+async def start_scheduler() -> None:
+    """启动调度器（统计校准与逾期扫描在启动时立即执行一次）"""
+    global _scheduler
+    if _scheduler is not None:
+        return
+    _scheduler = AsyncIOScheduler(timezone=timezone.utc)
+    _scheduler.add_job(
+        reconcile_task_stats_job,
+        "interval",
+        seconds=settings.TASK_STATS_RECONCILE_INTERVAL_SECONDS,
+        id="reconcile_task_stats",
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+        coalesce=True,
+    )
+    _scheduler.add_job(
+        sweep_overdue_tasks_job,
+        "interval",
+        seconds=settings.OVERDUE_SWEEP_INTERVAL_SECONDS,
+        id="sweep_overdue_tasks",
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+        coalesce=True,
+    )
+    _scheduler.start()
+
+
+async def stop_scheduler() -> None:
+    """停止调度器"""
+    global _scheduler
+    if _scheduler is None:
+        return
+    _scheduler.shutdown(wait=False)
+    _scheduler = None
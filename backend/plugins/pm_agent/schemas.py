@@ -3,7 +3,7 @@
 """
 
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from models import TaskPriority, TaskStatus, UserRole, UserStatus
 import uuid
@@ -49,9 +49,31 @@ class TaskResponse(TaskBase):
 class TaskListResponse(BaseModel):
     """任务列表响应模式"""
     tasks: List[TaskResponse]
-    total: int
+    total: Optional[int] = Field(None, description="总数；计数模式为none时为空，estimated时为估算值")
     skip: int
     limit: int
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有更多数据时为空")
+
+
+class TaskBulkCreateRequest(BaseModel):
+    """批量创建任务请求模式（逐行校验，便于返回行级错误）"""
+    tasks: List[Dict[str, Any]] = Field(..., min_length=1, description="任务列表，每项字段同创建任务")
+    mode: str = Field("all_or_nothing", description="all_or_nothing：任一行失败则全部不写入；best_effort：写入所有有效行")
+
+
+class TaskBulkRowError(BaseModel):
+    """批量操作行级错误"""
+    index: int = Field(..., description="请求中的行号（从0开始）")
+    errors: List[str]
+
+
+class TaskBulkCreateResponse(BaseModel):
+    """批量创建任务响应模式"""
+    mode: str
+    created: int
+    failed: int
+    ids: List[Optional[uuid.UUID]] = Field(..., description="与请求逐行对应的任务ID，失败或未写入的行为空")
+    errors: List[TaskBulkRowError]
 
 
 class TaskHistoryResponse(BaseModel):
@@ -74,11 +96,44 @@ class TaskStatusUpdate(BaseModel):
     reason: Optional[str] = Field(None, max_length=500, description="状态变更原因")
 
 
+class TaskStatusBatchUpdate(BaseModel):
+    """批量任务状态更新模式"""
+    task_ids: List[uuid.UUID] = Field(..., min_length=1, description="任务ID列表")
+    status: str = Field(..., description="目标状态")
+    reason: Optional[str] = Field(None, max_length=500, description="状态变更原因")
+
+
+class TaskBatchResult(BaseModel):
+    """批量操作单个任务的结果"""
+    task_id: uuid.UUID
+    success: bool
+    old_status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TaskBatchResponse(BaseModel):
+    """批量操作响应模式"""
+    succeeded: int
+    failed: int
+    results: List[TaskBatchResult]
+
+
 class TaskDeletionRequest(BaseModel):
     """任务删除请求模式"""
     reason: Optional[str] = Field(None, max_length=500, description="删除原因")
 
 
+class TaskBatchDeleteRequest(BaseModel):
+    """批量删除任务请求模式"""
+    task_ids: List[uuid.UUID] = Field(..., min_length=1, description="任务ID列表")
+    reason: Optional[str] = Field(None, max_length=500, description="删除原因")
+
+
+class TaskBatchRestoreRequest(BaseModel):
+    """批量恢复任务请求模式"""
+    task_ids: List[uuid.UUID] = Field(..., min_length=1, description="任务ID列表")
+
+
 class TaskDeletionLogResponse(BaseModel):
     """任务删除日志响应模式"""
     id: uuid.UUID
@@ -111,6 +166,26 @@ class DeletedTaskResponse(BaseModel):
         from_attributes = True
 
 
+class AssigneeTaskStats(BaseModel):
+    """负责人任务统计"""
+    assignee_id: Optional[uuid.UUID] = Field(None, description="负责人ID，为空表示未分配")
+    total: int
+    completed: int
+    overdue: int
+
+
+class TaskStatsResponse(BaseModel):
+    """任务统计响应模式（不含已删除任务）"""
+    total: int
+    completed: int
+    overdue: int
+    completion_rate: float = Field(..., description="完成率：已完成任务数 / 任务总数")
+    overdue_ratio: float = Field(..., description="逾期占比：逾期任务数 / 任务总数")
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_assignee: List[AssigneeTaskStats]
+
+
 class UserBase(BaseModel):
     """用户基础模式"""
     username: str = Field(..., min_length=3, max_length=50, description="用户名")
@@ -138,6 +213,9 @@ class UserResponse(UserBase):
     id: uuid.UUID
     created_at: datetime
     updated_at: datetime
+    open_tasks: Optional[int] = Field(None, description="未完成的任务数（仅用户列表返回）")
+    overdue_tasks: Optional[int] = Field(None, description="逾期的任务数（仅用户列表返回）")
+    high_priority_tasks: Optional[int] = Field(None, description="高优先级未完成的任务数（仅用户列表返回）")
 
     class Config:
         from_attributes = True
@@ -146,11 +224,18 @@ class UserResponse(UserBase):
 class UserListResponse(BaseModel):
     """用户列表响应模式"""
     users: list[UserResponse]
-    total: int
+    total: Optional[int] = Field(None, description="总数；计数模式为none时为空，estimated时为估算值")
     skip: int
     limit: int
 
 
+class UserSuggestion(BaseModel):
+    """用户联想搜索结果（精简字段）"""
+    id: uuid.UUID
+    username: str
+    email: str
+
+
 class HealthResponse(BaseModel):
     """健康检查响应模式"""
     status: str
@@ -0,0 +1,112 @@
+"""
+任务全文检索：中文友好的分词与 tsvector/tsquery 构造
+
+PostgreSQL 内置解析器无法切分中文，且在 C 语言环境下会丢弃非ASCII字符，
+因此分词在应用侧完成：
+- 中日韩字符按单字 + 相邻双字（bigram）切分
+- 其他字母数字按单词切分并转为小写
+生成的词素数组通过 array_to_tsvector 直接写入，不再经过数据库解析器。
+"""
+
+from sqlalchemy import Text, cast, func, literal, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY, TSQUERY, TSVECTOR
+from typing import List, Optional
+import re
+import unicodedata
+
+
+SEARCH_MODES = ("fulltext", "like")
+
+# 中日韩字符（汉字、扩展A、兼容汉字、假名、韩文音节）
+_CJK = "぀-ヿ㐀-䶿一-鿿豈-﫿가-힯"
+_TOKEN_RE = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+
+
+def _normalize(text: str) -> str:
+    """全角转半角并转为小写"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def tokenize_document(text: Optional[str]) -> List[str]:
+    """
+    为索引切分文本
+
+    中文连续片段输出单字与双字，其余按单词输出，结果去重并保持顺序
+    """
+    if not text:
+        return []
+    tokens: List[str] = []
+    for cjk, word in _TOKEN_RE.findall(_normalize(text)):
+        if cjk:
+            tokens.extend(cjk)
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        else:
+            tokens.append(word)
+    return list(dict.fromkeys(tokens))
+
+
+def tokenize_query(text: Optional[str]) -> List[str]:
+    """
+    为查询切分文本
+
+    中文片段长度为1时使用单字，否则使用全部双字（要求全部命中，近似短语匹配）
+    """
+    if not text:
+        return []
+    tokens: List[str] = []
+    for cjk, word in _TOKEN_RE.findall(_normalize(text)):
+        if cjk:
+            if len(cjk) == 1:
+                tokens.append(cjk)
+            else:
+                tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        else:
+            tokens.append(word)
+    return list(dict.fromkeys(tokens))
+
+
+def build_tsquery(text: Optional[str]) -> Optional[str]:
+    """
+    构造 tsquery 文本，无有效词素时返回None
+
+    拉丁单词使用前缀匹配，便于输入过程中的检索
+    """
+    terms = []
+    for token in tokenize_query(text):
+        prefix = ":*" if token.isascii() else ""
+        terms.append(f"'{token}'{prefix}")
+    return " & ".join(terms) if terms else None
+
+
+def search_vector_from_tokens(title_tokens, description_tokens):
+    """
+    由词素数组表达式生成 tsvector 表达式
+
+    参数可以是字面量或绑定参数（批量写入时按行绑定）。标题权重为A，描述权重为B
+    """
+    title_vector = func.setweight(func.array_to_tsvector(title_tokens), literal_column("'A'"), type_=TSVECTOR)
+    description_vector = func.setweight(func.array_to_tsvector(description_tokens), literal_column("'B'"), type_=TSVECTOR)
+    return title_vector.op("||", return_type=TSVECTOR)(description_vector)
+
+
+def search_vector_expr(title: Optional[str], description: Optional[str]):
+    """生成写入 tasks.search_vector 的SQL表达式"""
+    return search_vector_from_tokens(
+        literal(tokenize_document(title), ARRAY(Text)),
+        literal(tokenize_document(description), ARRAY(Text))
+    )
+
+
+def tsquery_expr(query_text: str):
+    """将 tsquery 文本转换为SQL表达式（不经过数据库分词器）"""
+    return cast(literal(query_text, Text), TSQUERY)
+
+
+def fulltext_match(search_vector_column, query_text: str):
+    """全文匹配条件"""
+    return search_vector_column.op("@@")(tsquery_expr(query_text))
+
+
+def fulltext_rank(search_vector_column, query_text: str):
+    """相关度得分"""
+    return func.ts_rank(search_vector_column, tsquery_expr(query_text))
@@ -8,26 +8,26 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
 from database import get_db
 from models import User
+from password_hashing import pwd_context
+from principal_cache import principal_cache
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/pm_agent/auth/login")
 
 
 def hash_password(plain_password: str) -> str:
-    """对明文密码进行哈希。"""
+    """对明文密码进行哈希（同步执行，异步接口请使用 password_hashing.hash_password）。"""
     return pwd_context.hash(plain_password)
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    """校验明文密码与哈希是否匹配。"""
+    """校验明文密码与哈希是否匹配（同步执行）。"""
     return pwd_context.verify(plain_password, password_hash)
 
 
@@ -47,7 +47,7 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     """基于JWT的当前用户依赖。"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,16 +63,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if subject is None:
         raise credentials_exception
 
+    snapshot = principal_cache.get(subject)
+    if snapshot is not None:
+        user = principal_cache.attach(db, snapshot)
+        db.info["user_id"] = str(user.id)
+        return user
+
     # 优先按UUID匹配id，否则按用户名/邮箱匹配
     user: Optional[User] = None
     try:
         from uuid import UUID
         uid = UUID(subject)
-        user = db.query(User).filter(User.id == uid).first()
-    except Exception:
-        user = db.query(User).filter((User.username == subject) | (User.email == subject)).first()
+        result = await db.execute(select(User).where(User.id == uid))
+    except ValueError:
+        result = await db.execute(
+            select(User).where((User.username == subject) | (User.email == subject))
+        )
+    user = result.scalars().first()
 
     if not user:
         raise credentials_exception
 
+    principal_cache.put(subject, user)
+    # 供写操作提交后记录读己之写窗口
+    db.info["user_id"] = str(user.id)
     return user
@@ -0,0 +1,42 @@
+"""
+统计路由：任务完成率、逾期占比及按负责人、优先级、状态的分布
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from db_routing import get_read_db
+from models import User
+from schemas import TaskStatsResponse
+from security import get_current_user
+from task_stats_service import get_task_stats
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/stats", tags=["Statistics"])
+
+
+@router.get("/tasks", response_model=TaskStatsResponse)
+async def get_task_stats_endpoint(
+    assignee_id: Optional[uuid.UUID] = Query(None, description="只统计指定负责人的任务"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取任务统计
+
+    读取按（负责人, 优先级, 状态）维护的计数汇总表，耗时与任务总数无关。
+    计数随任务写入在同一事务中更新，并由定时任务按源表定期校准。
+    """
+    try:
+        return await get_task_stats(db, assignee_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取任务统计时发生错误: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="获取任务统计失败"
+        )
@@ -0,0 +1,127 @@
+"""
+任务批量创建服务
+"""
+
+from pydantic import ValidationError
+from sqlalchemy import Text, bindparam, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Task, TaskPriority, TaskStatus, User
+from schemas import TaskCreate
+from search import search_vector_from_tokens, tokenize_document
+from task_stats_service import apply_stat_changes, stat_key
+from typing import Any, Dict, List, Set, Tuple
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+BULK_MODES = ("all_or_nothing", "best_effort")
+
+_VALID_PRIORITIES = [p.value for p in TaskPriority]
+
+# 批量写入语句：检索向量由按行绑定的词素数组生成，整批通过 executemany 发送
+_BULK_INSERT = insert(Task.__table__).values(
+    search_vector=search_vector_from_tokens(
+        bindparam("title_tokens", type_=ARRAY(Text)),
+        bindparam("description_tokens", type_=ARRAY(Text))
+    )
+)
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    """将Pydantic校验错误转换为可读的消息列表"""
+    messages = []
+    for item in error.errors():
+        location = ".".join(str(part) for part in item.get("loc", ()))
+        messages.append(f"{location}: {item.get('msg')}" if location else item.get("msg", ""))
+    return messages
+
+
+def validate_bulk_items(items: List[Dict[str, Any]]) -> Tuple[Dict[int, TaskCreate], Dict[int, List[str]]]:
+    """
+    逐行校验批量创建的任务
+
+    Args:
+        items: 请求中的原始任务数据
+
+    Returns:
+        (通过校验的任务 {行号: TaskCreate}, 行级错误 {行号: [错误信息]})
+    """
+    valid: Dict[int, TaskCreate] = {}
+    errors: Dict[int, List[str]] = {}
+    for index, item in enumerate(items):
+        try:
+            task = TaskCreate.model_validate(item)
+        except ValidationError as e:
+            errors[index] = _format_validation_error(e)
+            continue
+        if task.priority not in _VALID_PRIORITIES:
+            errors[index] = [f"无效的优先级: {task.priority}. 有效选项: {_VALID_PRIORITIES}"]
+            continue
+        valid[index] = task
+    return valid, errors
+
+
+async def find_existing_users(db: AsyncSession, user_ids: Set[uuid.UUID]) -> Set[uuid.UUID]:
+    """一次查询返回存在的用户ID"""
+    if not user_ids:
+        return set()
+    result = await db.execute(select(User.id).where(User.id.in_(user_ids)))
+    return set(result.scalars().all())
+
+
+async def check_assignees(db: AsyncSession, tasks: Dict[int, TaskCreate], errors: Dict[int, List[str]]) -> None:
+    """
+    校验负责人是否存在，不存在的行移入错误列表
+
+    Args:
+        db: 数据库会话
+        tasks: 通过格式校验的任务（会被就地修改）
+        errors: 行级错误（会被就地修改）
+    """
+    assignee_ids = {task.assignee_id for task in tasks.values() if task.assignee_id}
+    existing = await find_existing_users(db, assignee_ids)
+    for index in [i for i, task in tasks.items() if task.assignee_id and task.assignee_id not in existing]:
+        del tasks[index]
+        errors[index] = ["指定的负责人不存在"]
+
+
+async def insert_tasks(db: AsyncSession, tasks: Dict[int, TaskCreate], created_by: User) -> Dict[int, uuid.UUID]:
+    """
+    批量写入任务（不提交事务）
+
+    ID 在客户端生成，无需 RETURNING 即可返回给调用方
+
+    Args:
+        db: 数据库会话
+        tasks: 待写入任务 {行号: TaskCreate}
+        created_by: 创建人
+
+    Returns:
+        Dict[int, uuid.UUID]: 行号到新任务ID的映射
+    """
+    if not tasks:
+        return {}
+    ids: Dict[int, uuid.UUID] = {}
+    rows = []
+    for index, task in tasks.items():
+        task_id = uuid.uuid4()
+        ids[index] = task_id
+        rows.append({
+            "id": task_id,
+            "title": task.title,
+            "description": task.description,
+            "assignee_id": task.assignee_id,
+            "due_date": task.due_date,
+            "priority": task.priority,
+            "status": TaskStatus.PENDING.value,
+            "created_by": created_by.id,
+            "title_tokens": tokenize_document(task.title),
+            "description_tokens": tokenize_document(task.description),
+        })
+    await db.execute(_BULK_INSERT, rows)
+    await apply_stat_changes(db, added=[stat_key(row["assignee_id"], row["priority"], row["status"]) for row in rows])
+    logger.info(f"用户 {created_by.username} 批量创建了 {len(rows)} 个任务")
+    return ids
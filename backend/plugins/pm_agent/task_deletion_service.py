@@ -2,23 +2,28 @@
 任务删除服务
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Task, TaskDeletionLog, User
-from typing import Optional
+from pagination import apply_keyset
+from permissions import can_delete_task
+from task_stats_service import apply_stat_changes, task_stat_key
+from typing import Any, Dict, List, Optional, Sequence
 import logging
+import uuid
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 
-def create_deletion_log(
-    db: Session,
+async def create_deletion_log(
+    db: AsyncSession,
     task: Task,
     deleted_by: User,
     deletion_reason: Optional[str] = None
 ) -> TaskDeletionLog:
     """
-    创建任务删除日志
+    创建任务删除日志（不提交事务）
     
     Args:
         db: 数据库会话
@@ -36,16 +41,14 @@ def create_deletion_log(
     )
     
     db.add(deletion_log)
-    db.commit()
-    db.refresh(deletion_log)
     
     logger.info(f"用户 {deleted_by.username} 删除了任务 {task.title}，原因: {deletion_reason or '无'}")
     
     return deletion_log
 
 
-def soft_delete_task(
-    db: Session,
+async def soft_delete_task(
+    db: AsyncSession,
     task: Task,
     deleted_by: User,
     deletion_reason: Optional[str] = None
@@ -65,19 +68,17 @@ def soft_delete_task(
     # 设置删除时间
     task.deleted_at = datetime.utcnow()
     
-    # 创建删除日志
-    deletion_log = create_deletion_log(db, task, deleted_by, deletion_reason)
-    
-    # 保存任务
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    # 创建删除日志，与任务更新在同一事务中提交
+    deletion_log = await create_deletion_log(db, task, deleted_by, deletion_reason)
+    await apply_stat_changes(db, removed=[task_stat_key(task)])
+    await db.commit()
+    await db.refresh(deletion_log)
     
     return deletion_log
 
 
-def restore_task(
-    db: Session,
+async def restore_task(
+    db: AsyncSession,
     task: Task,
     restored_by: User
 ) -> Task:
@@ -97,44 +98,192 @@ def restore_task(
     
     # 保存任务
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await apply_stat_changes(db, added=[task_stat_key(task)])
+    await db.commit()
+    await db.refresh(task)
     
     logger.info(f"用户 {restored_by.username} 恢复了任务 {task.title}")
     
     return task
 
 
-def get_deleted_tasks(
-    db: Session,
+async def batch_soft_delete_tasks(
+    db: AsyncSession,
+    task_ids: List[uuid.UUID],
+    deleted_by: User,
+    deletion_reason: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    批量软删除任务（不提交事务）
+    
+    一次查询取出并锁定全部任务，在内存中校验删除权限，
+    再以一条UPDATE设置删除时间并批量写入删除日志
+    
+    Args:
+        db: 数据库会话
+        task_ids: 任务ID列表（已去重）
+        deleted_by: 删除用户
+        deletion_reason: 删除原因
+        
+    Returns:
+        List[Dict]: 与 task_ids 顺序一致的结果，包含 task_id、success、error
+    """
+    result = await db.execute(
+        select(Task.id, Task.created_by, Task.assignee_id, Task.priority, Task.status, Task.deleted_at)
+        .where(Task.id.in_(task_ids))
+        .with_for_update()
+    )
+    rows = {row.id: row for row in result}
+    
+    results = []
+    deleted_ids = []
+    for task_id in task_ids:
+        row = rows.get(task_id)
+        if row is None:
+            error = "任务不存在"
+        elif row.deleted_at is not None:
+            error = "任务已删除"
+        elif not can_delete_task(deleted_by, row):
+            error = "您没有权限删除此任务"
+        else:
+            error = None
+            deleted_ids.append(task_id)
+        results.append({"task_id": task_id, "success": error is None, "error": error})
+    
+    if deleted_ids:
+        # 任务删除时间与删除日志时间取同一事务时间
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(deleted_ids))
+            .values(deleted_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            insert(TaskDeletionLog),
+            [
+                {"task_id": task_id, "deleted_by": deleted_by.id, "deletion_reason": deletion_reason}
+                for task_id in deleted_ids
+            ]
+        )
+        await apply_stat_changes(db, removed=[task_stat_key(rows[task_id]) for task_id in deleted_ids])
+        logger.info(f"用户 {deleted_by.username} 批量删除了 {len(deleted_ids)} 个任务，原因: {deletion_reason or '无'}")
+    
+    return results
+
+
+async def batch_restore_tasks(
+    db: AsyncSession,
+    task_ids: List[uuid.UUID],
+    restored_by: User
+) -> List[Dict[str, Any]]:
+    """
+    批量恢复任务（不提交事务，调用方负责校验恢复权限）
+    
+    Args:
+        db: 数据库会话
+        task_ids: 任务ID列表（已去重）
+        restored_by: 恢复用户
+        
+    Returns:
+        List[Dict]: 与 task_ids 顺序一致的结果，包含 task_id、success、error
+    """
+    result = await db.execute(
+        select(Task.id, Task.assignee_id, Task.priority, Task.status, Task.deleted_at)
+        .where(Task.id.in_(task_ids))
+        .with_for_update()
+    )
+    rows = {row.id: row for row in result}
+    
+    results = []
+    restored_ids = []
+    for task_id in task_ids:
+        row = rows.get(task_id)
+        if row is None or row.deleted_at is None:
+            results.append({"task_id": task_id, "success": False, "error": "已删除的任务不存在"})
+            continue
+        results.append({"task_id": task_id, "success": True, "error": None})
+        restored_ids.append(task_id)
+    
+    if restored_ids:
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(restored_ids))
+            .values(deleted_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await apply_stat_changes(db, added=[task_stat_key(rows[task_id]) for task_id in restored_ids])
+        logger.info(f"用户 {restored_by.username} 批量恢复了 {len(restored_ids)} 个任务")
+    
+    return results
+
+
+async def get_deleted_tasks(
+    db: AsyncSession,
     limit: int = 50,
-    offset: int = 0
-) -> list[Task]:
+    offset: int = 0,
+    after: Optional[List[Any]] = None,
+    deleted_by: Optional[uuid.UUID] = None,
+    deleted_from: Optional[datetime] = None,
+    deleted_to: Optional[datetime] = None
+) -> list[Dict[str, Any]]:
     """
-    获取已删除的任务列表
+    获取已删除的任务列表（附带最近一次删除日志）
+    
+    通过 LATERAL 子查询为每个任务取最新的删除日志，整页只需一次查询
     
     Args:
         db: 数据库会话
         limit: 限制数量
-        offset: 偏移量
+        offset: 偏移量（提供 after 时忽略）
+        after: 上一页最后一行的 (deleted_at, id)，用于键集分页
+        deleted_by: 按删除人过滤
+        deleted_from: 删除时间下限（含）
+        deleted_to: 删除时间上限（不含）
         
     Returns:
-        list[Task]: 已删除任务列表
+        list[dict]: 已删除任务及删除原因、删除人
     """
-    return db.query(Task)\
-        .filter(Task.deleted_at.isnot(None))\
-        .order_by(Task.deleted_at.desc())\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    latest_log = (
+        select(TaskDeletionLog.deletion_reason, TaskDeletionLog.deleted_by)
+        .where(TaskDeletionLog.task_id == Task.id)
+        .order_by(TaskDeletionLog.deleted_at.desc())
+        .limit(1)
+        .lateral("latest_log")
+    )
+    
+    query = (
+        select(
+            Task.id, Task.title, Task.description, Task.assignee_id, Task.due_date,
+            Task.priority, Task.status, Task.created_by, Task.created_at, Task.updated_at,
+            Task.deleted_at, latest_log.c.deletion_reason, latest_log.c.deleted_by
+        )
+        .select_from(Task)
+        .outerjoin(latest_log, true())
+        .where(Task.deleted_at.isnot(None))
+    )
+    
+    if deleted_by:
+        query = query.where(latest_log.c.deleted_by == deleted_by)
+    if deleted_from:
+        query = query.where(Task.deleted_at >= deleted_from)
+    if deleted_to:
+        query = query.where(Task.deleted_at < deleted_to)
+    
+    query = apply_keyset(query, Task.deleted_at, Task.id, "desc", after)
+    if after is None:
+        query = query.offset(offset)
+    
+    result = await db.execute(query.limit(limit))
+    return [dict(row._mapping) for row in result]
 
 
-def get_deletion_logs(
-    db: Session,
+async def get_deletion_logs(
+    db: AsyncSession,
     task_id: Optional[str] = None,
     limit: int = 50,
-    offset: int = 0
-) -> list[TaskDeletionLog]:
+    offset: int = 0,
+    columns: Optional[Sequence[Any]] = None
+) -> list:
     """
     获取删除日志
     
@@ -143,16 +292,19 @@ def get_deletion_logs(
         task_id: 任务ID（可选）
         limit: 限制数量
         offset: 偏移量
+        columns: 只查询指定列（返回行元组），为空时返回 TaskDeletionLog 对象
         
     Returns:
-        list[TaskDeletionLog]: 删除日志列表
+        list: 删除日志列表
     """
-    query = db.query(TaskDeletionLog)
+    query = select(*columns) if columns else select(TaskDeletionLog)
     
     if task_id:
-        query = query.filter(TaskDeletionLog.task_id == task_id)
+        query = query.where(TaskDeletionLog.task_id == task_id)
     
-    return query.order_by(TaskDeletionLog.deleted_at.desc())\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    result = await db.execute(
+        query.order_by(TaskDeletionLog.deleted_at.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+    return list(result.all() if columns else result.scalars().all())
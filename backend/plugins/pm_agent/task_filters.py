@@ -0,0 +1,89 @@
+"""
+任务过滤条件
+
+任务列表与任务导出共用同一套过滤参数与检索模式处理
+"""
+
+from datetime import datetime
+from fastapi import HTTPException, status
+from models import Task
+from search import SEARCH_MODES, build_tsquery, fulltext_match
+from typing import Any, Optional, Tuple
+import uuid
+
+
+def resolve_search(search: Optional[str], search_mode: str) -> Tuple[Optional[Any], str]:
+    """
+    校验检索模式并构造全文检索查询
+
+    Args:
+        search: 检索关键词
+        search_mode: fulltext / like
+
+    Returns:
+        (tsquery, 实际使用的检索模式)：全文检索无法切分出有效词素时退回子串匹配
+
+    Raises:
+        HTTPException: 检索模式无效时返回400
+    """
+    if search_mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无效的检索模式: {search_mode}. 有效选项: {list(SEARCH_MODES)}"
+        )
+    tsquery = build_tsquery(search) if search and search_mode == "fulltext" else None
+    if search and tsquery is None:
+        search_mode = "like"
+    return tsquery, search_mode
+
+
+def apply_task_filters(
+    query,
+    status: Optional[str] = None,
+    assignee_id: Optional[uuid.UUID] = None,
+    priority: Optional[str] = None,
+    search: Optional[str] = None,
+    tsquery: Optional[Any] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """
+    为任务查询附加过滤条件（不含软删除条件）
+
+    Args:
+        query: 任务查询
+        status: 任务状态
+        assignee_id: 负责人ID
+        priority: 优先级
+        search: 检索关键词（tsquery 为空时按子串匹配标题和描述）
+        tsquery: 由 resolve_search 构造的全文检索查询
+        due_from / due_to: 截止日期范围（下限含，上限不含）
+        created_from / created_to: 创建时间范围（下限含，上限不含）
+
+    Returns:
+        附加了过滤条件的查询
+    """
+    if status:
+        query = query.where(Task.status == status)
+    if assignee_id:
+        query = query.where(Task.assignee_id == assignee_id)
+    if priority:
+        query = query.where(Task.priority == priority)
+    if tsquery is not None:
+        query = query.where(fulltext_match(Task.search_vector, tsquery))
+    elif search:
+        query = query.where(
+            (Task.title.ilike(f"%{search}%")) |
+            (Task.description.ilike(f"%{search}%"))
+        )
+    if due_from:
+        query = query.where(Task.due_date >= due_from)
+    if due_to:
+        query = query.where(Task.due_date < due_to)
+    if created_from:
+        query = query.where(Task.created_at >= created_from)
+    if created_to:
+        query = query.where(Task.created_at < created_to)
+    return query
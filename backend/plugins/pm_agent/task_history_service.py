@@ -2,104 +2,130 @@
 任务历史记录服务
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Task, TaskHistory, User
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
 
-def create_task_history_entry(
-    db: Session,
-    task: Task,
-    field_name: str,
-    old_value: Optional[str],
-    new_value: Optional[str],
+# 不记录历史的系统字段
+HISTORY_EXCLUDED_FIELDS = ("id", "created_at", "updated_at", "deleted_at")
+
+
+def _history_value(value: Any) -> Optional[str]:
+    """将字段值转换为历史记录中保存的字符串"""
+    return str(value) if value is not None else None
+
+
+def collect_task_changes(task: Task, update_data: Dict[str, Any]) -> List[Dict[str, Optional[str]]]:
+    """
+    计算任务字段变更
+    
+    必须在修改任务字段之前调用，旧值取自任务当前（更新前）的状态
+    
+    Args:
+        task: 任务对象
+        update_data: 更新数据字典
+        
+    Returns:
+        List[Dict]: 实际发生变化的字段，包含 field_name、old_value、new_value
+    """
+    changes = []
+    for field_name, new_value in update_data.items():
+        if field_name in HISTORY_EXCLUDED_FIELDS:
+            continue
+        old_value_str = _history_value(getattr(task, field_name, None))
+        new_value_str = _history_value(new_value)
+        # 只有当值真正发生变化时才记录
+        if old_value_str != new_value_str:
+            changes.append({
+                "field_name": field_name,
+                "old_value": old_value_str,
+                "new_value": new_value_str,
+            })
+    return changes
+
+
+async def insert_history_rows(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """
+    批量写入历史记录行（单条INSERT语句，不提交事务）
+    
+    Args:
+        db: 数据库会话
+        rows: 包含 task_id、field_name、old_value、new_value、changed_by 的字典列表
+        
+    Returns:
+        int: 写入的记录数
+    """
+    if not rows:
+        return 0
+    await db.execute(insert(TaskHistory), rows)
+    return len(rows)
+
+
+async def add_task_history_entries(
+    db: AsyncSession,
+    task_id: uuid.UUID,
+    changes: List[Dict[str, Optional[str]]],
     changed_by: User
-) -> TaskHistory:
+) -> int:
     """
-    创建任务历史记录条目
+    批量写入历史记录（单条INSERT语句，不提交事务）
     
     Args:
         db: 数据库会话
-        task: 任务对象
-        field_name: 变更字段名
-        old_value: 旧值
-        new_value: 新值
+        task_id: 任务ID
+        changes: collect_task_changes 返回的变更列表
         changed_by: 变更用户
         
     Returns:
-        TaskHistory: 创建的历史记录条目
+        int: 写入的记录数
     """
-    history_entry = TaskHistory(
-        task_id=task.id,
-        field_name=field_name,
-        old_value=old_value,
-        new_value=new_value,
-        changed_by=changed_by.id
+    return await insert_history_rows(
+        db,
+        [{"task_id": task_id, "changed_by": changed_by.id, **change} for change in changes]
     )
-    
-    db.add(history_entry)
-    db.commit()
-    db.refresh(history_entry)
-    
-    logger.info(f"用户 {changed_by.username} 修改了任务 {task.title} 的 {field_name} 字段")
-    
-    return history_entry
 
 
-def record_task_update(
-    db: Session,
+async def record_task_update(
+    db: AsyncSession,
     task: Task,
     update_data: Dict[str, Any],
     changed_by: User
-) -> None:
+) -> int:
     """
     记录任务更新历史
     
+    须在修改任务字段之前调用；历史记录与任务更新在调用方的同一事务中提交
+    
     Args:
         db: 数据库会话
-        task: 任务对象
+        task: 任务对象（更新前的状态）
         update_data: 更新数据字典
         changed_by: 变更用户
-    """
-    # 记录每个变更的字段
-    for field_name, new_value in update_data.items():
-        if field_name in ['id', 'created_at', 'updated_at', 'deleted_at']:
-            continue  # 跳过系统字段
-            
-        old_value = getattr(task, field_name, None)
         
-        # 转换值为字符串进行比较
-        if old_value is not None:
-            old_value_str = str(old_value)
-        else:
-            old_value_str = None
-            
-        if new_value is not None:
-            new_value_str = str(new_value)
-        else:
-            new_value_str = None
-        
-        # 只有当值真正发生变化时才记录
-        if old_value_str != new_value_str:
-            create_task_history_entry(
-                db=db,
-                task=task,
-                field_name=field_name,
-                old_value=old_value_str,
-                new_value=new_value_str,
-                changed_by=changed_by
-            )
-
-
-def get_task_history(
-    db: Session,
+    Returns:
+        int: 写入的记录数
+    """
+    changes = collect_task_changes(task, update_data)
+    written = await add_task_history_entries(db, task.id, changes, changed_by)
+    if written:
+        fields = ", ".join(change["field_name"] for change in changes)
+        logger.info(f"用户 {changed_by.username} 修改了任务 {task.title} 的 {fields} 字段")
+    return written
+
+
+async def get_task_history(
+    db: AsyncSession,
     task_id: str,
     limit: int = 50,
-    offset: int = 0
-) -> list[TaskHistory]:
+    offset: int = 0,
+    columns: Optional[Sequence[Any]] = None
+) -> list:
     """
     获取任务历史记录
     
@@ -108,13 +134,16 @@ def get_task_history(
         task_id: 任务ID
         limit: 限制数量
         offset: 偏移量
+        columns: 只查询指定列（返回行元组），为空时返回 TaskHistory 对象
         
     Returns:
-        list[TaskHistory]: 历史记录列表
+        list: 历史记录列表
     """
-    return db.query(TaskHistory)\
-        .filter(TaskHistory.task_id == task_id)\
-        .order_by(TaskHistory.changed_at.desc())\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    result = await db.execute(
+        (select(*columns) if columns else select(TaskHistory))
+        .where(TaskHistory.task_id == task_id)
+        .order_by(TaskHistory.changed_at.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+    return list(result.all() if columns else result.scalars().all())
@@ -0,0 +1,176 @@
+"""
+任务列表响应缓存
+
+缓存键为规范化的查询参数与调用者的可见范围，缓存值附带写入时的数据版本：
+- 按负责人过滤的查询依赖该负责人的版本
+- 其他查询依赖全局版本
+任务写路径在提交后调用 tasks_changed 递增版本，旧条目在下次读取时自然失效，
+任务列表的总数缓存同时被丢弃。
+相同键的并发未命中合并为一次数据库查询（single-flight）。
+
+缓存不能破坏读己之写：
+- 读己之写窗口内的请求（固定到主库）绕过缓存，直接查询主库
+- 从副本读取的结果只在相关版本最近一次递增已超过窗口与副本延迟上限时写入缓存；
+  否则副本可能尚未包含该版本的写入，却以新版本缓存，窗口结束后仍返回给写入者
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+from cache import TTLCache
+from config import settings
+from database import READ_PRIMARY, READ_PRIMARY_STICKY, READ_REPLICA
+from invalidation import RESET_ALL, publish, subscribe
+from metrics import register_collector
+from pagination import count_cache
+import asyncio
+import time
+import uuid
+
+TOPIC = "task_versions"
+
+# 全局版本对应的键（任意任务变化都会递增）
+_ALL = "*"
+# 未指定负责人的任务
+_UNASSIGNED = "-"
+
+_cache = TTLCache(maxsize=settings.TASK_LIST_CACHE_MAX_ENTRIES, ttl=settings.TASK_LIST_CACHE_TTL_SECONDS)
+_versions: Dict[str, int] = {}
+# 各版本最近一次递增的时刻（monotonic）
+_bumped_at: Dict[str, float] = {}
+# 整体失效的纪元，递增后所有条目失效
+_epoch = 0
+# 启动前其他进程的写入时刻未知，按刚刚整体失效处理
+_epoch_bumped_at = time.monotonic()
+_inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+_coalesced = 0
+# 命中但版本已过期的次数（计入 hits，实际需要重新加载）
+_stale = 0
+# 读己之写窗口内绕过缓存的次数
+_bypassed = 0
+
+
+def _assignee_key(assignee_id: Optional[Any]) -> str:
+    return str(assignee_id) if assignee_id else _UNASSIGNED
+
+
+def current_version(assignee_id: Optional[uuid.UUID] = None) -> Tuple[int, int]:
+    """查询所依赖的数据版本：按负责人过滤时取该负责人的版本，否则取全局版本"""
+    key = _assignee_key(assignee_id) if assignee_id else _ALL
+    return _epoch, _versions.get(key, 0)
+
+
+def _bump(assignee_keys: Iterable[str]) -> None:
+    """递增全局版本及相关负责人的版本，并丢弃任务列表的总数缓存"""
+    global _epoch, _epoch_bumped_at
+    keys = set(assignee_keys)
+    now = time.monotonic()
+    count_cache.discard_where(lambda key, value: key[0] == "tasks")
+    if RESET_ALL in keys:
+        _epoch += 1
+        _epoch_bumped_at = now
+        _cache.clear()
+        return
+    for key in keys | {_ALL}:
+        _versions[key] = _versions.get(key, 0) + 1
+        _bumped_at[key] = now
+
+
+def cacheable(read_target: str, assignee_id: Optional[uuid.UUID] = None) -> bool:
+    """
+    本次读取的结果能否写入缓存（任务列表及其总数）
+
+    Args:
+        read_target: 只读会话的路由目标（见 database.route_read）
+        assignee_id: 查询按负责人过滤时为该负责人，否则取全局版本
+    """
+    if read_target == READ_PRIMARY_STICKY:
+        return False
+    if read_target != READ_REPLICA:
+        return True
+    key = _assignee_key(assignee_id) if assignee_id else _ALL
+    quiet = max(settings.READ_YOUR_WRITES_WINDOW_SECONDS, settings.REPLICA_MAX_LAG_SECONDS)
+    return time.monotonic() - max(_epoch_bumped_at, _bumped_at.get(key, 0.0)) >= quiet
+
+
+def _on_message(payload: str) -> None:
+    """处理其他进程广播的版本变更"""
+    _bump(payload.split(",") if payload else [RESET_ALL])
+
+
+subscribe(TOPIC, _on_message)
+
+
+async def tasks_changed(*assignee_ids: Optional[Any]) -> None:
+    """
+    任务数据变更后递增版本（需在提交之后调用）
+
+    Args:
+        assignee_ids: 受影响任务的负责人（修改负责人时应同时传入新旧负责人），
+            不传时视为影响全部任务
+    """
+    keys = [_assignee_key(assignee_id) for assignee_id in assignee_ids] if assignee_ids else [RESET_ALL]
+    await publish(TOPIC, ",".join(sorted(set(keys))))
+
+
+async def get_or_load(
+    key: Hashable,
+    assignee_id: Optional[uuid.UUID],
+    loader: Callable[[], Awaitable[Any]],
+    read_target: str = READ_PRIMARY
+) -> Any:
+    """
+    读取缓存的列表响应，未命中或版本过期时调用 loader 加载
+
+    版本在加载前取得，加载期间发生的写入会使本次结果在下次读取时失效。
+    读己之写窗口内的请求不读取也不写入缓存；副本读取的结果按 cacheable 决定是否写入。
+    """
+    global _coalesced, _stale, _bypassed
+    if read_target == READ_PRIMARY_STICKY:
+        _bypassed += 1
+        return await loader()
+    version = current_version(assignee_id)
+    fill = cacheable(read_target, assignee_id)
+    entry = _cache.get(key)
+    if entry is not None:
+        if entry[0] == version:
+            return entry[1]
+        _stale += 1
+
+    flight_key = (key, version)
+    pending = _inflight.get(flight_key)
+    if pending is not None:
+        _coalesced += 1
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # 发起加载的请求被取消，由当前请求自行加载
+            return await loader()
+
+    future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+    _inflight[flight_key] = future
+    try:
+        value = await loader()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # 避免无等待者时出现“异常未被获取”的警告
+        future.exception()
+        raise
+    else:
+        future.set_result(value)
+        if fill:
+            _cache.set(key, (version, value))
+        return value
+    finally:
+        _inflight.pop(flight_key, None)
+
+
+def stats() -> Dict[str, Any]:
+    """缓存统计"""
+    return {**_cache.stats(), "stale": _stale, "coalesced": _coalesced, "bypassed": _bypassed, "inflight": len(_inflight), "epoch": _epoch}
+
+
+register_collector("task_list_cache", stats)
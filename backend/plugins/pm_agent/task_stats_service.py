@@ -0,0 +1,260 @@
+"""
+任务统计服务
+
+按（负责人, 优先级, 状态）维护未删除任务数的汇总表 task_stat_counters：
+- 写路径在同一事务中以 UPSERT 累加增量
+- 定时任务按 tasks 表全量校准，修正增量遗漏造成的偏差
+统计读取只汇总计数行，耗时与任务总数无关。
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import and_, delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from metrics import register_collector
+from models import OPEN_TASK_STATUSES, Task, TaskPriority, TaskStatCounter, TaskStatus
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+# 未分配负责人的任务在计数表中的负责人ID
+UNASSIGNED = uuid.UUID(int=0)
+
+# 校准时使用的事务级咨询锁，多进程部署时只有一个进程执行校准
+_RECONCILE_LOCK_ID = 0x706D5F7374617473
+
+StatKey = Tuple[uuid.UUID, str, str]
+
+# 用户负载字段：未完成、逾期、高优先级未完成的任务数
+WORKLOAD_FIELDS = ("open_tasks", "overdue_tasks", "high_priority_tasks")
+
+_reconcile_stats: Dict[str, Any] = {
+    "runs": 0,
+    "skipped": 0,
+    "corrected_groups": 0,
+    "last_drift": 0,
+    "last_run_at": None,
+}
+
+
+def stat_key(assignee_id: Optional[uuid.UUID], priority: str, status: str) -> StatKey:
+    """计数表的分组键"""
+    return (assignee_id or UNASSIGNED, priority, status)
+
+
+def task_stat_key(task: Any) -> StatKey:
+    """任务（对象或包含 assignee_id、priority、status 的行）所在的分组"""
+    return stat_key(task.assignee_id, task.priority, task.status)
+
+
+async def apply_stat_changes(
+    db: AsyncSession,
+    added: Iterable[StatKey] = (),
+    removed: Iterable[StatKey] = ()
+) -> None:
+    """
+    累加计数增量（不提交事务，应与任务写入在同一事务中执行）
+
+    Args:
+        db: 数据库会话
+        added: 新增（或移入）任务所在的分组
+        removed: 删除（或移出）任务所在的分组
+    """
+    deltas: Counter = Counter(added)
+    deltas.subtract(removed)
+    await _apply_deltas(db, deltas)
+
+
+async def _apply_deltas(db: AsyncSession, deltas: Dict[StatKey, int]) -> None:
+    # 按键排序，保证并发事务以相同顺序锁定计数行
+    rows = [
+        {"assignee_id": key[0], "priority": key[1], "status": key[2], "task_count": delta}
+        for key, delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+    statement = pg_insert(TaskStatCounter).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[TaskStatCounter.assignee_id, TaskStatCounter.priority, TaskStatCounter.status],
+        set_={
+            "task_count": TaskStatCounter.task_count + statement.excluded.task_count,
+            "updated_at": func.now(),
+        }
+    )
+    await db.execute(statement)
+
+
+async def reconcile_task_stats(db: AsyncSession) -> Optional[Dict[str, int]]:
+    """
+    按 tasks 表全量校准计数并提交
+
+    先锁定计数表阻止并发的增量写入，再在新快照中聚合源表：已提交的写入都已计入源表，
+    未提交的写入会在校准结束后再累加增量，因此校准结果不会丢失并发变更。
+
+    Args:
+        db: 数据库会话（主库）
+
+    Returns:
+        Dict: 偏差的分组数与偏差任务数；其他进程正在校准时返回None
+    """
+    if not await db.scalar(select(func.pg_try_advisory_xact_lock(_RECONCILE_LOCK_ID))):
+        await db.rollback()
+        _reconcile_stats["skipped"] += 1
+        return None
+    await db.execute(text("LOCK TABLE task_stat_counters IN SHARE ROW EXCLUSIVE MODE"))
+
+    source = {
+        stat_key(row.assignee_id, row.priority, row.status): row.task_count
+        for row in await db.execute(
+            select(Task.assignee_id, Task.priority, Task.status, func.count().label("task_count"))
+            .where(Task.deleted_at.is_(None))
+            .group_by(Task.assignee_id, Task.priority, Task.status)
+        )
+    }
+    current = {
+        (row.assignee_id, row.priority, row.status): row.task_count
+        for row in await db.execute(
+            select(TaskStatCounter.assignee_id, TaskStatCounter.priority, TaskStatCounter.status, TaskStatCounter.task_count)
+        )
+    }
+    drift = {
+        key: source.get(key, 0) - current.get(key, 0)
+        for key in source.keys() | current.keys()
+        if source.get(key, 0) != current.get(key, 0)
+    }
+    await _apply_deltas(db, drift)
+    await db.execute(delete(TaskStatCounter).where(TaskStatCounter.task_count == 0))
+    await db.commit()
+
+    drifted_tasks = sum(abs(delta) for delta in drift.values())
+    _reconcile_stats["runs"] += 1
+    _reconcile_stats["corrected_groups"] += len(drift)
+    _reconcile_stats["last_drift"] = drifted_tasks
+    _reconcile_stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+    if drift:
+        logger.warning(f"任务统计校准修正了 {len(drift)} 个分组，共 {drifted_tasks} 个任务的偏差")
+    return {"groups": len(drift), "tasks": drifted_tasks}
+
+
+async def _past_due_open_counts(
+    db: AsyncSession,
+    assignee_ids: Optional[Sequence[uuid.UUID]] = None
+) -> Dict[uuid.UUID, int]:
+    """
+    按负责人统计已过截止时间、但状态尚未标记为逾期的未完成任务数
+
+    计数表按状态分组，无法反映随时间到期的任务。该查询只扫描 idx_tasks_open_due_date
+    部分索引中截止时间已过的部分，行数等于逾期扫描尚未处理的任务数，与任务总数无关。
+    状态条件以常量写入SQL，保证规划器可以匹配部分索引。
+    """
+    query = (
+        select(Task.assignee_id, func.count().label("task_count"))
+        .where(
+            Task.deleted_at.is_(None),
+            Task.status.in_([literal(value, literal_execute=True) for value in OPEN_TASK_STATUSES]),
+            Task.due_date < func.now()
+        )
+        .group_by(Task.assignee_id)
+    )
+    if assignee_ids is not None:
+        query = query.where(Task.assignee_id.in_(list(assignee_ids)))
+    return {row.assignee_id or UNASSIGNED: row.task_count for row in await db.execute(query)}
+
+
+async def get_task_stats(db: AsyncSession, assignee_id: Optional[uuid.UUID] = None) -> Dict[str, Any]:
+    """
+    汇总任务统计
+
+    Args:
+        db: 数据库会话
+        assignee_id: 只统计指定负责人的任务
+
+    Returns:
+        Dict: 总数、完成率、逾期占比及按状态、优先级、负责人的分布；
+        逾期数包含已过截止时间但尚未标记为逾期的未完成任务，按状态的分布为任务当前状态
+    """
+    query = select(
+        TaskStatCounter.assignee_id, TaskStatCounter.priority, TaskStatCounter.status, TaskStatCounter.task_count
+    ).where(TaskStatCounter.task_count != 0)
+    if assignee_id:
+        query = query.where(TaskStatCounter.assignee_id == assignee_id)
+
+    by_status: Counter = Counter()
+    by_priority: Counter = Counter()
+    by_assignee: Dict[uuid.UUID, Counter] = {}
+    for row in await db.execute(query):
+        by_status[row.status] += row.task_count
+        by_priority[row.priority] += row.task_count
+        assignee = by_assignee.setdefault(row.assignee_id, Counter())
+        assignee["total"] += row.task_count
+        assignee[row.status] += row.task_count
+
+    past_due = await _past_due_open_counts(db, [assignee_id] if assignee_id else None)
+    for key, count in past_due.items():
+        by_assignee.setdefault(key, Counter())["past_due"] += count
+
+    total = sum(by_status.values())
+    completed = by_status[TaskStatus.COMPLETED.value]
+    overdue = by_status[TaskStatus.OVERDUE.value] + sum(past_due.values())
+    return {
+        "total": total,
+        "completed": completed,
+        "overdue": overdue,
+        "completion_rate": round(completed / total, 4) if total else 0.0,
+        "overdue_ratio": round(overdue / total, 4) if total else 0.0,
+        "by_status": dict(by_status),
+        "by_priority": dict(by_priority),
+        "by_assignee": [
+            {
+                "assignee_id": None if key == UNASSIGNED else key,
+                "total": counts["total"],
+                "completed": counts[TaskStatus.COMPLETED.value],
+                "overdue": counts[TaskStatus.OVERDUE.value] + counts["past_due"],
+            }
+            for key, counts in sorted(by_assignee.items(), key=lambda item: -item[1]["total"])
+        ],
+    }
+
+
+async def get_assignee_workloads(db: AsyncSession, assignee_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, Dict[str, int]]:
+    """
+    批量读取用户的任务负载（查询计数表，另以部分索引统计尚未标记的逾期任务）
+
+    Args:
+        db: 数据库会话
+        assignee_ids: 用户ID列表
+
+    Returns:
+        Dict: 用户ID到负载字段的映射，没有任务的用户各项为0；逾期数包含已过截止时间的未完成任务
+    """
+    workloads = {assignee_id: dict.fromkeys(WORKLOAD_FIELDS, 0) for assignee_id in assignee_ids}
+    if not workloads:
+        return workloads
+    is_open = TaskStatCounter.status != TaskStatus.COMPLETED.value
+    result = await db.execute(
+        select(
+            TaskStatCounter.assignee_id,
+            func.coalesce(func.sum(TaskStatCounter.task_count).filter(is_open), 0).label("open_tasks"),
+            func.coalesce(
+                func.sum(TaskStatCounter.task_count).filter(TaskStatCounter.status == TaskStatus.OVERDUE.value), 0
+            ).label("overdue_tasks"),
+            func.coalesce(
+                func.sum(TaskStatCounter.task_count).filter(and_(is_open, TaskStatCounter.priority == TaskPriority.HIGH.value)), 0
+            ).label("high_priority_tasks"),
+        )
+        .where(TaskStatCounter.assignee_id.in_(list(workloads)))
+        .group_by(TaskStatCounter.assignee_id)
+    )
+    for row in result:
+        workloads[row.assignee_id] = {name: int(getattr(row, name)) for name in WORKLOAD_FIELDS}
+    # 已过截止时间但尚未标记逾期的任务也计入逾期数
+    for assignee_id, count in (await _past_due_open_counts(db, list(workloads))).items():
+        workloads[assignee_id]["overdue_tasks"] += count
+    return workloads
+
+
+register_collector("task_stats", lambda: dict(_reconcile_stats))
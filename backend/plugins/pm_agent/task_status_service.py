@@ -0,0 +1,105 @@
+"""
+任务状态流转服务
+"""
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Task, TaskStatus, User
+from permissions import can_edit_task
+from task_history_service import insert_history_rows
+from task_stats_service import apply_stat_changes, stat_key, task_stat_key
+from typing import Any, Dict, List
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+# 允许的状态转换
+ALLOWED_STATUS_TRANSITIONS = {
+    TaskStatus.PENDING.value: [TaskStatus.IN_PROGRESS.value, TaskStatus.BLOCKED.value, TaskStatus.OVERDUE.value],
+    TaskStatus.IN_PROGRESS.value: [TaskStatus.COMPLETED.value, TaskStatus.BLOCKED.value, TaskStatus.OVERDUE.value],
+    TaskStatus.BLOCKED.value: [TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value, TaskStatus.OVERDUE.value],
+    TaskStatus.OVERDUE.value: [TaskStatus.IN_PROGRESS.value, TaskStatus.COMPLETED.value, TaskStatus.BLOCKED.value],
+    TaskStatus.COMPLETED.value: [TaskStatus.IN_PROGRESS.value, TaskStatus.BLOCKED.value]  # 已完成的任务可以重新开始
+}
+
+
+def is_transition_allowed(old_status: str, new_status: str) -> bool:
+    """判断状态转换是否允许"""
+    return new_status in ALLOWED_STATUS_TRANSITIONS.get(old_status, [])
+
+
+async def batch_update_status(
+    db: AsyncSession,
+    task_ids: List[uuid.UUID],
+    new_status: str,
+    changed_by: User
+) -> List[Dict[str, Any]]:
+    """
+    批量更新任务状态（不提交事务）
+
+    一次查询取出并锁定全部任务，在内存中完成权限与状态转换校验，
+    再以一条UPDATE更新所有通过校验的任务，并批量写入历史记录。
+
+    Args:
+        db: 数据库会话
+        task_ids: 任务ID列表（已去重）
+        new_status: 目标状态
+        changed_by: 操作用户
+
+    Returns:
+        List[Dict]: 与 task_ids 顺序一致的结果，包含 task_id、success、old_status、error
+    """
+    result = await db.execute(
+        select(Task.id, Task.status, Task.priority, Task.assignee_id, Task.created_by)
+        .where(Task.id.in_(task_ids), Task.deleted_at.is_(None))
+        .with_for_update()
+    )
+    rows = {row.id: row for row in result}
+
+    results = []
+    updated_ids = []
+    history_rows = []
+    for task_id in task_ids:
+        row = rows.get(task_id)
+        if row is None:
+            results.append({"task_id": task_id, "success": False, "old_status": None, "error": "任务不存在"})
+            continue
+        if not can_edit_task(changed_by, row):
+            results.append({"task_id": task_id, "success": False, "old_status": row.status, "error": "您没有权限编辑此任务"})
+            continue
+        if not is_transition_allowed(row.status, new_status):
+            results.append({
+                "task_id": task_id,
+                "success": False,
+                "old_status": row.status,
+                "error": f"不允许从状态 '{row.status}' 转换到 '{new_status}'"
+            })
+            continue
+        results.append({"task_id": task_id, "success": True, "old_status": row.status, "error": None})
+        updated_ids.append(task_id)
+        history_rows.append({
+            "task_id": task_id,
+            "field_name": "status",
+            "old_value": row.status,
+            "new_value": new_status,
+            "changed_by": changed_by.id,
+        })
+
+    if updated_ids:
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(updated_ids))
+            .values(status=new_status)
+            .execution_options(synchronize_session=False)
+        )
+        await insert_history_rows(db, history_rows)
+        await apply_stat_changes(
+            db,
+            added=[stat_key(rows[task_id].assignee_id, rows[task_id].priority, new_status) for task_id in updated_ids],
+            removed=[task_stat_key(rows[task_id]) for task_id in updated_ids]
+        )
+        logger.info(f"用户 {changed_by.username} 将 {len(updated_ids)} 个任务状态更新为 {new_status}")
+
+    return results
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
+from config import settings
 from database import get_db
+from pagination import COUNT_MODES, count_cache_key, fetch_page
 from models import User
-from schemas import UserCreate, UserUpdate, UserResponse, UserListResponse
-from security import get_current_user, hash_password
+from schemas import UserCreate, UserUpdate, UserResponse, UserListResponse, UserSuggestion
+from security import get_current_user
+from db_routing import get_read_db
+from conditional import has_conditional_headers, is_not_modified, make_etag, not_modified_response, set_validators
+from password_hashing import hash_password
+from serialization import schema_columns, parse_fields, rows_to_dicts, dumps, json_response
+from principal_cache import invalidate_principal
+from task_stats_service import WORKLOAD_FIELDS, get_assignee_workloads
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,47 +28,73 @@ async def list_users(
     role: Optional[str] = Query(None, description="Filter by role"),
     status: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search by username or email"),
+    count: str = Query("exact", description="Total count mode: exact, estimated or none"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取用户列表
     
-    支持分页、过滤和搜索功能
+    支持分页、过滤和搜索功能；按响应字段查询列元组并直接编码为JSON，
+    指定 fields 时只查询和返回这些列。任务负载字段（open_tasks、overdue_tasks、
+    high_priority_tasks）读取任务统计计数表，整页用户只需一次查询
     """
     try:
-        # 构建查询
-        query = db.query(User)
+        if count not in COUNT_MODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"无效的计数模式: {count}. 有效选项: {list(COUNT_MODES)}"
+            )
+        
+        names = parse_fields(fields, UserResponse)
+        columns = tuple(name for name in names if name not in WORKLOAD_FIELDS)
+        workload_fields = [name for name in names if name in WORKLOAD_FIELDS]
+        
+        # 构建查询（不列出逾期扫描使用的系统操作用户）
+        query = select(*schema_columns(User, UserResponse, columns)).where(
+            User.username != settings.SYSTEM_ACTOR_USERNAME
+        )
         
         # 角色过滤
         if role:
-            query = query.filter(User.role == role)
+            query = query.where(User.role == role)
         
         # 状态过滤
         if status:
-            query = query.filter(User.status == status)
+            query = query.where(User.status == status)
         
         # 搜索过滤
         if search:
             search_filter = f"%{search}%"
-            query = query.filter(
+            query = query.where(
                 (User.username.ilike(search_filter)) |
                 (User.email.ilike(search_filter))
             )
         
-        # 获取总数
-        total = query.count()
+        # 分页查询并按计数模式获取总数
+        cache_key = count_cache_key("users", role=role, status=status, search=search)
+        rows, total = await fetch_page(
+            db, query, query.offset(skip).limit(limit),
+            count_mode=count, cache_key=cache_key, as_rows=True
+        )
         
-        # 分页查询
-        users = query.offset(skip).limit(limit).all()
+        users = rows_to_dicts(rows, columns)
+        if workload_fields:
+            workloads = await get_assignee_workloads(db, [user["id"] for user in users])
+            for user in users:
+                workload = workloads[user["id"]]
+                user.update((name, workload[name]) for name in workload_fields)
         
-        return UserListResponse(
-            users=users,
-            total=total,
-            skip=skip,
-            limit=limit
-        )
+        return json_response(dumps({
+            "users": users,
+            "total": total,
+            "skip": skip,
+            "limit": limit
+        }))
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"获取用户列表失败: {e}")
         raise HTTPException(
@@ -71,7 +106,7 @@ async def list_users(
 async def create_user(
     user_data: UserCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     创建新用户
@@ -87,10 +122,13 @@ async def create_user(
             )
         
         # 检查用户名和邮箱是否已存在
-        existing_user = db.query(User).filter(
-            (User.username == user_data.username) | 
-            (User.email == user_data.email)
-        ).first()
+        result = await db.execute(
+            select(User).where(
+                (User.username == user_data.username) | 
+                (User.email == user_data.email)
+            )
+        )
+        existing_user = result.scalars().first()
         
         if existing_user:
             raise HTTPException(
@@ -99,7 +137,7 @@ async def create_user(
             )
         
         # 创建新用户
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await hash_password(user_data.password)
         user = User(
             username=user_data.username,
             email=user_data.email,
@@ -109,8 +147,8 @@ async def create_user(
         )
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         logger.info(f"用户 {user.username} 创建成功")
         return user
@@ -118,33 +156,100 @@ async def create_user(
     except HTTPException:
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"数据库完整性错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="用户名或邮箱已存在"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"创建用户失败: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="创建用户失败"
         )
 
+def _escape_like(value: str) -> str:
+    """转义LIKE通配符"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@router.get("/suggest", response_model=List[UserSuggestion])
+async def suggest_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Username or email fragment"),
+    limit: int = Query(10, ge=1, le=20, description="Number of suggestions to return"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    用户联想搜索（分配任务时的用户选择器）
+    
+    不足3个字符时按用户名/邮箱前缀匹配；否则使用 pg_trgm 三元组索引按相似度排序
+    """
+    try:
+        term = q.strip().lower()
+        if not term:
+            return []
+        
+        query = select(User.id, User.username, User.email).where(
+            User.status == "active",
+            User.username != settings.SYSTEM_ACTOR_USERNAME
+        )
+        pattern = _escape_like(term)
+        
+        if len(term) < 3:
+            # 三元组无法覆盖过短的输入，使用 lower(...) text_pattern_ops 前缀索引
+            query = query.where(
+                func.lower(User.username).like(f"{pattern}%") |
+                func.lower(User.email).like(f"{pattern}%")
+            ).order_by(User.username)
+        else:
+            # 子串匹配与词相似度匹配均可使用 gin_trgm_ops 索引
+            similarity = func.greatest(
+                func.word_similarity(term, User.username),
+                func.word_similarity(term, User.email)
+            )
+            query = query.where(
+                User.username.ilike(f"%{pattern}%") |
+                User.email.ilike(f"%{pattern}%") |
+                User.username.op("%>")(term) |
+                User.email.op("%>")(term)
+            ).order_by(similarity.desc(), User.username)
+        
+        result = await db.execute(query.limit(limit))
+        return [UserSuggestion(id=row.id, username=row.username, email=row.email) for row in result]
+        
+    except Exception as e:
+        logger.error(f"用户联想搜索失败: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="用户联想搜索失败"
+        )
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     获取用户详情
     
-    用户只能查看自己的信息，管理员可以查看所有用户
+    用户只能查看自己的信息，管理员可以查看所有用户。
+    支持条件请求，未变化时返回304
     """
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        if has_conditional_headers(request):
+            row = (await db.execute(select(User.id, User.updated_at).where(User.id == user_id))).first()
+            if row and (current_user.role == "admin" or str(current_user.id) == user_id):
+                etag = make_etag(row.id, row.updated_at)
+                if is_not_modified(request, etag, row.updated_at):
+                    return not_modified_response(etag, row.updated_at)
+        
+        user = await db.scalar(select(User).where(User.id == user_id))
         
         if not user:
             raise HTTPException(
@@ -159,6 +264,7 @@ async def get_user(
                 detail="权限不足"
             )
         
+        set_validators(response, make_etag(user.id, user.updated_at), user.updated_at)
         return user
         
     except HTTPException:
@@ -175,7 +281,7 @@ async def update_user(
     user_id: str,
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     更新用户信息
@@ -183,7 +289,7 @@ async def update_user(
     用户可以更新自己的基本信息，管理员可以更新所有用户
     """
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.scalar(select(User).where(User.id == user_id))
         
         if not user:
             raise HTTPException(
@@ -200,7 +306,7 @@ async def update_user(
         
         # 如果更新用户名或邮箱，检查重复
         if user_data.username and user_data.username != user.username:
-            existing = db.query(User).filter(User.username == user_data.username).first()
+            existing = await db.scalar(select(User).where(User.username == user_data.username))
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -209,7 +315,7 @@ async def update_user(
             user.username = user_data.username
         
         if user_data.email and user_data.email != user.email:
-            existing = db.query(User).filter(User.email == user_data.email).first()
+            existing = await db.scalar(select(User).where(User.email == user_data.email))
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -219,7 +325,7 @@ async def update_user(
         
         # 更新密码
         if user_data.password:
-            user.password_hash = hash_password(user_data.password)
+            user.password_hash = await hash_password(user_data.password)
         
         # 更新角色和状态（仅管理员）
         if current_user.role == "admin":
@@ -228,8 +334,9 @@ async def update_user(
             if user_data.status:
                 user.status = user_data.status
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        await invalidate_principal(user.id)
         
         logger.info(f"用户 {user.username} 更新成功")
         return user
@@ -237,14 +344,14 @@ async def update_user(
     except HTTPException:
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"数据库完整性错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="用户名或邮箱已存在"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"更新用户失败: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -255,7 +362,7 @@ async def update_user(
 async def delete_user(
     user_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     删除用户
@@ -276,7 +383,7 @@ async def delete_user(
                 detail="不能删除自己"
             )
         
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.scalar(select(User).where(User.id == user_id))
         
         if not user:
             raise HTTPException(
@@ -286,7 +393,8 @@ async def delete_user(
         
         # 软删除：将状态设置为inactive而不是真正删除
         user.status = "inactive"
-        db.commit()
+        await db.commit()
+        await invalidate_principal(user.id)
         
         logger.info(f"用户 {user.username} 已停用")
         return {"message": f"用户 {user.username} 已停用"}
@@ -294,7 +402,7 @@ async def delete_user(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"删除用户失败: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -314,7 +422,7 @@ async def get_current_user_profile(
 async def update_current_user_profile(
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     更新当前用户信息
@@ -324,7 +432,7 @@ async def update_current_user_profile(
     try:
         # 检查用户名重复
         if user_data.username and user_data.username != current_user.username:
-            existing = db.query(User).filter(User.username == user_data.username).first()
+            existing = await db.scalar(select(User).where(User.username == user_data.username))
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -334,7 +442,7 @@ async def update_current_user_profile(
         
         # 检查邮箱重复
         if user_data.email and user_data.email != current_user.email:
-            existing = db.query(User).filter(User.email == user_data.email).first()
+            existing = await db.scalar(select(User).where(User.email == user_data.email))
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -344,12 +452,13 @@ async def update_current_user_profile(
         
         # 更新密码
         if user_data.password:
-            current_user.password_hash = hash_password(user_data.password)
+            current_user.password_hash = await hash_password(user_data.password)
         
         # 注意：普通用户不能更新role和status
         
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        await db.refresh(current_user)
+        await invalidate_principal(current_user.id)
         
         logger.info(f"用户 {current_user.username} 更新个人信息成功")
         return current_user
@@ -357,14 +466,14 @@ async def update_current_user_profile(
     except HTTPException:
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"数据库完整性错误: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="用户名或邮箱已存在"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"更新个人信息失败: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
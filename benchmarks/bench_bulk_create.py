@@ -0,0 +1,80 @@
+"""
+批量创建任务基准测试
+
+生成指定数量的任务，分别通过 POST /tasks/bulk（一次请求）与逐条 POST /tasks
+写入，对比总耗时与每秒写入行数。需要运行中的服务与默认管理员账号。
+
+示例:
+    python benchmarks/bench_bulk_create.py --count 10000 --single-count 500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import httpx
+
+from bench_concurrent_latency import DEFAULT_BASE_URL, login
+
+
+def make_tasks(count: int, assignee_id: str) -> List[dict]:
+    """生成测试任务"""
+    due = datetime.now(timezone.utc) + timedelta(days=30)
+    priorities = ["low", "medium", "high"]
+    return [
+        {
+            "title": f"批量基准任务 {i}",
+            "description": f"项目计划导入的第 {i} 项工作",
+            "assignee_id": assignee_id,
+            "due_date": (due + timedelta(hours=i % 240)).isoformat(),
+            "priority": priorities[i % len(priorities)],
+        }
+        for i in range(count)
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="批量创建任务基准测试")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--count", type=int, default=10000, help="批量接口写入的任务数")
+    parser.add_argument("--single-count", type=int, default=200, help="逐条接口写入的任务数，0表示跳过")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=300.0) as client:
+        token = await login(client, args.base_url, args.username, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+        me = (await client.get("/auth/me")).json()
+
+        results = {}
+        tasks = make_tasks(args.count, me["id"])
+        started = time.perf_counter()
+        response = await client.post("/tasks/bulk", json={"tasks": tasks, "mode": "all_or_nothing"})
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        results["bulk"] = {
+            "rows": response.json()["created"],
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(args.count / elapsed, 1),
+        }
+
+        if args.single_count:
+            started = time.perf_counter()
+            for task in make_tasks(args.single_count, me["id"]):
+                (await client.post("/tasks", json=task)).raise_for_status()
+            elapsed = time.perf_counter() - started
+            results["single"] = {
+                "rows": args.single_count,
+                "elapsed_s": round(elapsed, 3),
+                "rows_per_s": round(args.single_count / elapsed, 1),
+            }
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+并发延迟基准测试
+
+对运行中的服务发起固定并发的请求，统计吞吐量与 p50/p95/p99 延迟。
+用于对比同步数据库会话（阻塞事件循环）与异步会话改造前后的表现：
+分别在改造前后的提交上启动服务，使用相同参数运行本脚本即可。
+
+示例:
+    python benchmarks/bench_concurrent_latency.py --path /tasks --concurrency 50 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import time
+from typing import List, Optional
+
+import httpx
+
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8000/api/pm_agent"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def login(client: httpx.AsyncClient, base_url: str, username: str, password: str) -> str:
+    """登录并返回访问令牌"""
+    response = await client.post(f"{base_url}/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(
+    base_url: str,
+    method: str,
+    path: str,
+    concurrency: int,
+    total_requests: int,
+    body: Optional[dict],
+    headers: dict,
+) -> dict:
+    """以固定并发执行请求并收集延迟"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = total_requests
+    lock = asyncio.Lock()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while True:
+                async with lock:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, f"{base_url}{path}", json=body, headers=headers)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="并发延迟基准测试")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--path", default="/tasks")
+    parser.add_argument("--json", dest="body", default=None, help="请求体（JSON字符串）")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--no-auth", action="store_true", help="不携带访问令牌")
+    args = parser.parse_args()
+
+    headers = {}
+    if not args.no_auth:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            token = await login(client, args.base_url, args.username, args.password)
+        headers["Authorization"] = f"Bearer {token}"
+
+    body = json.loads(args.body) if args.body else None
+    result = await run(args.base_url, args.method.upper(), args.path, args.concurrency, args.requests, body, headers)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
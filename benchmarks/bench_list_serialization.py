@@ -0,0 +1,107 @@
+"""
+任务列表序列化基准测试
+
+对比两种构造任务列表响应体的方式（每页默认100行）：
+- orm: 查询 Task 对象，经 TaskListResponse 的 from_attributes 校验，
+  再按 FastAPI 默认流程校验响应模型并用标准库 json 编码
+- fast: 按响应字段查询列元组，直接用 orjson 编码（当前 GET /tasks 的实现）
+
+分别统计含查询与仅序列化两种情况下的每秒行数。需要可用且有足够任务数据的数据库，
+建议关闭 DEBUG 以免SQL日志影响结果。
+
+示例:
+    DEBUG=false python benchmarks/bench_list_serialization.py --pages 200 --limit 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend", "plugins", "pm_agent"))
+
+from database import AsyncSessionLocal, engine  # noqa: E402
+from models import Task  # noqa: E402
+from schemas import TaskListResponse, TaskResponse  # noqa: E402
+from serialization import dumps, rows_to_dicts, schema_columns  # noqa: E402
+
+COLUMNS = schema_columns(Task, TaskResponse)
+ADAPTER = TypeAdapter(TaskListResponse)
+
+
+def encode_orm(tasks, limit):
+    """与原实现一致：构造响应模型，FastAPI 再次校验后以标准库 json 编码"""
+    response = TaskListResponse(tasks=tasks, total=None, skip=0, limit=limit)
+    validated = ADAPTER.validate_python(response, from_attributes=True)
+    content = ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_fast(rows, limit):
+    return dumps({"tasks": rows_to_dicts(rows, TaskResponse.model_fields), "total": None, "skip": 0, "limit": limit, "next_cursor": None})
+
+
+async def fetch_orm(db, limit, offset):
+    result = await db.execute(select(Task).order_by(Task.created_at.desc(), Task.id.desc()).offset(offset).limit(limit))
+    return list(result.scalars().all())
+
+
+async def fetch_fast(db, limit, offset):
+    result = await db.execute(select(*COLUMNS).order_by(Task.created_at.desc(), Task.id.desc()).offset(offset).limit(limit))
+    return list(result.all())
+
+
+async def run(name, fetch, encode, pages, limit):
+    rows_total = 0
+    encode_seconds = 0.0
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for page in range(pages):
+            # 在前10页之间循环，避免深度 OFFSET 扫描掩盖序列化开销
+            items = await fetch(db, limit, (page % 10) * limit)
+            # 每页后清空会话，避免ORM标识映射跨页复用对象
+            db.expunge_all()
+            encode_started = time.perf_counter()
+            body = encode(items, limit)
+            encode_seconds += time.perf_counter() - encode_started
+            rows_total += len(items)
+    elapsed = time.perf_counter() - started
+    return {
+        "path": name,
+        "rows": rows_total,
+        "bytes_last_page": len(body),
+        "rows_per_sec": round(rows_total / elapsed),
+        "serialize_rows_per_sec": round(rows_total / encode_seconds) if encode_seconds else None,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="任务列表序列化基准测试")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    # 预热连接池与语句缓存
+    await run("warmup", fetch_fast, encode_fast, 2, args.limit)
+    results = [
+        await run("orm", fetch_orm, encode_orm, args.pages, args.limit),
+        await run("fast", fetch_fast, encode_fast, args.pages, args.limit),
+    ]
+    orm, fast = results
+    print(json.dumps({
+        "pages": args.pages,
+        "limit": args.limit,
+        "results": results,
+        "speedup": round(fast["rows_per_sec"] / orm["rows_per_sec"], 2),
+        "serialize_speedup": round(fast["serialize_rows_per_sec"] / orm["serialize_rows_per_sec"], 2),
+    }, ensure_ascii=False, indent=2))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
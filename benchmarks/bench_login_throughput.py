@@ -0,0 +1,70 @@
+"""
+登录吞吐基准测试
+
+以固定并发持续调用 /auth/login，同时用一个探针循环请求轻量的 /health，
+统计登录吞吐量以及探针延迟。bcrypt 在事件循环内同步执行时，
+探针延迟会随登录并发线性恶化；移入进程池后探针应保持在毫秒级。
+
+8 核环境建议的启动方式:
+    PASSWORD_HASH_WORKERS=8 uvicorn main:app --port 8000
+
+示例:
+    python benchmarks/bench_login_throughput.py --concurrency 32 --requests 800
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+import httpx
+
+from bench_concurrent_latency import DEFAULT_BASE_URL, percentile, run
+
+
+async def probe(base_url: str, interval: float, stop: asyncio.Event) -> List[float]:
+    """在登录压测期间周期性请求 /health，返回延迟样本（毫秒）"""
+    samples: List[float] = []
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                await client.get(f"{base_url}/health")
+            except httpx.HTTPError:
+                pass
+            samples.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(interval)
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="登录吞吐基准测试")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=800)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="探针请求间隔（秒）")
+    args = parser.parse_args()
+
+    body = {"username": args.username, "password": args.password}
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(args.base_url, args.probe_interval, stop))
+    result = await run(args.base_url, "POST", "/auth/login", args.concurrency, args.requests, body, {})
+    stop.set()
+    samples = await probe_task
+
+    result["probe"] = {
+        "samples": len(samples),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2) if samples else 0.0,
+        "mean_ms": round(statistics.fmean(samples), 2) if samples else 0.0,
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+任务更新事务基准测试
+
+在进程内通过 ASGI 直接调用 PUT /tasks/{id}，借助 SQLAlchemy 引擎事件统计
+每个请求的提交次数与SQL语句数（数据库往返）。需要可用的数据库与默认管理员账号。
+
+示例:
+    python benchmarks/bench_task_update_commits.py --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import event
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend", "plugins", "pm_agent"))
+
+from database import engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+class Counters:
+    """引擎级计数器"""
+
+    def __init__(self):
+        self.commits = 0
+        self.statements = 0
+
+    def on_commit(self, conn):
+        self.commits += 1
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="任务更新事务基准测试")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/pm_agent", timeout=60.0) as client:
+        response = await client.post("/auth/login", json={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        response = await client.post("/tasks", json={
+            "title": "事务基准任务",
+            "description": "bench",
+            "priority": "low",
+            "due_date": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
+        })
+        response.raise_for_status()
+        task_id = response.json()["id"]
+        # 预热认证缓存
+        await client.get(f"/tasks/{task_id}")
+
+        counters = Counters()
+        event.listen(engine.sync_engine, "commit", counters.on_commit)
+        event.listen(engine.sync_engine, "before_cursor_execute", counters.on_execute)
+
+        priorities = ["low", "medium", "high"]
+        errors = 0
+        started = time.perf_counter()
+        for i in range(args.requests):
+            # 每次修改三个字段，产生三条历史记录
+            payload = {
+                "title": f"事务基准任务 {i}",
+                "description": f"bench {i}",
+                "priority": priorities[i % len(priorities)],
+            }
+            response = await client.put(f"/tasks/{task_id}", json=payload)
+            if response.status_code != 200:
+                errors += 1
+        elapsed = time.perf_counter() - started
+
+        event.remove(engine.sync_engine, "commit", counters.on_commit)
+        event.remove(engine.sync_engine, "before_cursor_execute", counters.on_execute)
+        await client.delete(f"/tasks/{task_id}")
+
+    print(json.dumps({
+        "requests": args.requests,
+        "errors": errors,
+        "commits_per_request": round(counters.commits / args.requests, 2),
+        "statements_per_request": round(counters.statements / args.requests, 2),
+        "mean_ms": round(elapsed / args.requests * 1000, 2),
+    }, ensure_ascii=False, indent=2))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,6 +4,7 @@
 -- 启用必要的扩展
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 -- 创建用户表
 CREATE TABLE IF NOT EXISTS users (
@@ -29,7 +30,8 @@ CREATE TABLE IF NOT EXISTS tasks (
     created_by UUID REFERENCES users(id) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    deleted_at TIMESTAMP WITH TIME ZONE NULL
+    deleted_at TIMESTAMP WITH TIME ZONE NULL,
+    search_vector TSVECTOR NULL
 );
 
 -- 创建任务历史记录表
@@ -43,15 +45,53 @@ CREATE TABLE IF NOT EXISTS task_history (
     changed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 创建任务统计计数表（未分配负责人记在全零UUID下）
+CREATE TABLE IF NOT EXISTS task_stat_counters (
+    assignee_id UUID NOT NULL,
+    priority VARCHAR(10) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    task_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (assignee_id, priority, status)
+);
+
+-- 创建任务提醒台账表（同一截止时间的同类提醒只发送一次）
+CREATE TABLE IF NOT EXISTS task_reminders (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    task_id UUID NOT NULL REFERENCES tasks(id),
+    reminder_type VARCHAR(20) NOT NULL,
+    due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    assignee_id UUID REFERENCES users(id),
+    sent_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_task_reminders_task_type_due UNIQUE (task_id, reminder_type, due_date)
+);
+
 -- 创建索引
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+-- 用户检索索引：三元组（子串/相似度）与小写前缀
+CREATE INDEX IF NOT EXISTS idx_users_username_trgm ON users USING gin(username gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin(email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_username_lower_prefix ON users(lower(username) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_lower_prefix ON users(lower(email) text_pattern_ops);
 CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks(assignee_id);
 CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
 CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
 CREATE INDEX IF NOT EXISTS idx_tasks_created_by ON tasks(created_by);
 CREATE INDEX IF NOT EXISTS idx_tasks_deleted_at ON tasks(deleted_at) WHERE deleted_at IS NULL;
 CREATE INDEX IF NOT EXISTS idx_task_history_task_id ON task_history(task_id);
+-- 任务列表键集分页索引
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at_id ON tasks(created_at, id) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date_id ON tasks(due_date, id) WHERE deleted_at IS NULL;
+-- 逾期扫描索引（仅覆盖未删除、未完成且未逾期的任务）
+CREATE INDEX IF NOT EXISTS idx_tasks_open_due_date ON tasks(due_date) WHERE deleted_at IS NULL AND status IN ('pending', 'in_progress', 'blocked');
+-- 回收站列表键集分页索引
+CREATE INDEX IF NOT EXISTS idx_tasks_deleted_at_id ON tasks(deleted_at, id) WHERE deleted_at IS NOT NULL;
+-- 增量导出水位扫描索引
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at_id ON tasks(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_task_history_changed_at_id ON task_history(changed_at, id);
+-- 任务全文检索索引（词素由应用侧分词生成）
+CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING gin(search_vector);
 
 -- 创建更新时间触发器函数
 CREATE OR REPLACE FUNCTION update_updated_at_column()
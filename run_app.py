@@ -7,10 +7,18 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend', 'plugins', 'pm_agent'))
 
 from config import settings
-from database import init_db
+from database import init_db, close_db, start_replica_monitor, stop_replica_monitor
 from routes import router as task_router
 from auth_routes import router as auth_router
 from user_routes import router as user_router
+from admin_routes import router as admin_router
+from export_routes import router as export_router
+from stats_routes import router as stats_router
+from invalidation import start_listener, stop_listener
+from password_hashing import shutdown_pool
+from health import start_health_monitor, stop_health_monitor
+from scheduler import start_scheduler, stop_scheduler
+from reminder_service import start_reminder_engine, stop_reminder_engine
 from fastapi import FastAPI
 import uvicorn
 
@@ -26,18 +34,32 @@ app = FastAPI(
 app.include_router(task_router, prefix="/api/pm_agent")
 app.include_router(auth_router, prefix="/api/pm_agent")
 app.include_router(user_router, prefix="/api/pm_agent")
+app.include_router(admin_router, prefix="/api/pm_agent")
+app.include_router(export_router, prefix="/api/pm_agent")
+app.include_router(stats_router, prefix="/api/pm_agent")
 
 # 应用启动事件
 @app.on_event("startup")
 async def startup_event():
     """应用启动时初始化数据库连接"""
     await init_db()
+    await start_listener()
+    await start_replica_monitor()
+    await start_health_monitor()
+    await start_scheduler()
+    await start_reminder_engine()
 
 # 应用关闭事件
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时清理资源"""
-    pass
+    await stop_reminder_engine()
+    await stop_scheduler()
+    await stop_health_monitor()
+    await stop_listener()
+    await stop_replica_monitor()
+    shutdown_pool()
+    await close_db()
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,42 @@
+"""
+密码哈希工作池单元测试
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from fastapi import HTTPException  # type: ignore
+from passlib.hash import bcrypt  # type: ignore
+
+import password_hashing  # type: ignore
+from config import settings  # type: ignore
+
+
+def test_verify_and_update_rehashes_when_rounds_change():
+    """成本因子与配置不一致时返回新哈希"""
+    old_hash = bcrypt.using(rounds=4).hash("Passw0rd!")
+    valid, new_hash = password_hashing._verify_and_update("Passw0rd!", old_hash)
+    assert valid
+    assert new_hash is not None
+    assert bcrypt.from_string(new_hash).rounds == settings.BCRYPT_ROUNDS
+
+
+def test_verify_and_update_wrong_password():
+    """密码错误时不返回新哈希"""
+    old_hash = bcrypt.using(rounds=4).hash("Passw0rd!")
+    assert password_hashing._verify_and_update("wrong", old_hash) == (False, None)
+
+
+def test_full_queue_rejects_with_retry_after(monkeypatch):
+    """排队已满时立即返回503并携带Retry-After"""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_QUEUE_SIZE", 0)
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(password_hashing.hash_password("Passw0rd!"))
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
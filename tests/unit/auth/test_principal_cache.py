@@ -0,0 +1,77 @@
+"""
+认证主体缓存单元测试
+"""
+
+import os
+import sys
+import uuid
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from sqlalchemy import inspect as sa_inspect  # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession  # type: ignore
+
+from invalidation import RESET_ALL  # type: ignore
+from models import User  # type: ignore
+from principal_cache import PrincipalCache  # type: ignore
+
+
+def _make_user(**overrides):
+    values = dict(
+        id=uuid.uuid4(),
+        username="alice",
+        email="alice@example.com",
+        password_hash="x",
+        role="member",
+        status="active",
+    )
+    values.update(overrides)
+    return User(**values)
+
+
+def test_put_stores_snapshot_not_instance():
+    """缓存保存列值快照，后续修改实例不影响缓存"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    user = _make_user()
+    cache.put(str(user.id), user)
+    user.username = "changed"
+    snapshot = cache.get(str(user.id))
+    assert snapshot["username"] == "alice"
+    assert snapshot["id"] == user.id
+
+
+def test_invalidate_user_removes_all_subjects():
+    """按用户id失效时，同一用户的所有subject条目都被删除"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    alice = _make_user()
+    bob = _make_user(username="bob", email="bob@example.com")
+    cache.put(str(alice.id), alice)
+    cache.put("alice", alice)
+    cache.put(str(bob.id), bob)
+
+    assert cache.invalidate_user(str(alice.id)) == 2
+    assert cache.get("alice") is None
+    assert cache.get(str(bob.id)) is not None
+
+
+def test_reset_all_clears_cache():
+    """整体失效消息清空缓存"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.put("a", _make_user())
+    cache.invalidate_user(RESET_ALL)
+    assert len(cache._cache) == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_attach_returns_clean_persistent_instance():
+    """还原的实例已绑定会话且无待写入的修改"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    user = _make_user()
+    cache.put("s", user)
+    db = AsyncSession()
+    attached = cache.attach(db, cache.get("s"))
+    state = sa_inspect(attached)
+    assert state.persistent
+    assert attached.username == "alice"
+    assert not db.sync_session.dirty
@@ -0,0 +1,104 @@
+"""
+逾期扫描单元测试
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+import pytest  # type: ignore
+from sqlalchemy.dialects import postgresql  # type: ignore
+
+from models import OPEN_TASK_STATUSES, Task, TaskStatus  # type: ignore
+import overdue_service  # type: ignore
+import scheduler  # type: ignore
+from overdue_service import ensure_system_actor, overdue_sweep_statement  # type: ignore
+
+
+def _index(name):
+    return next(index for index in Task.__table__.indexes if index.name == name)
+
+
+def test_sweep_statement_is_chunked_and_skips_locked_rows():
+    """单批语句：限制行数、跳过被锁定的任务，并返回更新前的状态"""
+    sql = str(overdue_sweep_statement(200).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+    assert "LIMIT 200 FOR UPDATE SKIP LOCKED" in sql
+    assert "tasks.status IN ('pending', 'in_progress', 'blocked')" in sql
+    assert "RETURNING due.id, due.status, due.assignee_id, due.priority" in sql
+
+
+def test_open_due_date_index_matches_sweep_predicate():
+    """部分索引只覆盖待扫描的状态，已完成与已逾期任务不在索引中"""
+    predicate = str(_index("idx_tasks_open_due_date").dialect_options["postgresql"]["where"].compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+    assert "deleted_at IS NULL" in predicate
+    for value in OPEN_TASK_STATUSES:
+        assert f"'{value}'" in predicate
+    assert TaskStatus.OVERDUE.value not in OPEN_TASK_STATUSES
+    assert TaskStatus.COMPLETED.value not in OPEN_TASK_STATUSES
+
+
+class _ActorSession:
+    """按顺序返回 scalar 查询结果，记录执行的写语句"""
+
+    def __init__(self, *scalars):
+        self.scalars = list(scalars)
+        self.statements = []
+        self.commits = 0
+
+    async def scalar(self, statement):
+        return self.scalars.pop(0)
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+    async def commit(self):
+        self.commits += 1
+
+
+async def _fake_hash(password):
+    return "hashed"
+
+
+def test_ensure_system_actor_reuses_existing_user(monkeypatch):
+    actor_id = uuid.uuid4()
+    monkeypatch.setattr(overdue_service, "_system_actor_id", None)
+    session = _ActorSession(actor_id)
+    assert asyncio.run(ensure_system_actor(session)) == actor_id
+    assert session.statements == []
+    assert overdue_service._system_actor_id == actor_id
+
+
+def test_ensure_system_actor_creates_inactive_user(monkeypatch):
+    """系统用户不存在时创建停用用户，创建后仍取不到则抛出异常"""
+    actor_id = uuid.uuid4()
+    monkeypatch.setattr(overdue_service, "_system_actor_id", None)
+    monkeypatch.setattr(overdue_service, "hash_password", _fake_hash)
+    session = _ActorSession(None, actor_id)
+    assert asyncio.run(ensure_system_actor(session)) == actor_id
+    params = session.statements[0].compile().params
+    assert params["username"] == overdue_service.settings.SYSTEM_ACTOR_USERNAME
+    assert params["status"] == "inactive"
+    assert "ON CONFLICT DO NOTHING" in str(session.statements[0].compile(dialect=postgresql.dialect()))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ensure_system_actor(_ActorSession(None, None)))
+
+
+def test_sweep_job_retries_system_actor_on_next_run(monkeypatch, caplog):
+    """数据库暂不可用时扫描任务记录错误而不抛出，系统操作用户留待下个周期取得"""
+    def unreachable():
+        raise ConnectionRefusedError("database unreachable")
+
+    monkeypatch.setattr(overdue_service, "_system_actor_id", None)
+    monkeypatch.setattr(scheduler, "AsyncSessionLocal", unreachable)
+    asyncio.run(scheduler.sweep_overdue_tasks_job())
+    assert "逾期扫描失败" in caplog.text
+    assert overdue_service._system_actor_id is None
@@ -0,0 +1,88 @@
+"""
+任务列表游标分页单元测试
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from sqlalchemy import column, select, table  # type: ignore
+
+from database import READ_PRIMARY_STICKY, READ_REPLICA  # type: ignore
+from pagination import count_cache, encode_cursor, decode_cursor, fetch_page  # type: ignore
+
+
+def test_cursor_round_trip():
+    """游标编码后可以无损还原排序键"""
+    created_at = datetime(2024, 1, 15, 8, 30, 0, 123456, tzinfo=timezone.utc)
+    task_id = uuid.uuid4()
+
+    cursor = encode_cursor("created_at", "desc", [created_at, task_id])
+    decoded = decode_cursor(cursor)
+
+    assert decoded["sort_by"] == "created_at"
+    assert decoded["sort_order"] == "desc"
+    assert decoded["values"] == [created_at, task_id]
+
+
+def test_cursor_is_url_safe():
+    """游标不包含需要URL转义的字符"""
+    cursor = encode_cursor("title", "asc", ["测试任务/+=", uuid.uuid4()])
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+    assert decode_cursor(cursor)["values"][0] == "测试任务/+="
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "e30"])
+def test_invalid_cursor_rejected(cursor):
+    """无效游标抛出ValueError"""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+class _CountSession:
+    """模拟只读会话：分页查询返回带窗口计数的行"""
+
+    def __init__(self, read_target, total):
+        self.info = {"read_target": read_target}
+        self.total = total
+
+    async def execute(self, statement):
+        return _Result([_Row(("task", self.total))])
+
+
+class _Row(tuple):
+    @property
+    def total_count(self):
+        return self[-1]
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+def test_sticky_session_bypasses_count_cache():
+    """读己之写窗口内的请求不读取也不写入总数缓存，不允许写入时只读取"""
+    items = table("tasks", column("id"))
+    query = select(items.c.id)
+    key = ("tasks", "read-your-writes")
+    count_cache.set(key, 1)
+
+    _, total = asyncio.run(fetch_page(_CountSession(READ_PRIMARY_STICKY, 2), query, query, cache_key=key))
+    assert total == 2
+    assert count_cache.get(key) == 1
+
+    count_cache.pop(key)
+    _, total = asyncio.run(fetch_page(_CountSession(READ_REPLICA, 3), query, query, cache_key=key, cache_fill=False))
+    assert total == 3
+    assert count_cache.get(key) is None
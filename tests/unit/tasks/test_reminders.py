@@ -0,0 +1,104 @@
+"""
+截止提醒定时队列单元测试
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+import pytest  # type: ignore
+
+import reminder_service  # type: ignore
+from invalidation import RESET_ALL  # type: ignore
+from reminder_service import _on_message, _pop_due, _reset, _schedule, reminder_text, task_reminder_entry  # type: ignore
+
+
+@pytest.fixture(autouse=True)
+def loaded_window():
+    """模拟已加载到三天半之后的提醒窗口"""
+    _reset(wake=False)
+    reminder_service._loaded_until = datetime.now(timezone.utc) + timedelta(days=3, hours=12)
+    yield
+    _reset(wake=False)
+
+
+def test_task_reminder_entry_cancels_closed_tasks():
+    """已完成或已删除的任务取消提醒"""
+    due = datetime.now(timezone.utc) + timedelta(days=3)
+    task_id = uuid.uuid4()
+    assert task_reminder_entry(SimpleNamespace(id=task_id, due_date=due, status="pending", deleted_at=None)) == (task_id, due)
+    assert task_reminder_entry(SimpleNamespace(id=task_id, due_date=due, status="completed", deleted_at=None)) == (task_id, None)
+    assert task_reminder_entry(SimpleNamespace(id=task_id, due_date=due, status="pending", deleted_at=due)) == (task_id, None)
+
+
+def test_pop_due_discards_rescheduled_entries():
+    """截止时间变更后旧的堆元素被丢弃，只在新的提醒时间触发"""
+    now = datetime.now(timezone.utc)
+    task_id = uuid.uuid4()
+    _schedule(task_id, now + timedelta(days=3, minutes=-1))
+    _schedule(task_id, now + timedelta(days=3, hours=1))
+    assert _pop_due(now) == {}
+    due = _pop_due(now + timedelta(hours=2))
+    assert list(due) == [task_id]
+    assert _pop_due(now + timedelta(hours=2)) == {}
+
+
+def test_schedule_ignores_due_dates_outside_loaded_window():
+    """窗口之外的截止时间留给后续窗口加载"""
+    now = datetime.now(timezone.utc)
+    _schedule(uuid.uuid4(), now + timedelta(days=10))
+    _schedule(uuid.uuid4(), now - timedelta(hours=1))
+    assert reminder_service._heap == []
+
+
+def test_broadcast_payload_round_trip():
+    """广播消息更新或取消提醒，空消息触发重新加载"""
+    now = datetime.now(timezone.utc)
+    kept, cancelled = uuid.uuid4(), uuid.uuid4()
+    due = now + timedelta(days=3, minutes=-5)
+    _schedule(cancelled, due)
+    _on_message(f"{kept}={due.isoformat()};{cancelled}=")
+    assert set(_pop_due(now)) == {kept}
+
+    _on_message("")
+    assert reminder_service._loaded_until is None
+
+
+def test_reset_all_broadcast_reloads_window():
+    """监听连接重建后的全量失效消息清空堆并重新加载"""
+    now = datetime.now(timezone.utc)
+    _schedule(uuid.uuid4(), now + timedelta(days=3, minutes=-5))
+    _on_message(RESET_ALL)
+    assert reminder_service._loaded_until is None
+    assert reminder_service._heap == []
+
+
+def test_engine_not_started_without_channels(monkeypatch):
+    """未配置任何提醒渠道时不启动，不会写入提醒台账"""
+    monkeypatch.setattr(reminder_service, "_configured_senders", lambda: [])
+    asyncio.run(reminder_service.start_reminder_engine())
+    assert reminder_service._engine_task is None
+
+
+def test_deliver_keeps_ledger_unless_every_channel_failed(monkeypatch):
+    """至少一个渠道发送成功或没有适用渠道时保留台账，全部失败时撤回重试"""
+    async def sent(reminder):
+        return True
+
+    async def not_applicable(reminder):
+        return False
+
+    async def broken(reminder):
+        raise OSError("connection refused")
+
+    reminder = {"task_id": uuid.uuid4(), "title": "发布", "due_date": datetime.now(timezone.utc)}
+    for senders, kept in (([broken, sent], True), ([not_applicable], True), ([not_applicable, broken], False)):
+        monkeypatch.setattr(reminder_service, "_senders", senders)
+        assert asyncio.run(reminder_service._deliver(reminder)) is kept
+    assert "「发布」" in reminder_text(reminder)
@@ -0,0 +1,44 @@
+"""
+任务全文检索分词单元测试
+"""
+
+import os
+import sys
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from search import tokenize_document, tokenize_query, build_tsquery  # type: ignore
+
+
+def test_document_tokens_include_chinese_unigrams_and_bigrams():
+    """中文按单字与双字切分"""
+    tokens = tokenize_document("项目管理")
+    assert {"项", "目", "管", "理"} <= set(tokens)
+    assert {"项目", "目管", "管理"} <= set(tokens)
+
+
+def test_mixed_text_is_lowercased_and_split():
+    """中英混排时拉丁单词转为小写并独立成词"""
+    tokens = tokenize_document("完成API设计 v2")
+    assert "api" in tokens
+    assert "v2" in tokens
+    assert "设计" in tokens
+
+
+def test_fullwidth_characters_are_normalized():
+    """全角字母数字转为半角"""
+    assert tokenize_document("ＡＢＣ１２３") == ["abc123"]
+
+
+def test_query_uses_bigrams_for_chinese():
+    """查询中的中文片段使用双字，单字片段保留单字"""
+    assert tokenize_query("管理文档") == ["管理", "理文", "文档"]
+    assert tokenize_query("文") == ["文"]
+
+
+def test_build_tsquery():
+    """拉丁单词使用前缀匹配，全部词素以AND连接"""
+    assert build_tsquery("需求 arch") == "'需求' & 'arch':*"
+    assert build_tsquery("!!") is None
+    assert build_tsquery(None) is None
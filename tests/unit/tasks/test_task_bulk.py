@@ -0,0 +1,28 @@
+"""
+批量创建任务校验单元测试
+"""
+
+import os
+import sys
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from task_bulk_service import validate_bulk_items  # type: ignore
+
+
+def test_validate_bulk_items_reports_row_errors():
+    """每行独立校验，错误按行号返回"""
+    items = [
+        {"title": "有效任务", "due_date": "2030-01-01T00:00:00Z"},
+        {"title": "", "due_date": "2030-01-01T00:00:00Z"},
+        {"title": "缺少截止日期"},
+        {"title": "无效优先级", "due_date": "2030-01-01T00:00:00Z", "priority": "urgent"},
+    ]
+    valid, errors = validate_bulk_items(items)
+    assert list(valid) == [0]
+    assert valid[0].priority == "medium"
+    assert sorted(errors) == [1, 2, 3]
+    assert errors[1][0].startswith("title:")
+    assert errors[2][0].startswith("due_date:")
+    assert "urgent" in errors[3][0]
@@ -0,0 +1,30 @@
+"""
+任务历史变更计算单元测试
+"""
+
+import os
+import sys
+import uuid
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from models import Task  # type: ignore
+from task_history_service import collect_task_changes  # type: ignore
+
+
+def test_collect_changes_uses_pre_update_values():
+    """旧值取自更新前的任务状态，仅记录实际变化的字段"""
+    task = Task(id=uuid.uuid4(), title="旧标题", description="描述", priority="low", status="pending")
+    changes = collect_task_changes(task, {"title": "新标题", "description": "描述", "priority": "high"})
+    assert changes == [
+        {"field_name": "title", "old_value": "旧标题", "new_value": "新标题"},
+        {"field_name": "priority", "old_value": "low", "new_value": "high"},
+    ]
+
+
+def test_collect_changes_skips_system_fields_and_handles_none():
+    """跳过系统字段，None 与值之间的变化会被记录"""
+    task = Task(id=uuid.uuid4(), title="t", description=None)
+    changes = collect_task_changes(task, {"id": uuid.uuid4(), "updated_at": None, "description": "补充"})
+    assert changes == [{"field_name": "description", "old_value": None, "new_value": "补充"}]
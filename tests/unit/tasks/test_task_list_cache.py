@@ -0,0 +1,128 @@
+"""
+任务列表响应缓存单元测试
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+import task_list_cache  # type: ignore
+from database import READ_PRIMARY_STICKY, READ_REPLICA  # type: ignore
+
+
+def _loader(calls, value, delay=0.0):
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return load
+
+
+def test_hit_until_global_version_bumped():
+    """未指定负责人的查询在任意任务写入后失效"""
+    async def scenario():
+        calls = []
+        key = ("all", "unfiltered-hit")
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, 1)) == 1
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, 2)) == 1
+        await task_list_cache.tasks_changed(uuid.uuid4())
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, 3)) == 3
+        return calls
+
+    assert asyncio.run(scenario()) == [1, 3]
+
+
+def test_assignee_filter_only_invalidated_by_own_assignee():
+    """按负责人过滤的查询只在该负责人的任务变化时失效"""
+    async def scenario():
+        calls = []
+        assignee, other = uuid.uuid4(), uuid.uuid4()
+        key = ("all", "assignee", assignee)
+        await task_list_cache.get_or_load(key, assignee, _loader(calls, "a"))
+        await task_list_cache.tasks_changed(other)
+        await task_list_cache.get_or_load(key, assignee, _loader(calls, "b"))
+        # 负责人从 other 改为 assignee 时两者都会递增
+        await task_list_cache.tasks_changed(other, assignee)
+        result = await task_list_cache.get_or_load(key, assignee, _loader(calls, "c"))
+        return calls, result
+
+    calls, result = asyncio.run(scenario())
+    assert calls == ["a", "c"]
+    assert result == "c"
+
+
+def test_global_reset_invalidates_assignee_queries():
+    """不指定负责人的变更（批量操作）使所有查询失效"""
+    async def scenario():
+        calls = []
+        assignee = uuid.uuid4()
+        key = ("all", "reset", assignee)
+        await task_list_cache.get_or_load(key, assignee, _loader(calls, 1))
+        await task_list_cache.tasks_changed()
+        await task_list_cache.get_or_load(key, assignee, _loader(calls, 2))
+        return calls
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_concurrent_misses_share_one_load():
+    """相同键的并发未命中只执行一次加载"""
+    async def scenario():
+        calls = []
+        key = ("all", "single-flight")
+        results = await asyncio.gather(*[
+            task_list_cache.get_or_load(key, None, _loader(calls, index, delay=0.01))
+            for index in range(5)
+        ])
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert calls == [0]
+    assert results == [0] * 5
+
+
+def test_failed_load_propagates_to_waiters_and_is_not_cached():
+    """加载失败时所有等待者收到同一异常，且不写入缓存"""
+    async def scenario():
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        key = ("all", "failure")
+        results = await asyncio.gather(
+            *[task_list_cache.get_or_load(key, None, fail) for _ in range(3)],
+            return_exceptions=True
+        )
+        calls = []
+        value = await task_list_cache.get_or_load(key, None, _loader(calls, "ok"))
+        return results, value
+
+    results, value = asyncio.run(scenario())
+    assert all(isinstance(item, RuntimeError) for item in results)
+    assert value == "ok"
+
+
+def test_replica_fill_after_write_not_served_to_sticky_writer(monkeypatch):
+    """写入后副本读取的旧结果不以新版本缓存，写入者（固定到主库）绕过缓存读到自己的写入"""
+    async def scenario():
+        calls = []
+        key = ("all", "read-your-writes")
+        await task_list_cache.tasks_changed(uuid.uuid4())
+        # 其他用户从尚未复制该写入的副本读取
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, "replica-stale"), READ_REPLICA) == "replica-stale"
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, "primary"), READ_PRIMARY_STICKY) == "primary"
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, "replica"), READ_REPLICA) == "replica"
+
+        # 最近的写入超过读己之写窗口后，副本结果可以缓存；窗口内的请求仍不使用缓存
+        monkeypatch.setattr(task_list_cache.settings, "READ_YOUR_WRITES_WINDOW_SECONDS", 0.0)
+        monkeypatch.setattr(task_list_cache.settings, "REPLICA_MAX_LAG_SECONDS", 0.0)
+        await task_list_cache.get_or_load(key, None, _loader(calls, "cached"), READ_REPLICA)
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, "hit"), READ_REPLICA) == "cached"
+        assert await task_list_cache.get_or_load(key, None, _loader(calls, "sticky"), READ_PRIMARY_STICKY) == "sticky"
+        return calls
+
+    assert asyncio.run(scenario()) == ["replica-stale", "primary", "replica", "cached", "sticky"]
@@ -0,0 +1,102 @@
+"""
+任务统计服务单元测试
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from collections import namedtuple
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from task_stats_service import UNASSIGNED, apply_stat_changes, get_assignee_workloads, get_task_stats, stat_key  # type: ignore
+
+
+CounterRow = namedtuple("CounterRow", "assignee_id priority status task_count")
+PastDueRow = namedtuple("PastDueRow", "assignee_id task_count")
+WorkloadRow = namedtuple("WorkloadRow", "assignee_id open_tasks overdue_tasks high_priority_tasks")
+
+
+class _RecordingSession:
+    """记录执行的语句，依次返回预设的查询结果（最后一组结果重复使用）"""
+
+    def __init__(self, rows=(), *more_rows):
+        self.results = [list(rows), *(list(item) for item in more_rows)]
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+
+def test_stat_key_maps_unassigned():
+    """未分配负责人的任务记在全零UUID下"""
+    assert stat_key(None, "high", "pending") == (UNASSIGNED, "high", "pending")
+
+
+def test_apply_stat_changes_nets_out_deltas():
+    """同一分组的增减相互抵消，抵消为零时不执行写入"""
+    user_id = uuid.uuid4()
+    session = _RecordingSession()
+    key = stat_key(user_id, "low", "pending")
+    asyncio.run(apply_stat_changes(session, added=[key], removed=[key]))
+    assert session.statements == []
+
+    asyncio.run(apply_stat_changes(
+        session,
+        added=[stat_key(user_id, "low", "completed"), stat_key(None, "low", "pending")],
+        removed=[key]
+    ))
+    assert len(session.statements) == 1
+    params = session.statements[0].compile().params
+    deltas = sorted(value for name, value in params.items() if name.startswith("task_count"))
+    assert deltas == [-1, 1, 1]
+
+
+def test_get_task_stats_summary():
+    """汇总计数行，计算完成率与逾期占比"""
+    user_id = uuid.uuid4()
+    session = _RecordingSession([
+        CounterRow(user_id, "high", "completed", 3),
+        CounterRow(user_id, "low", "overdue", 1),
+        CounterRow(UNASSIGNED, "low", "pending", 6),
+    ], [])
+    stats = asyncio.run(get_task_stats(session))
+    assert stats["total"] == 10
+    assert stats["completion_rate"] == 0.3
+    assert stats["overdue_ratio"] == 0.1
+    assert stats["by_priority"] == {"high": 3, "low": 7}
+    assert stats["by_assignee"][0] == {"assignee_id": None, "total": 6, "completed": 0, "overdue": 0}
+    assert stats["by_assignee"][1] == {"assignee_id": user_id, "total": 4, "completed": 3, "overdue": 1}
+
+
+def test_get_assignee_workloads_defaults_to_zero():
+    """没有计数行的用户负载为0，已过截止时间的未完成任务计入逾期，空列表不查询"""
+    busy, idle = uuid.uuid4(), uuid.uuid4()
+    session = _RecordingSession([WorkloadRow(busy, 5, 2, 1)], [PastDueRow(busy, 1)])
+    workloads = asyncio.run(get_assignee_workloads(session, [busy, idle]))
+    assert workloads[busy] == {"open_tasks": 5, "overdue_tasks": 3, "high_priority_tasks": 1}
+    assert workloads[idle] == {"open_tasks": 0, "overdue_tasks": 0, "high_priority_tasks": 0}
+
+    empty = _RecordingSession()
+    assert asyncio.run(get_assignee_workloads(empty, [])) == {}
+    assert empty.statements == []
+
+
+def test_get_task_stats_counts_past_due_open_tasks_as_overdue():
+    """已过截止时间但尚未标记逾期的未完成任务计入逾期数，按状态的分布保持当前状态"""
+    user_id = uuid.uuid4()
+    session = _RecordingSession(
+        [CounterRow(user_id, "high", "pending", 3), CounterRow(UNASSIGNED, "low", "in_progress", 1)],
+        [PastDueRow(user_id, 2), PastDueRow(None, 1)]
+    )
+    stats = asyncio.run(get_task_stats(session))
+    assert stats["overdue"] == 3
+    assert stats["overdue_ratio"] == 0.75
+    assert stats["by_status"] == {"pending": 3, "in_progress": 1}
+    assert stats["by_assignee"][0]["overdue"] == 2
+    assert stats["by_assignee"][1] == {"assignee_id": None, "total": 1, "completed": 0, "overdue": 1}
+    sql = str(session.statements[1].compile(compile_kwargs={"literal_binds": True}))
+    assert "tasks.due_date < now()" in sql
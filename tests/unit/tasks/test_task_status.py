@@ -0,0 +1,40 @@
+"""
+任务状态流转与编辑、删除权限单元测试
+"""
+
+import os
+import sys
+import uuid
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "plugins", "pm_agent"))
+
+from models import Task, User  # type: ignore
+from permissions import can_delete_task, can_edit_task  # type: ignore
+from task_status_service import is_transition_allowed  # type: ignore
+
+
+def test_transitions():
+    assert is_transition_allowed("pending", "in_progress")
+    assert is_transition_allowed("completed", "in_progress")
+    assert not is_transition_allowed("pending", "completed")
+    assert not is_transition_allowed("pending", "pending")
+    assert not is_transition_allowed("unknown", "pending")
+
+
+def test_can_edit_task():
+    member = User(id=uuid.uuid4(), role="member")
+    other = uuid.uuid4()
+    assert can_edit_task(User(id=uuid.uuid4(), role="manager"), Task(assignee_id=other, created_by=other))
+    assert can_edit_task(member, Task(assignee_id=member.id, created_by=other))
+    assert can_edit_task(member, Task(assignee_id=None, created_by=member.id))
+    assert not can_edit_task(member, Task(assignee_id=other, created_by=other))
+
+
+def test_can_delete_task():
+    member = User(id=uuid.uuid4(), role="member")
+    other = uuid.uuid4()
+    assert can_delete_task(User(id=uuid.uuid4(), role="admin"), Task(created_by=other))
+    assert can_delete_task(member, Task(created_by=member.id))
+    # 负责人可以编辑但不能删除
+    assert not can_delete_task(member, Task(assignee_id=member.id, created_by=other))
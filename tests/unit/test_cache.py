@@ -0,0 +1,57 @@
+"""
+进程内TTL/LRU缓存单元测试
+"""
+
+import os
+import sys
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "plugins", "pm_agent"))
+
+from cache import TTLCache  # type: ignore
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_and_expire():
+    """条目在TTL到期后失效"""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("k", 1)
+    assert cache.get("k") == 1
+    clock.now = 5.1
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    """超过容量时淘汰最久未使用的条目"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_discard_where():
+    """按条件批量删除条目"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set(("user", 1), "x")
+    cache.set(("user", 2), "y")
+    cache.set(("task", 1), "z")
+    removed = cache.discard_where(lambda key, value: key[0] == "user")
+    assert removed == 2
+    assert len(cache) == 1
@@ -0,0 +1,57 @@
+"""
+HTTP 条件请求工具单元测试
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "plugins", "pm_agent"))
+
+from fastapi import HTTPException  # type: ignore
+from starlette.requests import Request  # type: ignore
+
+from conditional import check_if_match, is_not_modified, make_etag  # type: ignore
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+
+UPDATED_AT = datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+
+
+def test_etag_changes_with_updated_at():
+    task_id = uuid.uuid4()
+    assert make_etag(task_id, UPDATED_AT) == make_etag(task_id, UPDATED_AT)
+    assert make_etag(task_id, UPDATED_AT) != make_etag(task_id, UPDATED_AT + timedelta(microseconds=1))
+    assert make_etag(task_id, None) is None
+
+
+def test_if_none_match():
+    etag = make_etag("t", UPDATED_AT)
+    assert is_not_modified(_request(if_none_match=etag), etag, UPDATED_AT)
+    assert is_not_modified(_request(if_none_match=f'"other", W/{etag}'), etag, UPDATED_AT)
+    assert not is_not_modified(_request(if_none_match='"other"'), etag, UPDATED_AT)
+    assert not is_not_modified(_request(), etag, UPDATED_AT)
+
+
+def test_if_modified_since_uses_second_precision():
+    etag = make_etag("t", UPDATED_AT)
+    assert is_not_modified(_request(if_modified_since="Thu, 02 Jan 2025 03:04:05 GMT"), etag, UPDATED_AT)
+    assert not is_not_modified(_request(if_modified_since="Thu, 02 Jan 2025 03:04:04 GMT"), etag, UPDATED_AT)
+    assert not is_not_modified(_request(if_modified_since="garbage"), etag, UPDATED_AT)
+
+
+def test_if_match():
+    etag = make_etag("t", UPDATED_AT)
+    check_if_match(_request(), etag)
+    check_if_match(_request(if_match=etag), etag)
+    with pytest.raises(HTTPException) as exc_info:
+        check_if_match(_request(if_match=f"W/{etag}"), etag)
+    assert exc_info.value.status_code == 412
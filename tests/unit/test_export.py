@@ -0,0 +1,67 @@
+"""
+数据导出服务单元测试
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "plugins", "pm_agent"))
+
+import pytest  # type: ignore
+from sqlalchemy.dialects import postgresql  # type: ignore
+from starlette.requests import Request  # type: ignore
+
+from export_service import _csv_value, _record_batch, accepts_gzip, arrow_schema, export_query  # type: ignore
+
+
+def _request(accept_encoding=None):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    return Request({"type": "http", "headers": headers})
+
+
+def test_accepts_gzip_negotiation():
+    """按 Accept-Encoding 决定是否压缩，q=0 表示拒绝"""
+    assert accepts_gzip(_request("gzip, deflate, br"))
+    assert accepts_gzip(_request("br;q=1.0, gzip;q=0.5"))
+    assert not accepts_gzip(_request("gzip;q=0"))
+    assert not accepts_gzip(_request("identity"))
+    assert not accepts_gzip(_request())
+
+
+def test_csv_value_formatting():
+    """空值、时间与公式前缀的单元格处理"""
+    moment = datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc)
+    assert _csv_value(None) == ""
+    assert _csv_value(moment) == "2024-05-01T08:30:00+00:00"
+    assert _csv_value("=HYPERLINK(\"x\")") == "'=HYPERLINK(\"x\")"
+    assert _csv_value("普通标题") == "普通标题"
+
+
+def test_export_query_uses_watermark_bounds():
+    """增量导出：水位列大于 since 且不超过 until，按水位排序"""
+    until = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    sql = str(export_query("task_history", until - timedelta(days=1), until).compile(dialect=postgresql.dialect()))
+    assert "task_history.changed_at <=" in sql
+    assert "task_history.changed_at >" in sql
+    assert "ORDER BY task_history.changed_at, task_history.id" in sql
+    assert "changed_at >" not in str(export_query("task_history", None, until).compile(dialect=postgresql.dialect()))
+
+
+def test_record_batch_column_types():
+    """UUID、UTC时间与字典编码列的类型"""
+    pa = pytest.importorskip("pyarrow")
+    schema = arrow_schema("tasks")
+    now = datetime(2024, 5, 1, 8, 30, tzinfo=timezone(timedelta(hours=8)))
+    task_id = uuid.uuid4()
+    row = (task_id, "任务", None, None, now, "high", "pending", None, now, now, None)
+    batch = _record_batch([row], schema, ["uuid", "string", "string", "uuid", "timestamp", "dictionary",
+                                          "dictionary", "uuid", "timestamp", "timestamp", "timestamp"])
+    assert batch.schema.field("status").type == pa.dictionary(pa.int16(), pa.string())
+    assert batch.schema.field("due_date").type == pa.timestamp("us", tz="UTC")
+    record = batch.to_pylist()[0]
+    assert record["id"] == task_id
+    assert record["due_date"] == now
+    assert record["assignee_id"] is None
@@ -0,0 +1,42 @@
+"""
+健康检查快照与就绪判断单元测试
+"""
+
+import asyncio
+import os
+import sys
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "plugins", "pm_agent"))
+
+import health  # type: ignore
+
+
+def _patch(monkeypatch, db_status="healthy", age=1.0, checked_out=0):
+    async def fake_db_health():
+        return {"status": db_status, "message": "", "age_seconds": age}
+
+    monkeypatch.setattr(health, "get_database_health", fake_db_health)
+    monkeypatch.setattr(health, "pool_snapshot", lambda: {
+        "primary": {"size": 10, "max_overflow": 10, "checked_out": checked_out, "checkout_timeouts": 0}
+    })
+
+
+def test_ready_when_healthy(monkeypatch):
+    _patch(monkeypatch)
+    result = asyncio.run(health.readiness())
+    assert result["status"] == "ready"
+    assert result["pool"]["saturation"] == 0.0
+
+
+def test_not_ready_when_pool_saturated(monkeypatch):
+    _patch(monkeypatch, checked_out=19)
+    result = asyncio.run(health.readiness())
+    assert result["reasons"] == ["pool_saturated"]
+
+
+def test_not_ready_when_database_down_or_stale(monkeypatch):
+    _patch(monkeypatch, db_status="unhealthy", age=3600)
+    result = asyncio.run(health.readiness())
+    assert result["status"] == "not_ready"
+    assert result["reasons"] == ["database_unhealthy", "health_snapshot_stale"]
@@ -0,0 +1,43 @@
+"""
+运行指标与连接池统计单元测试
+"""
+
+import os
+import sys
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "plugins", "pm_agent"))
+
+import metrics  # type: ignore
+from pool_metrics import PoolStats  # type: ignore
+
+
+def test_pool_stats_buckets_are_cumulative():
+    stats = PoolStats("test")
+    for seconds in (0.0005, 0.003, 0.2, 10.0):
+        stats.observe_checkout(seconds)
+    snapshot = stats.snapshot()
+    assert snapshot["checkouts"] == 4
+    assert snapshot["checkout_seconds_max"] == 10.0
+    buckets = snapshot["checkout_seconds_buckets"]
+    assert buckets["0.001"] == 1
+    assert buckets["0.005"] == 2
+    assert buckets["0.5"] == 3
+    assert buckets["5.0"] == 3
+    assert buckets["+Inf"] == 4
+
+
+def test_render_prometheus(monkeypatch):
+    monkeypatch.setattr(metrics, "_collectors", {
+        "db pool": lambda: {
+            "primary": {"checked_out": 2, "wait_buckets": {"0.1": 3, "+Inf": 4}, "note": "x"},
+            "lag": [0.5, None],
+            "healthy": True,
+        }
+    })
+    lines = metrics.render_prometheus().splitlines()
+    assert "pm_agent_db_pool_primary_checked_out 2.0" in lines
+    assert 'pm_agent_db_pool_primary_wait_bucket{le="0.1"} 3' in lines
+    assert 'pm_agent_db_pool_lag{index="0"} 0.5' in lines
+    assert "pm_agent_db_pool_healthy 1.0" in lines
+    assert not any("note" in line for line in lines)
@@ -0,0 +1,103 @@
+"""
+只读副本路由单元测试
+"""
+
+import os
+import sys
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "plugins", "pm_agent"))
+
+import database  # type: ignore
+from cache import TTLCache  # type: ignore
+
+
+def _configure(monkeypatch, lags):
+    replicas = [f"replica-{i}" for i in range(len(lags))]
+    monkeypatch.setattr(database, "ReplicaSessionLocals", replicas)
+    monkeypatch.setattr(database, "_replica_lag", list(lags))
+    monkeypatch.setattr(database, "_recent_writers", TTLCache(maxsize=10, ttl=60))
+    monkeypatch.setattr(database.settings, "REPLICA_MAX_LAG_SECONDS", 5.0)
+    return replicas
+
+
+def test_without_replicas_uses_primary(monkeypatch):
+    monkeypatch.setattr(database, "ReplicaSessionLocals", [])
+    assert database.read_session_factory("u1") is database.AsyncSessionLocal
+
+
+def test_routes_to_healthy_replicas_only(monkeypatch):
+    replicas = _configure(monkeypatch, [0.5, 30.0, None])
+    chosen = {database.read_session_factory("u1") for _ in range(4)}
+    assert chosen == {replicas[0]}
+
+
+def test_lagging_replicas_fall_back_to_primary(monkeypatch):
+    _configure(monkeypatch, [30.0, None])
+    assert database.read_session_factory("u1") is database.AsyncSessionLocal
+
+
+def test_recent_writer_sticks_to_primary(monkeypatch):
+    replicas = _configure(monkeypatch, [0.0])
+    database.mark_recent_write("u1")
+    assert database.read_session_factory("u1") is database.AsyncSessionLocal
+    assert database.read_session_factory("u2") is replicas[0]
+
+
+class _WriteSession:
+    """模拟提交前的主库会话，记录执行的语句"""
+
+    def __init__(self, user_id):
+        self.info = {"user_id": user_id, "has_writes": True}
+        self.new = self.dirty = self.deleted = ()
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+
+def test_recent_writer_broadcast_reaches_other_process(monkeypatch):
+    """进程A提交写入时在事务内广播用户，进程B收到后该用户的读请求也走主库"""
+    import db_routing  # type: ignore
+    import invalidation  # type: ignore
+
+    replicas = _configure(monkeypatch, [0.0])
+    monkeypatch.setattr(invalidation.settings, "CACHE_INVALIDATION_CHANNEL", "pm_agent_cache")
+
+    # 进程A：写事务提交前发出 NOTIFY
+    session = _WriteSession("u1")
+    db_routing._broadcast_writer(session)
+    assert len(session.statements) == 1
+    channel, message = session.statements[0].compile().params.values()
+    assert channel == "pm_agent_cache"
+
+    # 进程B：没有见过这次写入，收到广播前读请求走副本
+    monkeypatch.setattr(database, "_recent_writers", TTLCache(maxsize=10, ttl=60))
+    monkeypatch.setattr(invalidation, "_origin", "process-b")
+    assert database.read_session_factory("u1") is replicas[0]
+    invalidation._on_notification(None, 0, channel, message)
+    assert database.read_session_factory("u1") is database.AsyncSessionLocal
+    assert database.read_session_factory("u2") is replicas[0]
+
+
+def test_read_only_session_does_not_broadcast(monkeypatch):
+    import db_routing  # type: ignore
+    import invalidation  # type: ignore
+
+    monkeypatch.setattr(invalidation.settings, "CACHE_INVALIDATION_CHANNEL", "pm_agent_cache")
+    session = _WriteSession("u1")
+    session.info["has_writes"] = False
+    db_routing._broadcast_writer(session)
+    assert session.statements == []
+
+
+def test_lost_broadcasts_pin_reads_to_primary(monkeypatch):
+    """监听重连（整体失效）后，一个窗口内所有读请求走主库"""
+    import db_routing  # type: ignore
+    from invalidation import RESET_ALL  # type: ignore
+
+    replicas = _configure(monkeypatch, [0.0])
+    monkeypatch.setattr(database, "_primary_pinned_until", 0.0)
+    assert database.read_session_factory("u2") is replicas[0]
+    db_routing._on_writer_message(RESET_ALL)
+    assert database.read_session_factory("u2") is database.AsyncSessionLocal
@@ -0,0 +1,80 @@
+"""
+列表响应快速序列化单元测试
+"""
+
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# 允许导入插件代码
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "plugins", "pm_agent"))
+
+from models import Task  # type: ignore
+from schemas import TaskListResponse, TaskResponse  # type: ignore
+import pytest  # type: ignore
+from fastapi import HTTPException  # type: ignore
+
+from serialization import dumps, parse_fields, rows_to_dicts, schema_columns, with_columns  # type: ignore
+
+
+class DriverUUID(uuid.UUID):
+    """模拟数据库驱动返回的 UUID 子类"""
+
+
+def _row():
+    now = datetime(2024, 5, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+    values = {
+        "title": "任务",
+        "description": None,
+        "assignee_id": DriverUUID(str(uuid.uuid4())),
+        "due_date": now + timedelta(days=3),
+        "priority": "high",
+        "id": DriverUUID(str(uuid.uuid4())),
+        "status": "pending",
+        "created_by": None,
+        "created_at": now,
+        "updated_at": now,
+        "deleted_at": None,
+    }
+    return tuple(values[name] for name in TaskResponse.model_fields)
+
+
+def test_schema_columns_follow_response_fields():
+    """查询列与响应字段一一对应"""
+    columns = schema_columns(Task, TaskResponse)
+    assert [column.key for column in columns] == list(TaskResponse.model_fields)
+
+
+def test_encoding_matches_response_model():
+    """快速路径的输出与响应模型序列化结果一致"""
+    rows = [_row(), _row()]
+    content = {"tasks": rows_to_dicts(rows, TaskResponse.model_fields), "total": 2, "skip": 0, "limit": 20, "next_cursor": None}
+    body = dumps(content)
+    expected = TaskListResponse.model_validate(content).model_dump_json()
+    assert body.decode() == expected
+    assert json.loads(body)["tasks"][0]["created_at"].endswith("Z")
+
+
+def test_parse_fields_orders_by_schema_and_includes_id():
+    """请求字段按响应模型顺序排列，并总是包含 id"""
+    assert parse_fields(None, TaskResponse) == tuple(TaskResponse.model_fields)
+    assert parse_fields("status, title", TaskResponse) == ("title", "id", "status")
+
+
+def test_parse_fields_rejects_unknown():
+    """未知字段返回400"""
+    with pytest.raises(HTTPException) as exc_info:
+        parse_fields("title,password_hash", TaskResponse)
+    assert exc_info.value.status_code == 400
+
+
+def test_extra_columns_are_queried_but_not_output():
+    """额外查询的列不进入输出"""
+    names = parse_fields("title", TaskResponse)
+    selected = with_columns(names, ["created_at", "id"])
+    assert selected == ("title", "id", "created_at")
+    columns = schema_columns(Task, TaskResponse, selected)
+    assert [column.key for column in columns] == list(selected)
+    assert rows_to_dicts([("任务", "abc", "2024-01-01")], names) == [{"title": "任务", "id": "abc"}]